@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'participants.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,9 +79,31 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Connections are kept across requests, so the PRAGMAs set by
+        # participants.database.configure_sqlite run once per worker thread.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Transactions take the write lock at BEGIN, so they wait (busy timeout) instead
+            # of failing with "database is locked" when they first write.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# "fragments" holds the dashboard snapshot and API pages, keyed on each event's data
+# version; MAX_ENTRIES bounds it per process and the least recently used entries go first.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hackathon-fragments',
+        'OPTIONS': {'MAX_ENTRIES': 500, 'CULL_FREQUENCY': 4},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -131,5 +154,36 @@ HACKATHON_ALLOWED_SENDERS = [
     'hackathon@eeuez-market.com',
     'contact@eeuez.com',
 ]
+# Email dispatch: parallel SMTP connections and messages sent per connection.
+HACKATHON_EMAIL_CONCURRENCY = 4
+HACKATHON_EMAIL_BATCH_SIZE = 50
+# Provider cap shared by all sends of a process (None disables the limiter).
+HACKATHON_EMAIL_RATE_PER_MINUTE = 100
+# SMTP time the send button may spend in its request; the rest is left to `drain_outbox`.
+HACKATHON_EMAIL_REQUEST_SECONDS = 20
+# Generated Excel reports, cached per data version; only the most recent are kept.
+HACKATHON_EXPORT_CACHE_DIR = BASE_DIR / 'var' / 'exports'
+HACKATHON_EXPORT_CACHE_KEEP = 3
+# Team formation: a fixed seed makes uploads reproducible; a positive budget (seconds)
+# runs the swap-based balancer on top of the greedy assignment.
+HACKATHON_TEAM_SEED = None
+HACKATHON_OPTIMIZE_SECONDS = 0
+# Uploads are stored here and imported in the background: "thread" (in this process),
+# "command" (by `manage.py process_uploads`) or "inline" (before the response).
+HACKATHON_UPLOAD_DIR = BASE_DIR / 'var' / 'uploads'
+HACKATHON_UPLOAD_RUNNER = 'thread'
+# Worker processes parsing multi-file / multi-sheet uploads (None: up to 4, one per CPU).
+HACKATHON_IMPORT_WORKERS = None
+# Instrumentation: /metrics (Prometheus text format) requires "Authorization: Bearer <token>"
+# when a token is set; Server-Timing adds per-phase timings to every response.
+HACKATHON_METRICS_TOKEN = None
+HACKATHON_SERVER_TIMING = DEBUG
+# SQLite: WAL lets reads run during an import; statements wait up to BUSY_TIMEOUT seconds
+# for a lock. Imports, resets and email status updates queue on WRITE_LOCK_FILE, across
+# processes, for up to WRITE_LOCK_TIMEOUT seconds.
+HACKATHON_SQLITE_JOURNAL_MODE = 'WAL'
+HACKATHON_SQLITE_BUSY_TIMEOUT = 20
+HACKATHON_WRITE_LOCK_FILE = BASE_DIR / 'var' / 'write.lock'
+HACKATHON_WRITE_LOCK_TIMEOUT = 120
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
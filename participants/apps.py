@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ParticipantsConfig(AppConfig):
     name = 'participants'
+
+    def ready(self):
+        from .database import configure_sqlite
+
+        connection_created.connect(configure_sqlite, dispatch_uid="participants.configure_sqlite")
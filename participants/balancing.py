@@ -0,0 +1,146 @@
+import math
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from .metrics import phase
+from .records import ParticipantRecord
+from .utils import CONSTRAINT_FLAGS, _pick_leader
+
+# Weights of the balancing objective (lower is better).
+COVERAGE_WEIGHT = 10.0
+SCORE_WEIGHT = 1.0
+OVERLAP_WEIGHT = 1.0
+
+# How many swaps are tried between two clock checks.
+_CLOCK_EVERY = 256
+
+
+class _TeamStats:
+    """Running totals that let a team's cost be updated in O(member features)."""
+
+    __slots__ = ("size", "flags", "score", "skills", "duplicates")
+
+    def __init__(self, features):
+        self.size = 0
+        self.flags = [0] * len(CONSTRAINT_FLAGS)
+        self.score = 0
+        self.skills = Counter()
+        self.duplicates = 0
+        for feature in features:
+            self.add(feature)
+
+    def add(self, feature):
+        flags, score, skills = feature
+        self.size += 1
+        for idx, flag in enumerate(flags):
+            self.flags[idx] += flag
+        self.score += score
+        for skill in skills:
+            if self.skills[skill]:
+                self.duplicates += 1
+            self.skills[skill] += 1
+
+    def remove(self, feature):
+        flags, score, skills = feature
+        self.size -= 1
+        for idx, flag in enumerate(flags):
+            self.flags[idx] -= flag
+        self.score -= score
+        for skill in skills:
+            self.skills[skill] -= 1
+            if self.skills[skill]:
+                self.duplicates -= 1
+
+    def cost(self, mean_score: float) -> float:
+        if not self.size:
+            return 0.0
+        missing = sum(1 for count in self.flags if not count)
+        drift = self.score / self.size - mean_score
+        return COVERAGE_WEIGHT * missing + SCORE_WEIGHT * drift * drift + OVERLAP_WEIGHT * self.duplicates
+
+
+def _features(member: ParticipantRecord):
+    return (
+        tuple(1 if getattr(member, flag) else 0 for flag in CONSTRAINT_FLAGS),
+        member.academic_score,
+        tuple(set(member.skills_list)),
+    )
+
+
+def _mean_score(teams: List[Dict]) -> float:
+    members = [m for team in teams for m in team["members"]]
+    return sum(m.academic_score for m in members) / len(members) if members else 0.0
+
+
+def team_objective(teams: List[Dict]) -> float:
+    """Balancing objective of a team list: coverage gaps, score spread and skill overlap."""
+    mean_score = _mean_score(teams)
+    return sum(_TeamStats(map(_features, team["members"])).cost(mean_score) for team in teams)
+
+
+@phase("optimize_teams")
+def optimize_teams(
+    teams: List[Dict],
+    time_budget: float = 1.0,
+    seed: Optional[int] = None,
+    max_iterations: Optional[int] = None,
+) -> List[Dict]:
+    """Improve a greedy assignment in place with swap-based local search.
+
+    Two members of different teams are swapped whenever that does not worsen the
+    objective. Only the two touched teams are re-scored, so each try costs
+    O(team size). The search stops after time_budget seconds or max_iterations tries;
+    with a seed and an iteration cap that the budget does not cut short, runs are
+    reproducible. Leaders are re-picked once at the end.
+    """
+    deadline = time.perf_counter() + time_budget
+    populated = [team for team in teams if team["members"]]
+    if len(populated) < 2:
+        return teams
+
+    rng = random.Random(seed)
+    mean_score = _mean_score(populated)
+    features = [[_features(m) for m in team["members"]] for team in populated]
+    stats = [_TeamStats(team_features) for team_features in features]
+    costs = [team_stats.cost(mean_score) for team_stats in stats]
+    limit = max_iterations if max_iterations is not None else math.inf
+
+    iteration = 0
+    while iteration < limit:
+        if iteration % _CLOCK_EVERY == 0 and time.perf_counter() >= deadline:
+            break
+        iteration += 1
+
+        a, b = rng.sample(range(len(populated)), 2)
+        i = rng.randrange(len(features[a]))
+        j = rng.randrange(len(features[b]))
+        fa, fb = features[a][i], features[b][j]
+        if fa == fb:
+            continue
+
+        stats[a].remove(fa)
+        stats[a].add(fb)
+        stats[b].remove(fb)
+        stats[b].add(fa)
+        cost_a, cost_b = stats[a].cost(mean_score), stats[b].cost(mean_score)
+        if cost_a + cost_b <= costs[a] + costs[b]:
+            costs[a], costs[b] = cost_a, cost_b
+            features[a][i], features[b][j] = fb, fa
+            members_a, members_b = populated[a]["members"], populated[b]["members"]
+            members_a[i], members_b[j] = members_b[j], members_a[i]
+        else:
+            stats[a].remove(fb)
+            stats[a].add(fa)
+            stats[b].remove(fa)
+            stats[b].add(fb)
+
+    for team in populated:
+        leader = _pick_leader(team["members"])
+        for member in team["members"]:
+            member.team = team["name"]
+            member.team_display = team["display_name"]
+            member.is_leader = member is leader
+        team["leader"] = leader
+    return teams
@@ -0,0 +1,105 @@
+"""Parse several workbooks, or every sheet of one, in parallel and merge the registrations.
+
+Worker processes only import this module and utils (no Django models), so they start
+without a configured Django project.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .records import ParticipantRecord
+from .utils import USEFUL_COLUMNS, read_sheet, sheet_names
+
+BATCH_MAX_WORKERS = 4
+
+# (path, sheet name or index, label shown to the organizer)
+Source = Tuple[str, object, str]
+
+
+def expand_sources(files: Iterable[Tuple[str, str]], all_sheets: bool = False) -> List[Source]:
+    """Turn (path, display name) pairs into the sheets to parse: the first one, or all of them."""
+    sources = []
+    for path, name in files:
+        if not all_sheets:
+            sources.append((path, 0, name))
+            continue
+        with open(path, "rb") as handle:
+            for sheet in sheet_names(handle):
+                sources.append((path, sheet, f"{name} / {sheet}"))
+    return sources
+
+
+def parse_source(path: str, sheet, label: str) -> Dict:
+    """Parse one sheet; run in a worker process. Sheets without our columns yield no rows."""
+    with open(path, "rb") as handle:
+        columns, records = read_sheet(handle, sheet)
+        rows = list(records) if columns else []
+    return {"label": label, "columns": columns, "rows": rows}
+
+
+def _pool_context():
+    # forkserver children fork from a clean single-threaded server rather than from this
+    # (possibly threaded) web process; spawn is the portable fallback.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    if context.get_start_method() == "forkserver":
+        context.set_forkserver_preload([__name__])
+    return context
+
+
+def parse_sources(
+    sources: List[Source],
+    workers: Optional[int] = None,
+    on_parsed: Optional[Callable[[Dict], None]] = None,
+) -> List[Dict]:
+    """Parse every source, with a process pool when there is more than one worker.
+
+    Results keep the order of sources; on_parsed is called as each one finishes.
+    """
+    if workers is None:
+        workers = min(BATCH_MAX_WORKERS, os.cpu_count() or 1)
+    workers = max(1, min(workers, len(sources)))
+    if workers == 1:
+        results = []
+        for source in sources:
+            results.append(parse_source(*source))
+            if on_parsed is not None:
+                on_parsed(results[-1])
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        futures = [pool.submit(parse_source, *source) for source in sources]
+        results = []
+        for future in futures:
+            results.append(future.result())
+            if on_parsed is not None:
+                on_parsed(results[-1])
+    return results
+
+
+def merge_parsed(results: List[Dict]) -> Tuple[List[ParticipantRecord], List[str], Dict]:
+    """Concatenate parsed sheets, keeping the first registration of each email.
+
+    Rows without an email are all kept. uids are renumbered over the merged list.
+    Returns (participants, columns, stats).
+    """
+    merged, seen = [], set()
+    found_columns = set()
+    stats = {"sources": [], "duplicates": 0}
+    for result in results:
+        found_columns.update(result["columns"])
+        kept = 0
+        for row in result["rows"]:
+            email = (row.email or "").strip().lower()
+            if email:
+                if email in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(email)
+            row.uid = f"p{len(merged)}"
+            merged.append(row)
+            kept += 1
+        stats["sources"].append({"label": result["label"], "rows": len(result["rows"]), "kept": kept})
+    columns = [col for col in USEFUL_COLUMNS if col in found_columns] or list(USEFUL_COLUMNS)
+    return merged, columns, stats
@@ -0,0 +1,115 @@
+"""SQLite connection setup and the single-writer lock.
+
+SQLite lets one writer at a time change the database file. WAL journaling keeps readers
+going while that writer works, and write_lock makes concurrent writers (imports, resets,
+email status updates, from any thread or worker process) wait their turn on a lock file
+instead of failing with "database is locked" in the middle of a transaction.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .metrics import WRITE_LOCK_WAIT_SECONDS
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are then only serialized within one process.
+    fcntl = None
+
+JOURNAL_MODE = "WAL"
+JOURNAL_MODES = ("WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY")
+# Seconds a statement waits for another connection's lock before giving up.
+BUSY_TIMEOUT = 20
+WRITE_LOCK_TIMEOUT = 120
+WRITE_LOCK_POLL = 0.05
+
+
+class WriteLockTimeout(Exception):
+    pass
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created receiver: journal mode, busy timeout and sync level of SQLite connections."""
+    if connection.vendor != "sqlite":
+        return
+    journal_mode = (getattr(settings, "HACKATHON_SQLITE_JOURNAL_MODE", JOURNAL_MODE) or "").upper()
+    if journal_mode and journal_mode not in JOURNAL_MODES:
+        raise ImproperlyConfigured(f"HACKATHON_SQLITE_JOURNAL_MODE must be one of {', '.join(JOURNAL_MODES)}.")
+    busy_timeout = getattr(settings, "HACKATHON_SQLITE_BUSY_TIMEOUT", BUSY_TIMEOUT)
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+        if journal_mode:
+            cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+        if journal_mode == "WAL":
+            # In WAL mode NORMAL only syncs at checkpoints: a power cut may lose the last
+            # commits but never corrupts the file.
+            cursor.execute("PRAGMA synchronous = NORMAL")
+
+
+def write_lock_path() -> Path:
+    return Path(getattr(settings, "HACKATHON_WRITE_LOCK_FILE", Path(settings.BASE_DIR) / "var" / "write.lock"))
+
+
+_process_lock = threading.Lock()
+_held = threading.local()
+
+
+@contextmanager
+def write_lock(timeout: Optional[float] = None):
+    """Hold the database-wide write lock, shared by every thread and worker process.
+
+    Re-entrant within a thread, usable as a decorator. Waits up to timeout seconds
+    (HACKATHON_WRITE_LOCK_TIMEOUT by default, math.inf for no limit), then raises
+    WriteLockTimeout.
+    """
+    if getattr(_held, "depth", 0):
+        _held.depth += 1
+        try:
+            yield
+        finally:
+            _held.depth -= 1
+        return
+
+    if timeout is None:
+        timeout = getattr(settings, "HACKATHON_WRITE_LOCK_TIMEOUT", WRITE_LOCK_TIMEOUT)
+    start = time.monotonic()
+    if not _process_lock.acquire(timeout=-1 if timeout == math.inf else timeout):
+        raise WriteLockTimeout(f"Write lock still busy after {timeout}s.")
+    handle = None
+    try:
+        handle = _lock_file(start + timeout)
+        WRITE_LOCK_WAIT_SECONDS.observe(time.monotonic() - start)
+        _held.depth = 1
+        try:
+            yield
+        finally:
+            _held.depth = 0
+    finally:
+        if handle is not None:
+            handle.close()
+        _process_lock.release()
+
+
+def _lock_file(deadline: float):
+    # flock locks belong to the open file, so closing the handle releases the lock even
+    # if this process dies while holding it.
+    if fcntl is None:
+        return None
+    path = write_lock_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(path, "ab")
+    while True:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return handle
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                handle.close()
+                raise WriteLockTimeout(f"Write lock held by another process ({path}).")
+            time.sleep(WRITE_LOCK_POLL)
@@ -0,0 +1,41 @@
+from typing import Optional
+
+from django.http import Http404
+from django.utils.text import slugify
+
+from .models import Event
+
+DEFAULT_EVENT_SLUG = "default"
+DEFAULT_EVENT_NAME = "Hackathon"
+# Query string / form field that selects the event in every view.
+EVENT_PARAM = "event"
+
+
+def default_event() -> Event:
+    """The event used when none is selected (created by migration 0009 for existing data)."""
+    event, _ = Event.objects.get_or_create(slug=DEFAULT_EVENT_SLUG, defaults={"name": DEFAULT_EVENT_NAME})
+    return event
+
+
+def resolve_event(event: Optional[Event]) -> Event:
+    return event if event is not None else default_event()
+
+
+def current_event(request) -> Event:
+    """The event selected by the `event` slug of the request, else the default one."""
+    slug = request.POST.get(EVENT_PARAM) or request.GET.get(EVENT_PARAM)
+    if not slug:
+        return default_event()
+    event = Event.objects.filter(slug=slug).first()
+    if event is None:
+        raise Http404("Evenement introuvable.")
+    return event
+
+
+def create_event(name: str) -> Event:
+    """Create an event whose slug is derived from its name, suffixed when already taken."""
+    base = slugify(name)[:40] or "evenement"
+    slug, suffix = base, 2
+    while Event.objects.filter(slug=slug).exists():
+        slug, suffix = f"{base}-{suffix}", suffix + 1
+    return Event.objects.create(slug=slug, name=name)
@@ -0,0 +1,47 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+
+EXPORT_CACHE_KEEP = 3
+
+
+def open_cached_report(event_id: int, version: str, build: Callable):
+    """Open the report file of an event for `version`, building it with build(handle) on a miss.
+
+    version is a version_tag, so a database recreated from zero never reuses old files.
+    Reports live under HACKATHON_EXPORT_CACHE_DIR, one file per event and data version, written
+    atomically so concurrent workers never serve a partial file. Only the most recent
+    HACKATHON_EXPORT_CACHE_KEEP files are kept per event.
+    """
+    cache_dir = Path(settings.HACKATHON_EXPORT_CACHE_DIR)
+    path = cache_dir / f"report-e{event_id}-v{version}.xlsx"
+    try:
+        return open(path, "rb")
+    except FileNotFoundError:
+        pass
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            build(handle)
+        os.replace(tmp_name, path)
+    except Exception:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    handle = open(path, "rb")
+    _evict(cache_dir, event_id, getattr(settings, "HACKATHON_EXPORT_CACHE_KEEP", EXPORT_CACHE_KEEP))
+    return handle
+
+
+def _evict(cache_dir: Path, event_id: int, keep: int) -> None:
+    reports = sorted(cache_dir.glob(f"report-e{event_id}-v*.xlsx"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in reports[keep:]:
+        try:
+            stale.unlink()
+        except FileNotFoundError:
+            pass
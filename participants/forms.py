@@ -1,15 +1,58 @@
 from django import forms
 
 
+MODE_REPLACE = "replace"
+MODE_UPDATE = "update"
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    """FileField accepting several files; cleans to a list."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        if isinstance(data, (list, tuple)):
+            return [super(MultipleFileField, self).clean(item, initial) for item in data]
+        return [super().clean(data, initial)]
+
+
 class UploadForm(forms.Form):
-    file = forms.FileField(
-        label="Fichier Excel (.xlsx)",
-        help_text="La premiere feuille doit contenir les colonnes 'Email Address', 'NOM ET PRENOM', 'LANGUE', \"NIVEAU D'ETUDES\", 'VOS COMPETENCES'.",
-        widget=forms.ClearableFileInput(attrs={"class": "file-input"}),
+    file = MultipleFileField(
+        label="Fichiers Excel (.xlsx)",
+        help_text="La premiere feuille doit contenir les colonnes 'Email Address', 'NOM ET PRENOM', 'LANGUE', \"NIVEAU D'ETUDES\", 'VOS COMPETENCES'. Plusieurs fichiers sont fusionnes (un email = une inscription).",
+        widget=MultipleFileInput(attrs={"class": "file-input"}),
+    )
+    mode = forms.ChoiceField(
+        label="Mode d'import",
+        choices=[
+            (MODE_REPLACE, "Remplacer tout et refaire les equipes"),
+            (MODE_UPDATE, "Mettre a jour (garde equipes et emails envoyes, place les nouveaux inscrits)"),
+        ],
+        initial=MODE_REPLACE,
+        required=False,
+        widget=forms.RadioSelect,
+    )
+    delete_missing = forms.BooleanField(
+        label="Supprimer les participants absents du fichier",
+        required=False,
+    )
+    all_sheets = forms.BooleanField(
+        label="Lire toutes les feuilles (une par formulaire ou par ecole)",
+        required=False,
     )
 
     def clean_file(self):
         uploaded = self.cleaned_data["file"]
-        if not uploaded.name.lower().endswith((".xlsx", ".xls")):
-            raise forms.ValidationError("Merci de fournir un fichier Excel (.xlsx ou .xls).")
+        for item in uploaded:
+            if not item.name.lower().endswith((".xlsx", ".xls")):
+                raise forms.ValidationError("Merci de fournir un fichier Excel (.xlsx ou .xls).")
         return uploaded
+
+    def clean_mode(self):
+        return self.cleaned_data.get("mode") or MODE_REPLACE
@@ -0,0 +1,52 @@
+"""Versioned fragments of the dashboard and its JSON APIs, kept in a bounded local cache.
+
+Keys embed the event and its DataVersion, so every mutation (upload, placement, team
+rename, mentor, reset, email status, skill category edit) moves the event to a new
+version and the old entries simply stop matching; the cache's LRU cull evicts them.
+Each worker process has its own cache: the version row in the database is what keeps
+them consistent, at the cost of one small query per request.
+"""
+from typing import Callable, Iterable, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import urlencode
+
+from .metrics import FRAGMENT_CACHE_LOOKUPS
+from .versioning import data_key, get_data_version, version_tag
+
+FRAGMENT_CACHE = "fragments"
+
+_MISSING = object()
+
+
+def fragment_cache():
+    return caches[getattr(settings, "HACKATHON_FRAGMENT_CACHE", FRAGMENT_CACHE)]
+
+
+def fragment_version(event_id: int) -> str:
+    """Cache version of an event's data; read once per request, after any mutation it made."""
+    return version_tag(*get_data_version(data_key(event_id)))
+
+
+def cached_fragment(
+    event_id: int, version: str, name: str, build: Callable, params: Iterable[Tuple[str, str]] = ()
+):
+    """Return the cached value of fragment name for this event version, calling build() on a miss.
+
+    params (e.g. the query string of an API page) are part of the key. Values are
+    pickled by the cache, so callers get their own copy.
+    """
+    key = f"fragment:{name}:e{event_id}:v{version}"
+    params = sorted(params)
+    if params:
+        key = f"{key}:{urlencode(params)}"
+    cache = fragment_cache()
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        FRAGMENT_CACHE_LOOKUPS.inc(fragment=name, result="hit")
+        return value
+    FRAGMENT_CACHE_LOOKUPS.inc(fragment=name, result="miss")
+    value = build()
+    cache.set(key, value, timeout=None)
+    return value
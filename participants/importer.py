@@ -0,0 +1,219 @@
+import hashlib
+from typing import Callable, Dict, List, Optional
+
+from django.db import transaction
+
+from .database import write_lock
+from .events import resolve_event
+from .metrics import phase
+from .models import Event, OutboxMessage, Participant, Team
+from .records import ParticipantRecord
+from .skills import SkillLink, link_skills
+from .versioning import bump_data_version, data_key
+
+IMPORT_BATCH_SIZE = 500
+
+
+# Fields that come from the sheet; an incremental import rewrites only these.
+SOURCE_FIELDS = [
+    "full_name",
+    "email",
+    "language_raw",
+    "academic_level",
+    "competences_raw",
+    "skills_list",
+    "language_fr",
+    "language_en",
+    "is_dev",
+    "is_marketing",
+    "academic_score",
+    "uid",
+    "source_key",
+    "source_hash",
+]
+
+
+def _source_fields(member: ParticipantRecord) -> Dict:
+    fields = {
+        "full_name": member.full_name or "",
+        "email": member.email or "",
+        "language_raw": member.language_raw,
+        "academic_level": member.academic_level,
+        "competences_raw": member.competences,
+        "skills_list": list(member.skills_list),
+        "language_fr": member.language_fr,
+        "language_en": member.language_en,
+        "is_dev": member.is_dev,
+        "is_marketing": member.is_marketing,
+        "academic_score": member.academic_score,
+        "uid": member.uid or "",
+    }
+    fields["source_hash"] = source_hash(fields)
+    fields["source_key"] = source_key(fields["email"], fields["source_hash"])
+    return fields
+
+
+def source_hash(fields: Dict) -> str:
+    """Digest of the raw sheet values of a participant."""
+    raw = "\x1f".join(
+        str(fields[name]) for name in ("full_name", "email", "language_raw", "academic_level", "competences_raw")
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def source_key(email: str, content_hash: str) -> str:
+    """Identity of a sheet row across uploads: its normalized email, else its content hash."""
+    normalized = (email or "").strip().lower()
+    return f"email:{normalized}" if normalized else f"hash:{content_hash}"
+
+
+def participant_from_record(member: ParticipantRecord, team: Optional[Team], event: Event) -> Participant:
+    """Build an unsaved Participant of event from an enriched record."""
+    return Participant(
+        **_source_fields(member),
+        event=event,
+        email_sent=member.email_sent,
+        is_leader=member.is_leader,
+        team=team,
+    )
+
+
+def delete_participants(queryset) -> None:
+    """Delete participants along with their outbox rows and skill links.
+
+    Those relations use DO_NOTHING so that this stays a few plain DELETE statements
+    instead of Django's collector loading every participant first.
+    """
+    OutboxMessage.objects.filter(participant__in=queryset).delete()
+    SkillLink.objects.filter(participant__in=queryset).delete()
+    queryset.delete()
+
+
+def clear_event(event: Event) -> None:
+    """Delete the participants, teams and emails of one event, leaving the others alone."""
+    with write_lock(), transaction.atomic():
+        delete_participants(event.participants.all())
+        OutboxMessage.objects.filter(event=event).delete()
+        event.teams.all().delete()
+        bump_data_version(data_key(event.pk))
+
+
+@write_lock()
+@phase("import")
+def import_participants(
+    participants: List[ParticipantRecord],
+    teams: List[Dict],
+    event: Optional[Event] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Swap the participants of event (default: the default event) for the assigned ones.
+
+    Other events are left untouched and everything runs in a single transaction. Teams
+    of event missing from the new assignment are deleted. Teams and participants are
+    built in memory first, then written with batched bulk_create/bulk_update so the
+    import costs a handful of queries per batch instead of one INSERT per row.
+    progress, when given, receives the number of rows written after each batch.
+    """
+    event = resolve_event(event)
+    with transaction.atomic():
+        delete_participants(event.participants.all())
+        team_map = {t.code: t for t in event.teams.all()}
+
+        new_teams, changed_teams = [], []
+        for team_info in teams:
+            display_name = team_info.get("display_name") or team_info["name"]
+            team = team_map.get(team_info["name"])
+            if team is None:
+                team = Team(event=event, code=team_info["name"], display_name=display_name)
+                new_teams.append(team)
+                team_map[team.code] = team
+            elif team.display_name != display_name:
+                team.display_name = display_name
+                changed_teams.append(team)
+
+        # A smaller sheet needs fewer teams: the leftovers would stay behind empty.
+        stale = set(team_map) - {team_info["name"] for team_info in teams}
+        if stale:
+            event.teams.filter(code__in=stale).delete()
+            for code in stale:
+                del team_map[code]
+        Team.objects.bulk_create(new_teams, batch_size=batch_size)
+        if changed_teams:
+            Team.objects.bulk_update(changed_teams, ["display_name"], batch_size=batch_size)
+
+        rows = [participant_from_record(member, team_map.get(member.team), event) for member in participants]
+        for start in range(0, len(rows), batch_size):
+            Participant.objects.bulk_create(rows[start:start + batch_size], batch_size=batch_size)
+            if progress is not None:
+                progress(min(start + batch_size, len(rows)))
+        link_skills(rows)
+        bump_data_version(data_key(event.pk))
+    return len(rows)
+
+
+@write_lock()
+@phase("import")
+def sync_participants(
+    participants: List[ParticipantRecord],
+    delete_missing: bool = False,
+    event: Optional[Event] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Dict[str, int]:
+    """Apply a re-uploaded sheet as a delta instead of wiping the table.
+
+    Only rows of event (default: the default event) are matched, on source_key. New
+    rows are inserted without a team, rows whose source hash changed get their sheet
+    fields rewritten, and email_sent, team and leader flags are preserved. Rows absent
+    from the sheet are deleted only when delete_missing is set. The sheet keeps the
+    first row of each key, and so does the table: when a full import stored the same
+    email twice, the oldest row is matched and the later copies count as absent from
+    the sheet. Returns the diff counts; progress gets the rows written so far.
+    """
+    event = resolve_event(event)
+    counts = {"created": 0, "updated": 0, "unchanged": 0, "deleted": 0, "duplicates": 0}
+    with transaction.atomic():
+        existing, stored_copies = {}, []
+        for pk, key, digest in event.participants.order_by("pk").values_list("pk", "source_key", "source_hash"):
+            if key in existing:
+                stored_copies.append(pk)
+            else:
+                existing[key] = (pk, digest)
+        seen = set()
+        to_create, to_update = [], []
+        for member in participants:
+            fields = _source_fields(member)
+            key = fields["source_key"]
+            if key in seen:
+                counts["duplicates"] += 1
+                continue
+            seen.add(key)
+            match = existing.get(key)
+            if match is None:
+                to_create.append(Participant(event=event, **fields))
+            elif match[1] != fields["source_hash"]:
+                to_update.append(Participant(pk=match[0], **fields))
+            else:
+                counts["unchanged"] += 1
+
+        Participant.objects.bulk_create(to_create, batch_size=batch_size)
+        link_skills(to_create)
+        if progress is not None:
+            progress(len(to_create))
+        if to_update:
+            Participant.objects.bulk_update(to_update, SOURCE_FIELDS, batch_size=batch_size)
+            link_skills(to_update, replace=True)
+            if progress is not None:
+                progress(len(to_create) + len(to_update))
+        counts["created"], counts["updated"] = len(to_create), len(to_update)
+
+        if delete_missing:
+            gone = [pk for key, (pk, _) in existing.items() if key not in seen] + stored_copies
+            for start in range(0, len(gone), batch_size):
+                delete_participants(Participant.objects.filter(pk__in=gone[start:start + batch_size]))
+            counts["deleted"] = len(gone)
+
+        if counts["created"] or counts["updated"] or counts["deleted"]:
+            bump_data_version(data_key(event.pk))
+    return counts
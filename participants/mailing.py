@@ -0,0 +1,317 @@
+import contextvars
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .database import WriteLockTimeout, write_lock
+from .metrics import SMTP_MESSAGES, phase
+from .models import Event, OutboxMessage, Participant
+from .utils import build_email_content
+from .versioning import bump_data_version, data_key
+
+EMAIL_CONCURRENCY = 4
+EMAIL_BATCH_SIZE = 50
+STATUS_UPDATE_BATCH = 500
+
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_BACKOFF_SECONDS = 60
+OUTBOX_MAX_BACKOFF_SECONDS = 3600
+OUTBOX_CLAIM_SIZE = 200
+# A row left in "sending" longer than this belongs to a dead worker and can be re-claimed.
+OUTBOX_CLAIM_TIMEOUT = timedelta(minutes=10)
+# Seconds of SMTP sending the send button may spend in the request; the rest stays queued.
+EMAIL_REQUEST_SECONDS = 20
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate_per_minute` sends on average, bursts up to `capacity`."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self._sleep(wait)
+
+
+def dispatch_emails(
+    participants: List[Participant],
+    sender_email: str,
+    concurrency: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    rate_limiter: Optional[TokenBucket] = None,
+    on_batch: Optional[Callable[[List[Tuple[int, Dict]]], None]] = None,
+) -> List[Dict]:
+    """Send the confirmation email to each participant and flag the ones that went out.
+
+    Messages are rendered up front, split into batches of batch_size and sent by up to
+    concurrency workers, each batch over a single SMTP connection. email_sent is then
+    set for every delivered message in a few UPDATE statements. Results keep the input
+    order. A shared rate_limiter, when given, is consulted before every message.
+
+    With on_batch, flags are written as each batch finishes and on_batch receives its
+    (index, result) pairs, so a killed process only loses the batches still in flight.
+    """
+    concurrency = concurrency or getattr(settings, "HACKATHON_EMAIL_CONCURRENCY", EMAIL_CONCURRENCY)
+    batch_size = batch_size or getattr(settings, "HACKATHON_EMAIL_BATCH_SIZE", EMAIL_BATCH_SIZE)
+
+    results: List[Optional[Dict]] = [None] * len(participants)
+    outgoing = []
+    for idx, person in enumerate(participants):
+        full_name = person.full_name or "Participant"
+        if not person.email:
+            results[idx] = {"status": "skipped", "email": None, "name": full_name, "message": "Pas d'email fourni."}
+            continue
+        subject, body = build_email_content(person.language_raw, full_name)
+        outgoing.append((idx, EmailMessage(subject, body, sender_email, [person.email])))
+
+    batches = [outgoing[start:start + batch_size] for start in range(0, len(outgoing), batch_size)]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        # Each batch runs in a copy of the caller's context so its SMTP timings reach the request.
+        futures = [pool.submit(contextvars.copy_context().run, _send_batch, batch, rate_limiter) for batch in batches]
+        for future in as_completed(futures):
+            done = []
+            for idx, error in future.result():
+                person = participants[idx]
+                full_name = person.full_name or "Participant"
+                if error is None:
+                    person.email_sent = True
+                    results[idx] = {"status": "sent", "email": person.email, "name": full_name, "message": "Envoye"}
+                else:
+                    results[idx] = {"status": "error", "email": person.email, "name": full_name, "message": error}
+                done.append(idx)
+            if on_batch is not None:
+                _flag_sent([participants[idx] for idx in done if results[idx]["status"] == "sent"])
+                on_batch([(idx, results[idx]) for idx in done])
+
+    if on_batch is None:
+        _flag_sent([participants[idx] for idx, result in enumerate(results) if result["status"] == "sent"])
+    return results
+
+
+def _flag_sent(sent: List[Participant]) -> None:
+    sent_ids = [person.pk for person in sent]
+    if sent_ids:
+        # The messages are already out: wait as long as needed rather than lose the flags.
+        with write_lock(timeout=math.inf):
+            for start in range(0, len(sent_ids), STATUS_UPDATE_BATCH):
+                Participant.objects.filter(pk__in=sent_ids[start:start + STATUS_UPDATE_BATCH]).update(email_sent=True)
+            for event_id in sorted({person.event_id for person in sent}):
+                bump_data_version(data_key(event_id))
+
+
+def _send_batch(batch, rate_limiter=None):
+    """Send one batch over a single connection, reconnecting after a failed message.
+
+    Building the connection happens inside the per-message try, so a broken backend is
+    reported as a failed message (and retried with backoff) like any SMTP error.
+    """
+    outcome = []
+    connection = None
+    is_open = False
+    try:
+        for idx, message in batch:
+            try:
+                if rate_limiter is not None:
+                    rate_limiter.acquire()
+                with phase("smtp_send"):
+                    if connection is None:
+                        connection = get_connection(fail_silently=False)
+                    if not is_open:
+                        connection.open()
+                        is_open = True
+                    connection.send_messages([message])
+                outcome.append((idx, None))
+                SMTP_MESSAGES.inc(outcome="sent")
+            except Exception as exc:
+                outcome.append((idx, str(exc)))
+                SMTP_MESSAGES.inc(outcome="error")
+                _close_quietly(connection)
+                is_open = False
+    finally:
+        _close_quietly(connection)
+    return outcome
+
+
+def _close_quietly(connection):
+    if connection is None:
+        return
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def enqueue_emails(participants: List[Participant], sender_email: str, kind: str = OutboxMessage.KIND_CONFIRMATION) -> int:
+    """Queue one outbox row per participant with an email.
+
+    Rows already queued or sent are left untouched, so repeated clicks never duplicate a
+    message; rows that exhausted their retries are re-armed for an explicit new attempt.
+    """
+    OutboxMessage.objects.filter(
+        participant__in=participants, kind=kind, status=OutboxMessage.STATUS_FAILED
+    ).update(status=OutboxMessage.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now())
+    rows = [
+        OutboxMessage(participant=person, event_id=person.event_id, kind=kind, sender_email=sender_email)
+        for person in participants
+        if person.email
+    ]
+    OutboxMessage.objects.bulk_create(rows, batch_size=STATUS_UPDATE_BATCH, ignore_conflicts=True)
+    return len(rows)
+
+
+def claim_outbox(limit: int = OUTBOX_CLAIM_SIZE, now=None, event: Optional[Event] = None) -> List[OutboxMessage]:
+    """Atomically claim up to `limit` due rows for this worker, of one event or of all of them.
+
+    The conditional UPDATE re-checks the status, so when two workers race for the same
+    rows only one of them gets each row back.
+    """
+    now = now or timezone.now()
+    due = Q(status=OutboxMessage.STATUS_PENDING, next_attempt_at__lte=now) | Q(
+        status=OutboxMessage.STATUS_SENDING, claimed_at__lt=now - OUTBOX_CLAIM_TIMEOUT
+    )
+    queue = OutboxMessage.objects.filter(due)
+    if event is not None:
+        queue = queue.filter(event=event)
+    candidates = list(queue.order_by("next_attempt_at", "pk").values_list("pk", flat=True)[:limit])
+    if not candidates:
+        return []
+    token = uuid.uuid4().hex
+    OutboxMessage.objects.filter(due, pk__in=candidates).update(
+        status=OutboxMessage.STATUS_SENDING, claim_token=token, claimed_at=now
+    )
+    return list(OutboxMessage.objects.filter(claim_token=token).select_related("participant").order_by("pk"))
+
+
+def shared_send_budget(now=None) -> Optional[int]:
+    """Messages all workers together may still claim under HACKATHON_EMAIL_RATE_PER_MINUTE.
+
+    Each process paces itself with its own TokenBucket, so the provider cap is shared
+    through the outbox: rows sent in the last minute and rows claimed but not sent yet
+    are subtracted from the rate. None when no rate is configured.
+    """
+    rate = getattr(settings, "HACKATHON_EMAIL_RATE_PER_MINUTE", None)
+    if not rate:
+        return None
+    now = now or timezone.now()
+    used = OutboxMessage.objects.filter(
+        Q(sent_at__gt=now - timedelta(minutes=1))
+        | Q(status=OutboxMessage.STATUS_SENDING, claimed_at__gte=now - OUTBOX_CLAIM_TIMEOUT)
+    ).count()
+    return max(0, int(rate) - used)
+
+
+def rate_capped(limit: int, rate_limiter: Optional[TokenBucket], seconds: float) -> int:
+    """limit, lowered to the number of messages rate_limiter lets through in seconds."""
+    if rate_limiter is None:
+        return limit
+    return max(1, min(limit, int(rate_limiter.rate * seconds)))
+
+
+def drain_outbox(
+    limit: int = OUTBOX_CLAIM_SIZE,
+    rate_limiter: Optional[TokenBucket] = None,
+    event: Optional[Event] = None,
+    max_seconds: Optional[float] = None,
+) -> List[Dict]:
+    """Claim one batch of due outbox rows (of event, or of every event), send them and record the outcome.
+
+    The claim is sized so that, at the rate limit, it is sent within max_seconds and well
+    before OUTBOX_CLAIM_TIMEOUT hands its tail to another worker, and never exceeds the
+    shared_send_budget left to every worker together; nothing is claimed while another
+    writer holds the lock. Rows are recorded after each SMTP batch. Failures are retried with exponential backoff until
+    OUTBOX_MAX_ATTEMPTS, after which the row is marked failed.
+    """
+    if rate_limiter is None:
+        rate_limiter = default_rate_limiter()
+    seconds = OUTBOX_CLAIM_TIMEOUT.total_seconds() / 2
+    if max_seconds is not None:
+        seconds = min(seconds, max_seconds)
+    limit = rate_capped(limit, rate_limiter, seconds)
+    try:
+        # Budget and claim under the lock, so two workers never spend the same budget.
+        with write_lock():
+            budget = shared_send_budget()
+            if budget is not None:
+                limit = min(limit, budget)
+            claimed = claim_outbox(limit, event=event) if limit else []
+    except WriteLockTimeout:
+        return []
+    if not claimed:
+        return []
+
+    by_sender: Dict[str, List[OutboxMessage]] = {}
+    for row in claimed:
+        by_sender.setdefault(row.sender_email or settings.DEFAULT_FROM_EMAIL, []).append(row)
+
+    results = []
+    for sender_email, rows in by_sender.items():
+        def record(batch, rows=rows):
+            _record_outcome([(rows[idx], result) for idx, result in batch])
+
+        participants = [row.participant for row in rows]
+        results.extend(dispatch_emails(participants, sender_email, rate_limiter=rate_limiter, on_batch=record))
+    return results
+
+
+def _record_outcome(outcome: List[Tuple[OutboxMessage, Dict]]) -> None:
+    now = timezone.now()
+    rows = []
+    for row, result in outcome:
+        row.attempts += 1
+        row.claim_token = ""
+        if result["status"] == "sent":
+            row.status = OutboxMessage.STATUS_SENT
+            row.sent_at = now
+            row.last_error = ""
+        else:
+            row.last_error = result["message"]
+            if row.attempts >= OUTBOX_MAX_ATTEMPTS:
+                row.status = OutboxMessage.STATUS_FAILED
+            else:
+                row.status = OutboxMessage.STATUS_PENDING
+                delay = min(OUTBOX_BACKOFF_SECONDS * 2 ** (row.attempts - 1), OUTBOX_MAX_BACKOFF_SECONDS)
+                row.next_attempt_at = now + timedelta(seconds=delay)
+        rows.append(row)
+    with write_lock(timeout=math.inf):
+        OutboxMessage.objects.bulk_update(rows, ["status", "attempts", "sent_at", "last_error", "next_attempt_at", "claim_token"])
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def default_rate_limiter() -> Optional[TokenBucket]:
+    """Process-wide bucket sized by HACKATHON_EMAIL_RATE_PER_MINUTE (None disables it)."""
+    global _rate_limiter
+    rate = getattr(settings, "HACKATHON_EMAIL_RATE_PER_MINUTE", None)
+    if not rate:
+        return None
+    with _rate_limiter_lock:
+        if _rate_limiter is None or _rate_limiter.rate != rate / 60.0:
+            _rate_limiter = TokenBucket(rate)
+        return _rate_limiter
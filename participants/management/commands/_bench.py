@@ -0,0 +1,232 @@
+"""Shared helpers for the bench_* management commands."""
+import multiprocessing
+import random
+import resource
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from openpyxl import Workbook
+
+from participants.utils import USEFUL_COLUMNS, _enrich_participant
+
+# Value -> relative frequency, roughly as seen in the registration form answers.
+LANGUAGES = {
+    "Francais": 45,
+    "Les deux": 25,
+    "Anglais": 12,
+    "French": 4,
+    "English": 3,
+    "fr": 3,
+    "FR/EN": 2,
+    "": 6,
+}
+LEVELS = {"B1": 14, "B2": 20, "B3": 26, "M1": 14, "M2": 11, "b3": 4, "Doctorat": 2, "": 9}
+SKILLS = {
+    "DEVELOPPEMENT BACKEND": 14,
+    "DEVELOPPEMENT FRONTEND": 16,
+    "DEVELOPPEMENT FULLSTACK": 9,
+    "MODELISATION DES SYSTEMES D'INFORMATION": 6,
+    "SECURITE RESEAUX": 7,
+    "COMMUNITY MANAGEMENT": 10,
+    "MEDIA BUYER": 4,
+    "STORYTELLING": 6,
+    "COPYWRITING": 5,
+    "DESIGN UI/UX": 12,
+    "GESTION DE PROJET": 11,
+}
+# How many skills a registrant ticks: 0 to 3.
+SKILL_COUNTS = {0: 10, 1: 35, 2: 35, 3: 20}
+
+
+def _weighted(rng: random.Random, weights: Dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def synthetic_rows(count: int, seed: int = 0) -> List[Dict]:
+    """Raw registration rows shaped like the first sheet of the real form."""
+    rng = random.Random(seed)
+    rows = []
+    for idx in range(count):
+        wanted = _weighted(rng, SKILL_COUNTS)
+        skills = []
+        while len(skills) < wanted:
+            skill = _weighted(rng, SKILLS)
+            if skill not in skills:
+                skills.append(skill)
+        rows.append(
+            {
+                "NOM ET PRENOM": f"Participant {idx}",
+                "Email Address": f"participant{idx}@example.com",
+                "LANGUE": _weighted(rng, LANGUAGES),
+                "NIVEAU D'ETUDES": _weighted(rng, LEVELS),
+                "VOS COMPETENCES": rng.choice([", ", "; ", "\n"]).join(skills),
+            }
+        )
+    return rows
+
+
+def grouped_records(size: int, seed: int = 0):
+    """Enriched synthetic records split into teams of 5, for imports of any size.
+
+    The rows are grouped by hand, in sheet order, so import benchmarks get the same
+    teams at every size without paying for assign_teams. Returns (records, teams) as
+    import_participants expects them.
+    """
+    records = [_enrich_participant({**row, "uid": f"p{idx}"}) for idx, row in enumerate(synthetic_rows(size, seed))]
+    teams = []
+    for start in range(0, size, 5):
+        name = f"TEAM {start // 5 + 1}"
+        members = records[start:start + 5]
+        for member in members:
+            member.team = name
+        teams.append({"name": name, "display_name": name, "members": members})
+    return records, teams
+
+
+@contextmanager
+def isolated_database(verbosity: int = 0, path=None):
+    """Run the body against a throwaway test database, never db.sqlite3.
+
+    The test database lives in memory unless a file path is given (needed to share it
+    with other processes).
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    old_test_name = test_settings.get("NAME")
+    if path is not None:
+        test_settings["NAME"] = str(path)
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings["NAME"] = old_test_name
+        teardown_test_environment()
+
+
+@contextmanager
+def stopwatch():
+    """Yield a dict whose "seconds" key is filled when the block exits."""
+    result = {"seconds": 0.0}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+
+
+@contextmanager
+def count_queries():
+    """Count every SQL statement, without CaptureQueriesContext's 9000-query cap."""
+    result = {"queries": 0}
+
+    def wrapper(execute, sql, params, many, context):
+        result["queries"] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield result
+
+
+def write_workbook(rows: List[Dict], path) -> None:
+    """Write rows to an .xlsx laid out like the registration export."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Form responses 1")
+    headers = ["Timestamp", *USEFUL_COLUMNS, "TELEPHONE"]
+    sheet.append(headers)
+    for idx, row in enumerate(rows):
+        sheet.append(["2025-12-01 10:00:00", *(row[col] for col in USEFUL_COLUMNS), f"+237 6{idx:08d}"])
+    workbook.save(path)
+
+
+def run_in_child(func, *args):
+    """Run func in a forked process and return (result, peak RSS growth in MiB)."""
+    context = multiprocessing.get_context("fork")
+    with context.Pool(1) as pool:
+        return pool.apply(_measure_child, (func, args))
+
+
+def _measure_child(func, args):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = func(*args)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result, (after - before) / 1024
+
+
+class _SmtpSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for Django's backend: accept and count every message."""
+
+    def handle(self):
+        sink = self.server
+        with sink.lock:
+            sink.connections += 1
+        time.sleep(sink.connect_delay)
+        self.wfile.write(b"220 sink ESMTP\r\n")
+        in_data = False
+        for line in self.rfile:
+            if in_data:
+                if line.rstrip(b"\r\n") == b".":
+                    in_data = False
+                    time.sleep(sink.message_delay)
+                    with sink.lock:
+                        sink.received += 1
+                    self.wfile.write(b"250 OK queued\r\n")
+                continue
+            command = line[:4].upper()
+            if command == b"EHLO":
+                self.wfile.write(b"250-sink\r\n250 8BITMIME\r\n")
+            elif command == b"DATA":
+                in_data = True
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+class _SmtpSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+@contextmanager
+def smtp_sink(connect_delay: float = 0.0, message_delay: float = 0.0):
+    """Local SMTP stand-in; connect_delay mimics the TLS handshake of the real relay.
+
+    Yields the server (with .port, .connections and .received) while EMAIL_* settings
+    point Django's SMTP backend at it.
+    """
+    server = _SmtpSink(("127.0.0.1", 0), _SmtpSinkHandler)
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.received = 0
+    server.connect_delay = connect_delay
+    server.message_delay = message_delay
+    server.port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=server.port,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+            EMAIL_USE_SSL=False,
+            EMAIL_USE_TLS=False,
+        ):
+            yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(",") if size.strip()]
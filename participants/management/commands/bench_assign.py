@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from participants.utils import assign_teams, enrich_participants
+
+from ._bench import parse_sizes, stopwatch, synthetic_rows
+
+
+class Command(BaseCommand):
+    help = "Time assign_teams on synthetic participants."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,100000")
+        parser.add_argument("--team-size", type=int, default=5)
+
+    def handle(self, *args, **options):
+        for size in parse_sizes(options["sizes"]):
+            participants = enrich_participants(synthetic_rows(size))
+            with stopwatch() as timer:
+                teams = assign_teams(participants, team_size=options["team_size"])
+            placed = sum(len(team["members"]) for team in teams)
+            self.stdout.write(f"rows={size:>7} teams={len(teams):>6} placed={placed:>7} seconds={timer['seconds']:.3f}")
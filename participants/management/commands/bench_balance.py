@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from participants.balancing import optimize_teams, team_objective
+from participants.utils import assign_teams, enrich_participants
+
+from ._bench import parse_sizes, stopwatch, synthetic_rows
+
+
+class Command(BaseCommand):
+    help = "Report the balancing objective reached by optimize_teams for growing time budgets."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,100000")
+        parser.add_argument("--budgets", default="0.1,0.5,1,2")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        budgets = [float(value) for value in options["budgets"].split(",")]
+        for size in parse_sizes(options["sizes"]):
+            participants = enrich_participants(synthetic_rows(size))
+            greedy = team_objective(assign_teams(participants, seed=options["seed"]))
+            self.stdout.write(f"rows={size:>7} budget=greedy objective={greedy:.1f}")
+            for budget in budgets:
+                teams = assign_teams(participants, seed=options["seed"])
+                with stopwatch() as timer:
+                    optimize_teams(teams, time_budget=budget, seed=options["seed"])
+                self.stdout.write(
+                    f"rows={size:>7} budget={budget:<6} objective={team_objective(teams):.1f} seconds={timer['seconds']:.2f}"
+                )
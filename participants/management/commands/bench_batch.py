@@ -0,0 +1,49 @@
+import os
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from participants.batch import expand_sources, merge_parsed, parse_sources
+
+from ._bench import parse_sizes, stopwatch, synthetic_rows, write_workbook
+
+
+def _write_sources(directory, files, rows_per_file, overlap):
+    """One workbook per school; `overlap` of each file's rows re-register from the previous file."""
+    paths = []
+    for number in range(files):
+        rows = synthetic_rows(rows_per_file, seed=number)
+        shift = int(rows_per_file * (1 - overlap))
+        for idx, row in enumerate(rows):
+            row["Email Address"] = f"participant{number * shift + idx}@example.com"
+        path = Path(directory) / f"ecole-{number}.xlsx"
+        write_workbook(rows, path)
+        paths.append((str(path), path.name))
+    return paths
+
+
+class Command(BaseCommand):
+    help = "Measure multi-file parsing with 1 to N worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--files", type=int, default=8)
+        parser.add_argument("--rows", type=int, default=12500, help="Rows per workbook.")
+        parser.add_argument("--workers", default="1,2,4,8")
+        parser.add_argument("--overlap", type=float, default=0.05, help="Share of rows duplicated across files.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"cpus={os.cpu_count()} files={options['files']} rows/file={options['rows']}")
+        with tempfile.TemporaryDirectory() as directory:
+            sources = expand_sources(_write_sources(directory, options["files"], options["rows"], options["overlap"]))
+            baseline = None
+            for workers in parse_sizes(options["workers"]):
+                with stopwatch() as timer:
+                    results = parse_sources(sources, workers=workers)
+                with stopwatch() as merge_timer:
+                    merged, _, stats = merge_parsed(results)
+                baseline = baseline or timer["seconds"]
+                self.stdout.write(
+                    f"workers={workers:>2} parse={timer['seconds']:.2f}s merge={merge_timer['seconds']:.2f}s "
+                    f"speedup={baseline / timer['seconds']:.2f}x rows={len(merged)} duplicates={stats['duplicates']}"
+                )
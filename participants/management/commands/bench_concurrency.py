@@ -0,0 +1,96 @@
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from participants.importer import import_participants
+
+from ._bench import grouped_records, isolated_database, stopwatch
+
+
+def _import_in_child(records, teams, started):
+    # Forked like a second gunicorn worker: it opens its own connection on first query.
+    started.set()
+    import_participants(records, teams)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure_reads_during_import(records, teams, urls):
+    """Import in a forked process while this one keeps GETting urls; return the read stats."""
+    connections.close_all()
+    context = multiprocessing.get_context("fork")
+    started = context.Event()
+    writer = context.Process(target=_import_in_child, args=(records, teams, started))
+    client = Client()
+    latencies, errors = [], 0
+    with stopwatch() as timer:
+        writer.start()
+        started.wait()
+        while writer.is_alive():
+            for url in urls:
+                begin = time.perf_counter()
+                try:
+                    ok = client.get(url).status_code == 200
+                except OperationalError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - begin)
+                else:
+                    errors += 1
+        writer.join()
+    return {
+        "reads": len(latencies),
+        "errors": errors,
+        "p50": _percentile(latencies, 50) if latencies else None,
+        "p95": _percentile(latencies, 95) if latencies else None,
+        "max": max(latencies) if latencies else None,
+        "import_seconds": timer["seconds"],
+        "writer_exit": writer.exitcode,
+    }
+
+
+class Command(BaseCommand):
+    help = "Measure dashboard read latency while another process imports, for each SQLite journal mode."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20000)
+        parser.add_argument("--journal-modes", default="WAL,DELETE")
+        parser.add_argument(
+            "--busy-timeout",
+            type=float,
+            default=getattr(settings, "HACKATHON_SQLITE_BUSY_TIMEOUT", 20),
+            help="Seconds a read waits on the writer's lock before failing.",
+        )
+
+    def handle(self, *args, **options):
+        records, teams = grouped_records(options["rows"])
+        for mode in [mode.strip().upper() for mode in options["journal_modes"].split(",") if mode.strip()]:
+            with tempfile.TemporaryDirectory() as workdir, override_settings(
+                HACKATHON_SQLITE_JOURNAL_MODE=mode,
+                HACKATHON_SQLITE_BUSY_TIMEOUT=options["busy_timeout"],
+                HACKATHON_WRITE_LOCK_FILE=Path(workdir) / "write.lock",
+            ), isolated_database(path=Path(workdir) / "bench.sqlite3"):
+                # Start from a populated database so every read has real pages to go through.
+                import_participants(records, teams)
+                stats = measure_reads_during_import(records, teams, [reverse("dashboard"), reverse("participants_api")])
+
+            def ms(value):
+                return f"{value * 1000:8.1f}ms" if value is not None else "       -"
+
+            self.stdout.write(
+                f"journal={mode:<8} rows={options['rows']} import={stats['import_seconds']:.2f}s "
+                f"reads={stats['reads']:>5} errors={stats['errors']:>3} "
+                f"p50={ms(stats['p50'])} p95={ms(stats['p95'])} max={ms(stats['max'])}"
+                + (f" writer_exit={stats['writer_exit']}" if stats["writer_exit"] else "")
+            )
@@ -0,0 +1,61 @@
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand
+
+from participants.events import default_event
+from participants.mailing import dispatch_emails
+from participants.models import Participant
+from participants.utils import build_email_content
+
+from ._bench import isolated_database, parse_sizes, smtp_sink, stopwatch
+
+
+def _legacy_send(participants, sender_email):
+    """The one-connection-per-message loop send_emails_api used before dispatch_emails."""
+    for person in participants:
+        subject, body = build_email_content(person.language_raw, person.full_name)
+        send_mail(subject, body, sender_email, [person.email], fail_silently=False)
+        person.email_sent = True
+        person.save(update_fields=["email_sent"])
+
+
+class Command(BaseCommand):
+    help = "Compare email throughput of dispatch_emails and the sequential send_mail loop on a local SMTP sink."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="200,1000")
+        parser.add_argument("--connect-delay", type=float, default=0.02, help="Simulated handshake, in seconds.")
+        parser.add_argument("--message-delay", type=float, default=0.002, help="Simulated relay time per message.")
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=50)
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            event = default_event()
+            for size in parse_sizes(options["sizes"]):
+                runs = (
+                    ("legacy", lambda people: _legacy_send(people, "hackathon@example.com")),
+                    (
+                        "pooled",
+                        lambda people: dispatch_emails(
+                            people,
+                            "hackathon@example.com",
+                            concurrency=options["concurrency"],
+                            batch_size=options["batch_size"],
+                        ),
+                    ),
+                )
+                for label, run in runs:
+                    Participant.objects.all().delete()
+                    Participant.objects.bulk_create(
+                        Participant(
+                            event=event, full_name=f"Participant {idx}", email=f"p{idx}@example.com", language_raw="Les deux"
+                        )
+                        for idx in range(size)
+                    )
+                    people = list(Participant.objects.all())
+                    with smtp_sink(options["connect_delay"], options["message_delay"]) as sink, stopwatch() as timer:
+                        run(people)
+                    self.stdout.write(
+                        f"{label:>6} messages={sink.received:>6} connections={sink.connections:>6} "
+                        f"seconds={timer['seconds']:.2f} msg/s={sink.received / timer['seconds']:.0f}"
+                    )
@@ -0,0 +1,70 @@
+import io
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+from participants.utils import USEFUL_COLUMNS, assign_teams, build_report_file, enrich_participants
+
+from ._bench import parse_sizes, run_in_child, synthetic_rows
+
+
+def _legacy_report(participants, teams):
+    """The in-memory Workbook + BytesIO report export_excel used before write-only mode."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "General"
+    ws.append(USEFUL_COLUMNS + ["Team", "Role", "Email envoye"])
+    for cell in ws[1]:
+        cell.font = Font(bold=True)
+    for person in participants:
+        ws.append([person.get(col, "") for col in USEFUL_COLUMNS] + [person.get("team") or "Non assigne", "Membre", "Non"])
+    for team in teams:
+        sheet = wb.create_sheet(team["name"])
+        sheet["A1"] = "Nom de l'equipe / Team name:"
+        sheet["B1"] = team["display_name"]
+        sheet["A2"] = "Encadrant"
+        sheet["B2"] = "Non assigne"
+        sheet.append([])
+        sheet.append(["Nom complet", "Email", "Langue", "Niveau", "Competences", "Role"] + [f"Atelier {i}" for i in range(1, 9)] + ["Total (/20)"])
+        for row_idx, member in enumerate(team["members"], start=5):
+            sheet.append([member["NOM ET PRENOM"], member["Email Address"], member["language_raw"], member["academic_level"], ", ".join(member["skills_list"]), "Membre"] + [""] * 9)
+            sheet[f"O{row_idx}"] = f'=IF(COUNT(G{row_idx}:N{row_idx})=0,"",ROUND(AVERAGE(G{row_idx}:N{row_idx}),2))'
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return len(buffer.getvalue())
+
+
+def _streamed_report(participants, teams):
+    handle = build_report_file(participants, teams)
+    try:
+        return os.fstat(handle.fileno()).st_size
+    finally:
+        handle.close()
+
+
+def _timed(func, size):
+    participants = enrich_participants(synthetic_rows(size))
+    teams = assign_teams(participants, seed=0)
+    start = time.perf_counter()
+    file_size = func(participants, teams)
+    return file_size, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = "Compare memory and latency of the write-only report against the in-memory workbook."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000")
+
+    def handle(self, *args, **options):
+        for size in parse_sizes(options["sizes"]):
+            for label, func in (("legacy", _legacy_report), ("stream", _streamed_report)):
+                (file_size, seconds), peak_mib = run_in_child(_timed, func, size)
+                self.stdout.write(
+                    f"{label:>6} rows={size:>7} seconds={seconds:.2f} file={file_size / 2**20:.1f}MiB "
+                    f"peak_rss_growth={peak_mib:.0f}MiB"
+                )
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+
+from participants.events import default_event
+from participants.importer import import_participants
+from participants.models import Participant, Team
+
+from ._bench import count_queries, grouped_records, isolated_database, parse_sizes, stopwatch
+
+
+def _legacy_import(teams_assigned):
+    """The per-row loop the dashboard used before import_participants."""
+    event = default_event()
+    Participant.objects.all().delete()
+    team_map = {t.code: t for t in Team.objects.all()}
+    for team_info in teams_assigned:
+        team = team_map.get(team_info["name"]) or Team(event=event, code=team_info["name"])
+        team.display_name = team_info.get("display_name") or team.code
+        team.save()
+        team_map[team.code] = team
+        for member in team_info.get("members", []):
+            Participant.objects.create(
+                event=event,
+                full_name=member.get("NOM ET PRENOM") or "",
+                email=member.get("Email Address") or "",
+                language_raw=member.get("language_raw", ""),
+                academic_level=member.get("academic_level", ""),
+                competences_raw=member.get("VOS COMPETENCES", ""),
+                skills_list=member.get("skills_list", []),
+                language_fr=member.get("language_fr", False),
+                language_en=member.get("language_en", False),
+                is_dev=member.get("is_dev", False),
+                is_marketing=member.get("is_marketing", False),
+                academic_score=member.get("academic_score", 0),
+                email_sent=member.get("email_sent", False),
+                is_leader=member.get("is_leader", False),
+                team=team,
+                uid=member.get("uid", ""),
+            )
+
+
+class Command(BaseCommand):
+    help = "Compare query count and wall time of the bulk import against the per-row loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,50000")
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            for size in parse_sizes(options["sizes"]):
+                parsed, teams = grouped_records(size)
+
+                for label, run in (
+                    ("legacy", lambda: _legacy_import(teams)),
+                    ("bulk", lambda: import_participants(parsed, teams)),
+                ):
+                    with count_queries() as queries, stopwatch() as timer:
+                        run()
+                    self.stdout.write(
+                        f"{label:>6} rows={size:>6} queries={queries['queries']:>6} seconds={timer['seconds']:.3f}"
+                    )
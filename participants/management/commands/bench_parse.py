@@ -0,0 +1,59 @@
+import os
+import tempfile
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from participants.utils import USEFUL_COLUMNS, _clean_text, _enrich_participant, parse_participants, read_participants
+
+from ._bench import parse_sizes, run_in_child, synthetic_rows, write_workbook
+
+
+def _legacy_parse(path):
+    """The read_excel + iterrows parser used before the streaming reader."""
+    frame = pd.read_excel(path).fillna("")
+    columns = [col for col in USEFUL_COLUMNS if col in frame.columns]
+    participants = []
+    for idx, (_, row) in enumerate(frame.iterrows()):
+        record = {col: _clean_text(row[col]) for col in columns}
+        record["uid"] = f"p{idx}"
+        participants.append(_enrich_participant(record))
+    return participants
+
+
+def _wrapper_parse(path):
+    with open(path, "rb") as handle:
+        participants, _ = parse_participants(handle)
+    return participants
+
+
+def _streaming_parse(path):
+    """Drain the generator without keeping records, as a streaming consumer would."""
+    with open(path, "rb") as handle:
+        _, records = read_participants(handle)
+        return range(sum(1 for _ in records))
+
+
+def _timed_count(func, path):
+    start = time.perf_counter()
+    count = len(func(path))
+    return count, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = "Compare peak RSS and rows/sec of the streaming .xlsx reader against pandas read_excel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,50000")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in parse_sizes(options["sizes"]):
+                path = os.path.join(tmp, f"registrations_{size}.xlsx")
+                write_workbook(synthetic_rows(size), path)
+                for label, func in (("pandas", _legacy_parse), ("list", _wrapper_parse), ("stream", _streaming_parse)):
+                    (count, seconds), peak_mib = run_in_child(_timed_count, func, path)
+                    self.stdout.write(
+                        f"{label:>6} rows={count:>6} rows/s={count / seconds:>9.0f} peak_rss_growth={peak_mib:.1f}MiB"
+                    )
@@ -0,0 +1,83 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Modules a web worker must not load before it parses or writes a workbook.
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl")
+
+# Boots the WSGI application like a fresh gunicorn worker and serves one request.
+_PROBE = """
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+ready = time.perf_counter()
+environ = {"PATH_INFO": sys.argv[1]}
+setup_testing_defaults(environ)
+status = []
+response = application(environ, lambda code, headers, exc_info=None: status.append(code))
+b"".join(response)
+response.close()
+done = time.perf_counter()
+json.dump({
+    "setup_ms": (ready - start) * 1000,
+    "first_response_ms": (done - start) * 1000,
+    "status": int(status[0].split()[0]),
+    "heavy": [name for name in sys.argv[2:] if name in sys.modules],
+}, sys.stdout)
+"""
+
+
+def _top_imports(importtime_log: str, count: int):
+    """Slowest top-level imports (cumulative ms) from a `python -X importtime` log."""
+    top = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and not name[1:].startswith(" "):
+            top.append((name.strip(), int(cumulative) / 1000))
+    return sorted(top, key=lambda item: item[1], reverse=True)[:count]
+
+
+def measure_startup(url: str = "/metrics", top: int = 8):
+    """Start a new interpreter, boot Django and time its first response to url."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, url, *HEAVY_MODULES],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(completed.stdout)
+    result["top_imports"] = _top_imports(completed.stderr, top)
+    return result
+
+
+class Command(BaseCommand):
+    help = "Time a cold worker start (python -X importtime) up to its first response and list heavy imports."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--url", default="/metrics")
+        parser.add_argument("--top", type=int, default=8)
+
+    def handle(self, *args, **options):
+        runs = [measure_startup(options["url"], options["top"]) for _ in range(max(1, options["runs"]))]
+        last = runs[-1]
+        self.stdout.write(
+            f"url={options['url']} status={last['status']} runs={len(runs)} "
+            f"setup={statistics.median(r['setup_ms'] for r in runs):.0f}ms "
+            f"first_response={statistics.median(r['first_response_ms'] for r in runs):.0f}ms "
+            f"heavy={','.join(last['heavy']) or '-'}"
+        )
+        for name, ms in last["top_imports"]:
+            self.stdout.write(f"  {name:<40} {ms:8.1f}ms")
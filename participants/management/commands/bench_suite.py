@@ -0,0 +1,227 @@
+import json
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core import mail
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from participants.events import default_event
+from participants.importer import delete_participants, import_participants, participant_from_record
+from participants.mailing import drain_outbox
+from participants.models import Participant, Team
+from participants.placement import place_unassigned
+from participants.skills import apply_skill_categories
+from participants.utils import _enrich_participant, assign_teams, build_report_workbook, parse_participants
+from participants.views import build_teams_from_db
+
+from ._bench import count_queries, isolated_database, parse_sizes, stopwatch, synthetic_rows, write_workbook
+
+# Allowed queries per stage: a fixed part plus a part per 1000 participants. Page-sized
+# endpoints must stay flat; bulk stages may only grow with the number of batches.
+QUERY_BUDGETS = {
+    "import": (20, 25),
+    "build_teams_from_db": (3, 1),
+    "place_unassigned": (12, 0),
+    "dashboard": (5, 0),
+    "participants_api": (3, 0),
+    "teams_api": (4, 0),
+    # Second loads, served from the fragment cache: only the event and its data version.
+    "dashboard_cached": (3, 0),
+    "participants_api_cached": (2, 0),
+    "teams_api_cached": (2, 0),
+    "skills_api": (2, 0),
+    "search_api": (4, 0),
+    "export": (6, 0),
+    # One bounded claim in the request, whatever the size; drain_outbox records each SMTP batch.
+    "send_emails": (30, 0),
+    "drain_outbox": (5, 75),
+}
+REGRESSION_RATIO = 1.2
+# Registrations that arrive after the teams are formed, placed incrementally.
+LATE_REGISTRANTS = 5
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class _Recorder:
+    """Time, count queries and optionally trace Python allocations of each stage."""
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.stages = {}
+
+    def run(self, name, func, *args):
+        if self.trace:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        with count_queries() as queries, stopwatch() as timer:
+            result = func(*args)
+        entry = {"seconds": round(timer["seconds"], 4), "queries": queries["queries"]}
+        if self.trace:
+            entry = {"peak_mib": round((tracemalloc.get_traced_memory()[1] - base) / 2**20, 2)}
+        self.stages[name] = entry
+        return result
+
+
+def _check_response(response):
+    if response.status_code != 200:
+        raise CommandError(f"{response.request['PATH_INFO']} answered {response.status_code}")
+    return response
+
+
+def _pipeline(path, size, seed, trace):
+    """Run every stage once on a clean database, in the order an organizer goes through them."""
+    delete_participants(Participant.objects.all())
+    Team.objects.all().delete()
+    mail.outbox = []
+    recorder = _Recorder(trace)
+    client = Client()
+
+    with open(path, "rb") as handle:
+        parsed, _ = recorder.run("parse", parse_participants, handle)
+    raw_rows = synthetic_rows(size, seed)
+    recorder.run("enrich_rows", lambda: [_enrich_participant(row) for row in raw_rows])
+    del raw_rows
+    apply_skill_categories(parsed)
+    teams = recorder.run("assign_teams", lambda: assign_teams(parsed, seed=seed))
+    recorder.run("import", import_participants, parsed, teams)
+    recorder.run("build_teams_from_db", build_teams_from_db)
+    late = [
+        _enrich_participant({**row, "Email Address": f"late{idx}@example.com", "uid": f"late{idx}"})
+        for idx, row in enumerate(synthetic_rows(LATE_REGISTRANTS, seed + 1))
+    ]
+    Participant.objects.bulk_create(participant_from_record(record, None, default_event()) for record in late)
+    recorder.run("place_unassigned", place_unassigned)
+    recorder.run("report", build_report_workbook, parsed, teams)
+    del parsed, teams
+
+    endpoints = [
+        ("dashboard", "dashboard", {}),
+        ("participants_api", "participants_api", {"language": "fr"}),
+        ("teams_api", "teams_api", {}),
+        ("skills_api", "skills_api", {}),
+        ("search_api", "search_api", {"q": "participant 12"}),
+        ("export", "export_excel", {}),
+        ("dashboard_cached", "dashboard", {}),
+        ("participants_api_cached", "participants_api", {"language": "fr"}),
+        ("teams_api_cached", "teams_api", {}),
+    ]
+    for name, url_name, params in endpoints:
+        response = recorder.run(name, client.get, reverse(url_name), params)
+        _check_response(response)
+        if getattr(response, "streaming", False):
+            response.close()
+    _check_response(recorder.run("send_emails", client.post, reverse("send_emails"), {}))
+    recorder.run("drain_outbox", _drain_until_empty)
+    return recorder.stages
+
+
+def _drain_until_empty():
+    # What `manage.py drain_outbox` does with the rows the send request left queued.
+    while drain_outbox():
+        pass
+
+
+def _budget_report(results):
+    report = {}
+    for size, stages in results.items():
+        for name, (fixed, per_thousand) in QUERY_BUDGETS.items():
+            budget = fixed + per_thousand * int(size) // 1000
+            queries = stages[name]["queries"]
+            report.setdefault(size, {})[name] = {"queries": queries, "budget": budget, "ok": queries <= budget}
+    return report
+
+
+class Command(BaseCommand):
+    help = "Time and profile every pipeline stage on synthetic workbooks and write the results as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,100000")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Defaults to var/bench/<commit>.json.")
+        parser.add_argument("--compare", help="Previous results file to diff against.")
+        parser.add_argument(
+            "--no-memory", action="store_true", help="Skip the tracemalloc pass, which reruns every stage much slower."
+        )
+        parser.add_argument("--fail-on-budget", action="store_true", help="Exit with an error when a budget is exceeded.")
+
+    def handle(self, *args, **options):
+        results = {}
+        with tempfile.TemporaryDirectory() as workdir, isolated_database(), override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+            HACKATHON_EMAIL_RATE_PER_MINUTE=None,
+            HACKATHON_EXPORT_CACHE_DIR=str(Path(workdir) / "exports"),
+        ):
+            for size in parse_sizes(options["sizes"]):
+                path = Path(workdir) / f"registrations-{size}.xlsx"
+                write_workbook(synthetic_rows(size, options["seed"]), path)
+                stages = _pipeline(path, size, options["seed"], trace=False)
+                if not options["no_memory"]:
+                    tracemalloc.start()
+                    try:
+                        for name, entry in _pipeline(path, size, options["seed"], trace=True).items():
+                            stages[name].update(entry)
+                    finally:
+                        tracemalloc.stop()
+                results[str(size)] = stages
+                self._print_size(size, stages)
+
+        budgets = _budget_report(results)
+        payload = {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "seed": options["seed"],
+            "results": results,
+            "query_budgets": budgets,
+        }
+        output = Path(options["output"] or settings.BASE_DIR / "var" / "bench" / f"{payload['commit'] or 'results'}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(payload, indent=2, sort_keys=True))
+        self.stdout.write(f"Results written to {output}")
+
+        if options["compare"]:
+            self._compare(json.loads(Path(options["compare"]).read_text()), payload)
+        over = [f"{name}@{size}" for size, stages in budgets.items() for name, entry in stages.items() if not entry["ok"]]
+        if over:
+            message = "Query budget exceeded: " + ", ".join(over)
+            if options["fail_on_budget"]:
+                raise CommandError(message)
+            self.stderr.write(message)
+
+    def _print_size(self, size, stages):
+        for name, entry in stages.items():
+            memory = f" peak={entry['peak_mib']:.1f}MiB" if "peak_mib" in entry else ""
+            self.stdout.write(
+                f"rows={size:>7} {name:<24} seconds={entry['seconds']:.3f} queries={entry['queries']:>5}{memory}"
+            )
+
+    def _compare(self, previous, current):
+        self.stdout.write(f"Compared with {previous.get('commit') or 'previous run'}:")
+        for size, stages in current["results"].items():
+            for name, entry in stages.items():
+                before = previous.get("results", {}).get(size, {}).get(name)
+                if not before:
+                    continue
+                notes = []
+                for key in ("seconds", "peak_mib", "queries"):
+                    if key in entry and before.get(key):
+                        ratio = entry[key] / before[key]
+                        flag = " REGRESSION" if ratio > REGRESSION_RATIO else ""
+                        notes.append(f"{key} {before[key]} -> {entry[key]} (x{ratio:.2f}){flag}")
+                self.stdout.write(f"rows={size:>7} {name:<24} " + "; ".join(notes))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from participants.mailing import OUTBOX_CLAIM_SIZE, drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Send due outbox emails, retrying failures with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=OUTBOX_CLAIM_SIZE, help="Rows claimed per batch.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when idle.")
+        parser.add_argument("--interval", type=float, default=15.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            results = drain_outbox(limit=options["limit"])
+            if results:
+                sent = sum(1 for result in results if result["status"] == "sent")
+                self.stdout.write(f"{sent} envoye(s), {len(results) - sent} en erreur.")
+                continue
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from participants.uploads import process_upload_job
+
+
+class Command(BaseCommand):
+    help = "Import queued uploads (HACKATHON_UPLOAD_RUNNER = 'command'), oldest first."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when idle.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            job = process_upload_job()
+            if job is not None:
+                self.stdout.write(f"{job.file_names}: {job.message}")
+                continue
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,182 @@
+"""In-process counters and histograms exposed in the Prometheus text format.
+
+Values live in the memory of each worker process: with several gunicorn workers every
+scrape sees one worker, so counters are per process (Prometheus sums them per instance).
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, math.inf)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000, 5000, math.inf)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = [
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels
+    ]
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self, items):
+        for key, value in items:
+            yield f"{self.name}_total{_format_labels(zip(self.labelnames, key))} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(set(buckets) | {math.inf}))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][idx] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state["count"] if state else 0
+
+    def _render_samples(self, items):
+        for key, state in items:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(labels + [('le', _format_value(bound))])} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(state['sum'])}"
+            yield f"{self.name}_count{_format_labels(labels)} {state['count']}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+PHASE_SECONDS = REGISTRY.register(
+    Histogram("hackathon_phase_seconds", "Time spent in instrumented processing phases.", ["phase"])
+)
+HTTP_REQUEST_SECONDS = REGISTRY.register(
+    Histogram("hackathon_http_request_seconds", "View latency.", ["view", "method", "status"])
+)
+HTTP_SQL_QUERIES = REGISTRY.register(
+    Histogram("hackathon_http_sql_queries", "SQL statements per request.", ["view"], buckets=QUERY_COUNT_BUCKETS)
+)
+HTTP_SQL_SECONDS = REGISTRY.register(
+    Histogram("hackathon_http_sql_seconds", "Time spent in SQL per request.", ["view"])
+)
+SMTP_MESSAGES = REGISTRY.register(Counter("hackathon_smtp_messages", "Emails handed to SMTP.", ["outcome"]))
+FRAGMENT_CACHE_LOOKUPS = REGISTRY.register(
+    Counter("hackathon_fragment_cache_lookups", "Dashboard fragment cache lookups.", ["fragment", "result"])
+)
+WRITE_LOCK_WAIT_SECONDS = REGISTRY.register(
+    Histogram("hackathon_write_lock_wait_seconds", "Time spent waiting for the database write lock.")
+)
+
+
+class RequestTimings:
+    """Per-request phase totals, reported in the Server-Timing header."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases: Dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("hackathon_request_timings", default=None)
+
+
+@contextmanager
+def collect_timings():
+    """Collect the phases run inside the block (and in threads started with its context)."""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block (or, as a decorator, a function) into hackathon_phase_seconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        PHASE_SECONDS.observe(elapsed, phase=name)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(name, elapsed)
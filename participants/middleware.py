@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import HTTP_REQUEST_SECONDS, HTTP_SQL_QUERIES, HTTP_SQL_SECONDS, collect_timings
+
+
+class _QueryTimer:
+    """execute_wrapper that counts statements and their total duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Record latency and SQL cost per view; optionally report them in Server-Timing.
+
+    Streaming responses are measured up to the point the view returns them, not until
+    the last byte is sent.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = _QueryTimer()
+        start = time.perf_counter()
+        with collect_timings() as timings, connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else None) or "unmatched"
+        HTTP_REQUEST_SECONDS.observe(elapsed, view=view, method=request.method, status=response.status_code)
+        HTTP_SQL_QUERIES.observe(queries.count, view=view)
+        HTTP_SQL_SECONDS.observe(queries.seconds, view=view)
+
+        if getattr(settings, "HACKATHON_SERVER_TIMING", False):
+            entries = [f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} requetes SQL"']
+            entries.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.phases.items())
+            entries.append(f"total;dur={elapsed * 1000:.1f}")
+            response["Server-Timing"] = ", ".join(entries)
+        return response
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:32
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_source_keys(apps, schema_editor):
+    Participant = apps.get_model('participants', 'Participant')
+    rows = list(Participant.objects.all())
+    for row in rows:
+        raw = "\x1f".join(
+            str(value) for value in (row.full_name, row.email, row.language_raw, row.academic_level, row.competences_raw)
+        )
+        row.source_hash = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        email = (row.email or "").strip().lower()
+        row.source_key = f"email:{email}" if email else f"hash:{row.source_hash}"
+    Participant.objects.bulk_update(rows, ['source_key', 'source_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0003_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participant',
+            name='source_hash',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='participant',
+            name='source_key',
+            field=models.CharField(blank=True, db_index=True, max_length=300),
+        ),
+        migrations.RunPython(backfill_source_keys, migrations.RunPython.noop),
+    ]
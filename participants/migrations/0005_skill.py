@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+DEV_SKILLS = [
+    "DEVELOPPEMENT BACKEND",
+    "DEVELOPPEMENT FRONTEND",
+    "DEVELOPPEMENT FULLSTACK",
+    "MODELISATION DES SYSTEMES D'INFORMATION",
+    "SECURITE RESEAUX",
+]
+MARKETING_SKILLS = ["COMMUNITY MANAGEMENT", "MEDIA BUYER", "STORYTELLING", "COPYWRITING"]
+
+
+def seed_and_link_skills(apps, schema_editor):
+    Skill = apps.get_model('participants', 'Skill')
+    Participant = apps.get_model('participants', 'Participant')
+    Link = apps.get_model('participants', 'ParticipantSkill')
+
+    categories = {name: 'dev' for name in DEV_SKILLS}
+    categories.update({name: 'marketing' for name in MARKETING_SKILLS})
+    rows = list(Participant.objects.values_list('pk', 'skills_list'))
+    for _, skills in rows:
+        for name in skills or []:
+            categories.setdefault(name, 'other')
+    Skill.objects.bulk_create([Skill(name=name, category=category) for name, category in categories.items()])
+    skill_ids = dict(Skill.objects.values_list('name', 'pk'))
+    Link.objects.bulk_create(
+        [Link(participant_id=pk, skill_id=skill_ids[name]) for pk, skills in rows for name in dict.fromkeys(skills or [])],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0004_participant_source_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, unique=True)),
+                ('category', models.CharField(choices=[('dev', 'Developpement'), ('marketing', 'Marketing'), ('other', 'Autre')], db_index=True, default='other', max_length=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ParticipantSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='participants.participant')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='participants.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='participant',
+            name='skills',
+            field=models.ManyToManyField(blank=True, related_name='participants', through='participants.ParticipantSkill', to='participants.skill'),
+        ),
+        migrations.AddConstraint(
+            model_name='participantskill',
+            constraint=models.UniqueConstraint(fields=('skill', 'participant'), name='participant_skill_unique'),
+        ),
+        migrations.RunPython(seed_and_link_skills, migrations.RunPython.noop),
+    ]
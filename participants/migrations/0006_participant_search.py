@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:36
+
+import django.db.models.functions.text
+from django.db import OperationalError, migrations, models, transaction
+
+# External-content FTS5 index over the participant table, kept in sync by triggers so that
+# bulk_create, bulk_update and queryset deletes all reach it without application code.
+FTS_STATEMENTS = [
+    """CREATE VIRTUAL TABLE participants_search USING fts5(
+        full_name, email, competences_raw,
+        content='participants_participant', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER participants_search_ai AFTER INSERT ON participants_participant BEGIN
+        INSERT INTO participants_search(rowid, full_name, email, competences_raw)
+        VALUES (new.id, new.full_name, new.email, new.competences_raw);
+    END""",
+    """CREATE TRIGGER participants_search_ad AFTER DELETE ON participants_participant BEGIN
+        INSERT INTO participants_search(participants_search, rowid, full_name, email, competences_raw)
+        VALUES ('delete', old.id, old.full_name, old.email, old.competences_raw);
+    END""",
+    """CREATE TRIGGER participants_search_au AFTER UPDATE OF full_name, email, competences_raw
+    ON participants_participant BEGIN
+        INSERT INTO participants_search(participants_search, rowid, full_name, email, competences_raw)
+        VALUES ('delete', old.id, old.full_name, old.email, old.competences_raw);
+        INSERT INTO participants_search(rowid, full_name, email, competences_raw)
+        VALUES (new.id, new.full_name, new.email, new.competences_raw);
+    END""",
+    "INSERT INTO participants_search(participants_search) VALUES ('rebuild')",
+]
+DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS participants_search_ai",
+    "DROP TRIGGER IF EXISTS participants_search_ad",
+    "DROP TRIGGER IF EXISTS participants_search_au",
+    "DROP TABLE IF EXISTS participants_search",
+]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    try:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            for statement in FTS_STATEMENTS:
+                cursor.execute(statement)
+    except OperationalError:
+        # SQLite built without FTS5: search falls back to the lower() indexes below.
+        pass
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in DROP_STATEMENTS:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0005_skill'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(django.db.models.functions.text.Lower('full_name'), name='participant_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='participant_email_lower_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
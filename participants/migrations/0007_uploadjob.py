@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0006_participant_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_path', models.CharField(max_length=500)),
+                ('original_name', models.CharField(blank=True, max_length=255)),
+                ('mode', models.CharField(max_length=10)),
+                ('delete_missing', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('queued', 'En attente'), ('running', 'En cours'), ('done', 'Termine'), ('failed', 'Echec')], db_index=True, default='queued', max_length=10)),
+                ('phase', models.CharField(blank=True, max_length=20)),
+                ('rows_parsed', models.PositiveIntegerField(default=0)),
+                ('rows_written', models.PositiveIntegerField(default=0)),
+                ('rows_total', models.PositiveIntegerField(blank=True, null=True)),
+                ('columns', models.JSONField(blank=True, default=list)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('message', models.TextField(blank=True)),
+                ('claim_token', models.CharField(blank=True, max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
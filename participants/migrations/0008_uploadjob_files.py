@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:06
+
+from django.db import migrations, models
+
+
+def copy_file_paths(apps, schema_editor):
+    UploadJob = apps.get_model('participants', 'UploadJob')
+    for job in UploadJob.objects.all():
+        job.files = [{'path': job.file_path, 'name': job.original_name}]
+        job.save(update_fields=['files'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0007_uploadjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadjob',
+            name='all_sheets',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='uploadjob',
+            name='files',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(copy_file_paths, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='uploadjob',
+            name='file_path',
+        ),
+        migrations.RemoveField(
+            model_name='uploadjob',
+            name='original_name',
+        ),
+    ]
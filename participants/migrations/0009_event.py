@@ -0,0 +1,159 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:20
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# Rebuilding the participant table on SQLite (new NOT NULL foreign key) drops the FTS5 sync
+# triggers from 0006; they are recreated at the end when the search table exists.
+FTS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS participants_search_ai AFTER INSERT ON participants_participant BEGIN
+        INSERT INTO participants_search(rowid, full_name, email, competences_raw)
+        VALUES (new.id, new.full_name, new.email, new.competences_raw);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS participants_search_ad AFTER DELETE ON participants_participant BEGIN
+        INSERT INTO participants_search(participants_search, rowid, full_name, email, competences_raw)
+        VALUES ('delete', old.id, old.full_name, old.email, old.competences_raw);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS participants_search_au AFTER UPDATE OF full_name, email, competences_raw
+    ON participants_participant BEGIN
+        INSERT INTO participants_search(participants_search, rowid, full_name, email, competences_raw)
+        VALUES ('delete', old.id, old.full_name, old.email, old.competences_raw);
+        INSERT INTO participants_search(rowid, full_name, email, competences_raw)
+        VALUES (new.id, new.full_name, new.email, new.competences_raw);
+    END""",
+    "INSERT INTO participants_search(participants_search) VALUES ('rebuild')",
+]
+
+
+def assign_default_event(apps, schema_editor):
+    Event = apps.get_model('participants', 'Event')
+    Participant = apps.get_model('participants', 'Participant')
+    Team = apps.get_model('participants', 'Team')
+    OutboxMessage = apps.get_model('participants', 'OutboxMessage')
+    UploadJob = apps.get_model('participants', 'UploadJob')
+    DataVersion = apps.get_model('participants', 'DataVersion')
+
+    event, _ = Event.objects.get_or_create(slug='default', defaults={'name': 'Hackathon'})
+    for model in (Participant, Team, OutboxMessage, UploadJob):
+        model.objects.filter(event__isnull=True).update(event=event)
+    DataVersion.objects.filter(key='participants').update(key=f'participants:{event.pk}')
+
+
+def restore_search_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'participants_search'")
+        if cursor.fetchone() is None:
+            return
+        for statement in FTS_TRIGGERS:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0008_uploadjob_files'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(unique=True)),
+                ('name', models.CharField(max_length=120)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='participant',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='participants', to='participants.event'),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='teams', to='participants.event'),
+        ),
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='outbox_messages', to='participants.event'),
+        ),
+        migrations.AddField(
+            model_name='uploadjob',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='upload_jobs', to='participants.event'),
+        ),
+        migrations.RunPython(assign_default_event, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='participant',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='participants', to='participants.event'),
+        ),
+        migrations.AlterField(
+            model_name='team',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='teams', to='participants.event'),
+        ),
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='outbox_messages', to='participants.event'),
+        ),
+        migrations.AlterField(
+            model_name='uploadjob',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='upload_jobs', to='participants.event'),
+        ),
+        migrations.AlterField(
+            model_name='team',
+            name='code',
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='team',
+            constraint=models.UniqueConstraint(fields=('event', 'code'), name='team_code_per_event'),
+        ),
+        migrations.AlterField(
+            model_name='participant',
+            name='source_key',
+            field=models.CharField(blank=True, max_length=300),
+        ),
+        migrations.RemoveIndex(
+            model_name='participant',
+            name='participant_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='participant',
+            name='participant_email_lower_idx',
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(fields=['event', 'source_key'], name='participant_event_source_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(fields=['event', 'team'], name='participant_event_team_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(fields=['event', 'email_sent'], name='participant_event_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(models.F('event'), django.db.models.functions.text.Lower('full_name'), name='participant_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(models.F('event'), django.db.models.functions.text.Lower('email'), name='participant_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outboxmessage',
+            index=models.Index(fields=['event', 'status', 'next_attempt_at'], name='outbox_event_due_idx'),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
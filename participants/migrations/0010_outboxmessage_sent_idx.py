@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0009_event'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outboxmessage',
+            index=models.Index(fields=['sent_at'], name='outbox_sent_idx'),
+        ),
+    ]
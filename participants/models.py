@@ -1,23 +1,67 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+
+class Event(models.Model):
+    """One hackathon or regional round; participants, teams and emails belong to one event.
+
+    Related rows use PROTECT: an event is emptied with importer.clear_event before it can go.
+    """
+
+    slug = models.SlugField(max_length=50, unique=True)
+    name = models.CharField(max_length=120)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
 
 
 class Team(models.Model):
-    code = models.CharField(max_length=20, unique=True)
+    event = models.ForeignKey(Event, on_delete=models.PROTECT, related_name="teams")
+    code = models.CharField(max_length=20)
     display_name = models.CharField(max_length=120, blank=True)
     mentor_name = models.CharField(max_length=120, blank=True)
     mentor_email = models.EmailField(blank=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event", "code"], name="team_code_per_event"),
+        ]
+
     def __str__(self):
         return self.display_name or self.code
 
 
+class Skill(models.Model):
+    """Normalized skill name (as produced by _split_skills) with its category."""
+
+    CATEGORY_DEV = "dev"
+    CATEGORY_MARKETING = "marketing"
+    CATEGORY_OTHER = "other"
+    CATEGORY_CHOICES = [
+        (CATEGORY_DEV, "Developpement"),
+        (CATEGORY_MARKETING, "Marketing"),
+        (CATEGORY_OTHER, "Autre"),
+    ]
+
+    name = models.CharField(max_length=120, unique=True)
+    category = models.CharField(max_length=10, choices=CATEGORY_CHOICES, default=CATEGORY_OTHER, db_index=True)
+
+    def __str__(self):
+        return self.name
+
+
 class Participant(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.PROTECT, related_name="participants")
     full_name = models.CharField(max_length=200, blank=True)
     email = models.EmailField(blank=True)
     language_raw = models.CharField(max_length=50, blank=True)
     academic_level = models.CharField(max_length=10, blank=True)
     competences_raw = models.TextField(blank=True)
     skills_list = models.JSONField(default=list, blank=True)
+    skills = models.ManyToManyField(Skill, blank=True, related_name="participants", through="ParticipantSkill")
     language_fr = models.BooleanField(default=False)
     language_en = models.BooleanField(default=False)
     is_dev = models.BooleanField(default=False)
@@ -27,6 +71,132 @@ class Participant(models.Model):
     is_leader = models.BooleanField(default=False)
     team = models.ForeignKey(Team, null=True, blank=True, on_delete=models.SET_NULL, related_name="participants")
     uid = models.CharField(max_length=32, blank=True)
+    # Identity of the source row across uploads (normalized email, or a content hash when
+    # the email is missing) and a hash of its source fields, used by incremental imports.
+    source_key = models.CharField(max_length=300, blank=True)
+    source_hash = models.CharField(max_length=40, blank=True)
+
+    class Meta:
+        # Every lookup is scoped to one event, so each index leads with it. The lower()
+        # ones serve the prefix-search fallback when the database has no FTS5 (search.py).
+        indexes = [
+            models.Index(fields=["event", "source_key"], name="participant_event_source_idx"),
+            models.Index(fields=["event", "team"], name="participant_event_team_idx"),
+            models.Index(fields=["event", "email_sent"], name="participant_event_sent_idx"),
+            models.Index(F("event"), Lower("full_name"), name="participant_name_lower_idx"),
+            models.Index(F("event"), Lower("email"), name="participant_email_lower_idx"),
+        ]
 
     def __str__(self):
         return self.full_name or "Participant"
+
+
+class ParticipantSkill(models.Model):
+    """Participant <-> Skill link; the unique (skill, participant) index serves skill lookups."""
+
+    # DO_NOTHING for the same fast-delete reason as OutboxMessage.participant.
+    participant = models.ForeignKey(Participant, on_delete=models.DO_NOTHING)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["skill", "participant"], name="participant_skill_unique"),
+        ]
+
+
+class OutboxMessage(models.Model):
+    """One email to deliver to a participant, drained by the outbox worker."""
+
+    KIND_CONFIRMATION = "confirmation"
+    KIND_CHOICES = [(KIND_CONFIRMATION, "Confirmation d'inscription")]
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "En attente"),
+        (STATUS_SENDING, "En cours"),
+        (STATUS_SENT, "Envoye"),
+        (STATUS_FAILED, "Echec"),
+    ]
+
+    # DO_NOTHING keeps Participant deletes on Django's fast path; callers that delete
+    # participants clear their dependent rows first (see importer.delete_participants).
+    participant = models.ForeignKey(Participant, on_delete=models.DO_NOTHING, related_name="outbox_messages")
+    event = models.ForeignKey(Event, on_delete=models.PROTECT, related_name="outbox_messages")
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES, default=KIND_CONFIRMATION)
+    sender_email = models.EmailField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    claim_token = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["participant", "kind"], name="outbox_one_message_per_kind"),
+        ]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+            models.Index(fields=["event", "status", "next_attempt_at"], name="outbox_event_due_idx"),
+            # Rows sent in the last minute count against the shared send rate.
+            models.Index(fields=["sent_at"], name="outbox_sent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} -> {self.participant_id} ({self.status})"
+
+
+class DataVersion(models.Model):
+    """Monotonic counter bumped by every mutation; caches and ETags are keyed on it."""
+
+    key = models.CharField(max_length=50, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key}={self.value}"
+
+
+class UploadJob(models.Model):
+    """Stored workbooks waiting for, or going through, the import pipeline."""
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "En attente"),
+        (STATUS_RUNNING, "En cours"),
+        (STATUS_DONE, "Termine"),
+        (STATUS_FAILED, "Echec"),
+    ]
+
+    event = models.ForeignKey(Event, on_delete=models.PROTECT, related_name="upload_jobs")
+    # [{"path": stored file, "name": uploaded file name}, ...] in upload order.
+    files = models.JSONField(default=list)
+    all_sheets = models.BooleanField(default=False)
+    mode = models.CharField(max_length=10)
+    delete_missing = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    phase = models.CharField(max_length=20, blank=True)
+    rows_parsed = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    rows_total = models.PositiveIntegerField(null=True, blank=True)
+    columns = models.JSONField(default=list, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    message = models.TextField(blank=True)
+    claim_token = models.CharField(max_length=32, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def file_names(self) -> str:
+        return ", ".join(item["name"] for item in self.files)
+
+    def __str__(self):
+        return f"{self.file_names} ({self.status})"
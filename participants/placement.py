@@ -0,0 +1,152 @@
+"""Place late registrants into the existing teams of an event without reshuffling anyone."""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .database import write_lock
+from .events import resolve_event
+from .metrics import phase
+from .models import Event, Participant, Team
+from .utils import CONSTRAINT_FLAGS, TEAM_SIZE
+from .versioning import bump_data_version, data_key
+
+PLACEMENT_BATCH_SIZE = 500
+
+
+class _OpenTeam:
+    """A team with free seats: its size, which constraint flags it already covers and who joined."""
+
+    __slots__ = ("team", "size", "covered", "joined")
+
+    def __init__(self, team: Team, size: int, covered: List[bool]):
+        self.team = team
+        self.size = size
+        self.covered = covered
+        self.joined: List[Participant] = []
+
+    def add(self, person: Participant) -> None:
+        person.team = self.team
+        person.is_leader = False
+        self.size += 1
+        self.covered = [covered or bool(getattr(person, flag)) for covered, flag in zip(self.covered, CONSTRAINT_FLAGS)]
+        self.joined.append(person)
+
+
+def _coverage_gain(person: Participant, slot: _OpenTeam) -> int:
+    # Flags earlier in CONSTRAINT_FLAGS weigh more, in the order assign_teams fills them.
+    gain = 0
+    for idx, flag in enumerate(CONSTRAINT_FLAGS):
+        if getattr(person, flag) and not slot.covered[idx]:
+            gain += 1 << (len(CONSTRAINT_FLAGS) - idx)
+    return gain
+
+
+class _SeatIndex:
+    """Open teams bucketed by the flags they cover, fullest first within a bucket.
+
+    A newcomer's gain only depends on a team's coverage, so picking a team costs one look
+    per coverage pattern (at most 2 ** len(CONSTRAINT_FLAGS)) whatever the team count.
+    """
+
+    def __init__(self, team_size: int):
+        self.team_size = team_size
+        self.buckets: Dict[Tuple[bool, ...], List] = {}
+
+    def push(self, slot: _OpenTeam) -> None:
+        if slot.size < self.team_size:
+            heapq.heappush(self.buckets.setdefault(tuple(slot.covered), []), (-slot.size, slot.team.pk, slot))
+
+    def pop_best(self, person: Participant) -> Optional[_OpenTeam]:
+        """Remove and return the team person should join: best coverage gain, then fullest."""
+        best_key, best_bucket = None, None
+        for bucket in self.buckets.values():
+            if not bucket:
+                continue
+            minus_size, pk, slot = bucket[0]
+            key = (_coverage_gain(person, slot), -minus_size, -pk)
+            if best_key is None or key > best_key:
+                best_key, best_bucket = key, bucket
+        return heapq.heappop(best_bucket)[2] if best_bucket is not None else None
+
+
+def _next_team_number(event: Event) -> int:
+    numbers = [0]
+    for code in event.teams.values_list("code", flat=True):
+        prefix, _, number = code.rpartition(" ")
+        if prefix == "TEAM" and number.isdigit():
+            numbers.append(int(number))
+    return max(numbers) + 1
+
+
+@write_lock()
+@phase("place_participants")
+def place_unassigned(event: Optional[Event] = None, team_size: int = TEAM_SIZE) -> Dict[str, int]:
+    """Put the participants of event that have no team into its current teams.
+
+    Each newcomer joins the team with a free seat whose missing dev / marketing / EN / FR
+    coverage it fills best, ties going to the fullest team so that existing teams are
+    completed before empty ones; a new team is opened only when every team is full. Existing members never move, leaders are re-evaluated only
+    in the teams that received someone, and only the newcomers and replaced leaders are
+    written. Returns the number of people placed, teams touched and teams created.
+    """
+    event = resolve_event(event)
+    counts = {"placed": 0, "teams": 0, "created_teams": 0}
+    with transaction.atomic():
+        newcomers = list(event.participants.filter(team__isnull=True).order_by("pk"))
+        if not newcomers:
+            return counts
+
+        # One grouped query over the (event, team) index loads only the teams with free
+        # seats, with their sizes and coverage.
+        coverage = {
+            f"{flag}_count": Count("participants", filter=Q(**{f"participants__{flag}": True}))
+            for flag in CONSTRAINT_FLAGS
+        }
+        with_seats = event.teams.annotate(size=Count("participants"), **coverage).filter(size__lt=team_size)
+        open_teams = [
+            _OpenTeam(team, team.size, [bool(getattr(team, f"{flag}_count")) for flag in CONSTRAINT_FLAGS])
+            for team in with_seats.order_by("pk")
+        ]
+        seats = _SeatIndex(team_size)
+        for slot in open_teams:
+            seats.push(slot)
+
+        next_number = None
+        for person in newcomers:
+            slot = seats.pop_best(person)
+            if slot is None:
+                if next_number is None:
+                    next_number = _next_team_number(event)
+                code = f"TEAM {next_number}"
+                next_number += 1
+                team = Team.objects.create(event=event, code=code, display_name=code)
+                slot = _OpenTeam(team, 0, [False] * len(CONSTRAINT_FLAGS))
+                open_teams.append(slot)
+                counts["created_teams"] += 1
+            slot.add(person)
+            seats.push(slot)
+
+        # Same rule as build_teams_from_db: best academic score leads, the stored leader
+        # keeps the role on ties.
+        touched = [slot for slot in open_teams if slot.joined]
+        leaders = {
+            p.team_id: p for p in event.participants.filter(team__in=[slot.team for slot in touched], is_leader=True)
+        }
+        demoted = []
+        for slot in touched:
+            best = max(slot.joined, key=lambda p: p.academic_score)
+            leader = leaders.get(slot.team.pk)
+            if leader is None or best.academic_score > leader.academic_score:
+                best.is_leader = True
+                if leader is not None:
+                    leader.is_leader = False
+                    demoted.append(leader)
+
+        Participant.objects.bulk_update(newcomers, ["team", "is_leader"], batch_size=PLACEMENT_BATCH_SIZE)
+        if demoted:
+            Participant.objects.bulk_update(demoted, ["is_leader"], batch_size=PLACEMENT_BATCH_SIZE)
+        bump_data_version(data_key(event.pk))
+        counts["placed"], counts["teams"] = len(newcomers), len(touched)
+    return counts
@@ -0,0 +1,165 @@
+"""The participant record carried from the parsed sheet through team assignment to the export.
+
+A registration sheet can hold 100k rows, so each one is a __slots__ object (about 180
+bytes) instead of a dict of ~20 keys (about 600 bytes plus a skills list). Values that
+repeat across rows (skill tuples, language and level strings) are shared, not copied.
+Code that still speaks the sheet's dict shape goes through get / [] / as_dict, keyed
+like the spreadsheet columns and the old enriched-dict keys.
+"""
+from typing import Dict, Optional, Sequence
+
+# Sheet column -> attribute holding its raw (cleaned) value.
+SOURCE_FIELDS = {
+    "NOM ET PRENOM": "full_name",
+    "Email Address": "email",
+    "LANGUE": "language",
+    "NIVEAU D'ETUDES": "level",
+    "VOS COMPETENCES": "competences",
+}
+# Other spellings of the columns that older sheets and callers used.
+SOURCE_ALIASES = {
+    "Nom": "full_name",
+    "EMAIL": "email",
+    "Langue": "language",
+    "Niveau d'etudes": "level",
+    "Competences": "competences",
+}
+DERIVED_FIELDS = (
+    "uid",
+    "skills_list",
+    "language_raw",
+    "language_fr",
+    "language_en",
+    "is_dev",
+    "is_marketing",
+    "academic_level",
+    "academic_score",
+    "email_sent",
+    "team",
+    "team_display",
+    "is_leader",
+)
+
+_KEYS = {**SOURCE_FIELDS, **{name: name for name in DERIVED_FIELDS}}
+
+
+class ParticipantRecord:
+    """One registrant: raw sheet values, what enrichment derived from them and the team placement."""
+
+    __slots__ = tuple(SOURCE_FIELDS.values()) + DERIVED_FIELDS
+
+    def __init__(
+        self,
+        full_name="",
+        email="",
+        language="",
+        level="",
+        competences="",
+        uid: Optional[str] = None,
+        skills_list: Sequence[str] = (),
+        language_raw: str = "Non precise",
+        language_fr: bool = False,
+        language_en: bool = False,
+        is_dev: bool = False,
+        is_marketing: bool = False,
+        academic_level: str = "NC",
+        academic_score: int = 0,
+        email_sent: bool = False,
+        team: Optional[str] = None,
+        team_display: Optional[str] = None,
+        is_leader: bool = False,
+    ):
+        self.full_name = full_name
+        self.email = email
+        self.language = language
+        self.level = level
+        self.competences = competences
+        self.uid = uid
+        self.skills_list = tuple(skills_list)
+        self.language_raw = language_raw
+        self.language_fr = language_fr
+        self.language_en = language_en
+        self.is_dev = is_dev
+        self.is_marketing = is_marketing
+        self.academic_level = academic_level
+        self.academic_score = academic_score
+        self.email_sent = email_sent
+        self.team = team
+        self.team_display = team_display
+        self.is_leader = is_leader
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ParticipantRecord":
+        """Record from a raw sheet row or an enriched dict; unknown keys are ignored."""
+        record = cls()
+        # Aliases first so that the canonical column wins when a row has both.
+        for keys in (SOURCE_ALIASES, _KEYS):
+            for key, name in keys.items():
+                if key in data:
+                    value = data[key]
+                    setattr(record, name, tuple(value) if name == "skills_list" else value)
+        return record
+
+    @classmethod
+    def from_participant(cls, participant, team=None) -> "ParticipantRecord":
+        """Record of a stored Participant; team is its Team (or None), passed to skip the lookup."""
+        return cls(
+            full_name=participant.full_name,
+            email=participant.email,
+            language=participant.language_raw,
+            level=participant.academic_level,
+            competences=participant.competences_raw,
+            uid=participant.uid,
+            skills_list=participant.skills_list,
+            language_raw=participant.language_raw,
+            language_fr=participant.language_fr,
+            language_en=participant.language_en,
+            is_dev=participant.is_dev,
+            is_marketing=participant.is_marketing,
+            academic_level=participant.academic_level,
+            academic_score=participant.academic_score,
+            email_sent=participant.email_sent,
+            team=team.code if team is not None else None,
+            team_display=(team.display_name or team.code) if team is not None else None,
+            is_leader=participant.is_leader,
+        )
+
+    def copy(self) -> "ParticipantRecord":
+        return ParticipantRecord(*self._values())
+
+    def as_dict(self) -> Dict:
+        """The enriched-dict shape, e.g. for templates or JSON."""
+        return {key: self[key] for key in _KEYS}
+
+    def get(self, key: str, default=None):
+        return self[key] if key in _KEYS else default
+
+    def __getitem__(self, key: str):
+        name = _KEYS[key]
+        value = getattr(self, name)
+        return list(value) if name == "skills_list" else value
+
+    def __setitem__(self, key: str, value) -> None:
+        name = _KEYS[key]
+        setattr(self, name, tuple(value) if name == "skills_list" else value)
+
+    def __contains__(self, key) -> bool:
+        return key in _KEYS
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, ParticipantRecord):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Positional arguments follow __slots__ order: a compact pickle for the parse workers.
+        return (ParticipantRecord, self._values())
+
+    def __repr__(self):
+        return f"ParticipantRecord(uid={self.uid!r}, email={self.email!r}, team={self.team!r})"
+
@@ -0,0 +1,97 @@
+import re
+from typing import List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .events import resolve_event
+from .models import Event, Participant, ParticipantSkill
+
+SEARCH_TABLE = "participants_search"
+SEARCH_TRIGGERS = ("participants_search_ai", "participants_search_ad", "participants_search_au")
+# Column weights for bm25(): a hit in the name ranks above one in the email, then the skills.
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0)
+MAX_SEARCH_TERMS = 8
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a user query into lowercase word tokens (punctuation and FTS syntax dropped)."""
+    return [term.lower() for term in _TERM_PATTERN.findall(query or "")][:MAX_SEARCH_TERMS]
+
+
+def fts_available() -> bool:
+    """True when the FTS5 index created by migration 0006 and its sync triggers exist.
+
+    SQLite drops triggers when a migration rebuilds the participant table; search then
+    falls back to prefix lookups instead of serving a stale index.
+    """
+    if connection.vendor != "sqlite":
+        return False
+    names = (SEARCH_TABLE,) + SEARCH_TRIGGERS
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s)" % ", ".join(["%s"] * len(names)), list(names)
+        )
+        return cursor.fetchone()[0] == len(names)
+
+
+def search_participants(
+    query: str, offset: int = 0, limit: int = 50, use_fts: bool = None, event: Optional[Event] = None
+) -> Tuple[List[Participant], bool]:
+    """Ranked participants of event matching every term of query as a word prefix.
+
+    Returns (participants, has_more). Uses the FTS5 index when present, otherwise
+    indexed prefix lookups on the lowered name and email and on skill names.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+    event = resolve_event(event)
+    if use_fts is None:
+        use_fts = fts_available()
+    if use_fts:
+        ids = _fts_ids(terms, event.pk, offset, limit + 1)
+    else:
+        ids = _prefix_ids(terms, event.pk, offset, limit + 1)
+    by_id = Participant.objects.select_related("team").in_bulk(ids[:limit])
+    return [by_id[pk] for pk in ids[:limit] if pk in by_id], len(ids) > limit
+
+
+def _fts_ids(terms: List[str], event_id: int, offset: int, limit: int) -> List[int]:
+    with connection.cursor() as cursor:
+        cursor.execute(*_fts_query(terms, event_id, offset, limit))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fts_query(terms: List[str], event_id: int, offset: int, limit: int) -> Tuple[str, List]:
+    # Each term is quoted (so user input is never parsed as FTS syntax) and starred for prefix
+    # matching; space-separated phrases are ANDed. The index spans every event, so hits are
+    # joined to their participant row by primary key and filtered on its event. A
+    # `rowid IN (subquery)` filter instead is pushed into the FTS table as one lookup per id.
+    match = " ".join('"%s"*' % term for term in terms)
+    weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+    sql = (
+        f"SELECT s.rowid FROM {SEARCH_TABLE} s "
+        f"JOIN {Participant._meta.db_table} p ON p.id = s.rowid "
+        f"WHERE {SEARCH_TABLE} MATCH %s AND p.event_id = %s "
+        f"ORDER BY bm25({SEARCH_TABLE}, {weights}), s.rowid LIMIT %s OFFSET %s"
+    )
+    return sql, [match, event_id, limit, offset]
+
+
+def _prefix_range(field: str, term: str) -> Q:
+    # A >= / < range instead of LIKE 'term%' so the expression indexes are usable on any backend.
+    return Q(**{f"{field}__gte": term, f"{field}__lt": term + "\uffff"})
+
+
+def _prefix_ids(terms: List[str], event_id: int, offset: int, limit: int) -> List[int]:
+    queryset = Participant.objects.filter(event_id=event_id).annotate(name_lower=Lower("full_name"), email_lower=Lower("email"))
+    for term in terms:
+        skilled = ParticipantSkill.objects.filter(_prefix_range("skill__name", term.upper())).values("participant_id")
+        queryset = queryset.filter(
+            _prefix_range("name_lower", term) | _prefix_range("email_lower", term) | Q(pk__in=skilled)
+        )
+    return list(queryset.order_by("name_lower", "pk").values_list("pk", flat=True)[offset:offset + limit])
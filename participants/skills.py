@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, List, Optional
+
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet
+
+from .events import resolve_event
+from .models import Event, Participant, ParticipantSkill, Skill
+from .records import ParticipantRecord
+from .utils import DEV_KEYWORDS, MARKETING_KEYWORDS
+from .versioning import bump_data_version, data_key
+
+LINK_BATCH_SIZE = 500
+
+SkillLink = ParticipantSkill
+
+
+def default_category(name: str) -> str:
+    if name in DEV_KEYWORDS:
+        return Skill.CATEGORY_DEV
+    if name in MARKETING_KEYWORDS:
+        return Skill.CATEGORY_MARKETING
+    return Skill.CATEGORY_OTHER
+
+
+def load_skill_categories() -> Dict[str, str]:
+    """Skill name -> category as stored in the database."""
+    return dict(Skill.objects.values_list("name", "category"))
+
+
+def apply_skill_categories(
+    records: List[ParticipantRecord], categories: Dict[str, str] = None
+) -> List[ParticipantRecord]:
+    """Set is_dev / is_marketing on enriched records from the stored skill categories."""
+    if categories is None:
+        categories = load_skill_categories()
+    for record in records:
+        found = {categories.get(skill) or default_category(skill) for skill in record.skills_list}
+        record.is_dev = Skill.CATEGORY_DEV in found
+        record.is_marketing = Skill.CATEGORY_MARKETING in found
+    return records
+
+
+def ensure_skills(names: Iterable[str]) -> Dict[str, int]:
+    """Return skill name -> pk, creating missing skills in bulk."""
+    names = set(names)
+    if not names:
+        return {}
+    known = dict(Skill.objects.filter(name__in=names).values_list("name", "pk"))
+    missing = [Skill(name=name, category=default_category(name)) for name in names - known.keys()]
+    if missing:
+        Skill.objects.bulk_create(missing, batch_size=LINK_BATCH_SIZE, ignore_conflicts=True)
+        known = dict(Skill.objects.filter(name__in=names).values_list("name", "pk"))
+    return known
+
+
+def link_skills(participants: List[Participant], replace: bool = False) -> None:
+    """Write the participant <-> skill links for saved participants from their skills_list."""
+    if replace:
+        pks = [p.pk for p in participants]
+        for start in range(0, len(pks), LINK_BATCH_SIZE):
+            SkillLink.objects.filter(participant_id__in=pks[start:start + LINK_BATCH_SIZE]).delete()
+    skill_ids = ensure_skills(skill for p in participants for skill in p.skills_list)
+    links = [
+        SkillLink(participant_id=p.pk, skill_id=skill_ids[skill])
+        for p in participants
+        for skill in dict.fromkeys(p.skills_list)
+    ]
+    SkillLink.objects.bulk_create(links, batch_size=LINK_BATCH_SIZE, ignore_conflicts=True)
+
+
+def refresh_skill_flags(queryset: QuerySet = None) -> int:
+    """Recompute is_dev / is_marketing in SQL from the stored categories (e.g. after an edit)."""
+    queryset = queryset if queryset is not None else Participant.objects.all()
+
+    def has(category):
+        return Exists(SkillLink.objects.filter(participant_id=OuterRef("pk"), skill__category=category))
+
+    updated = queryset.update(is_dev=has(Skill.CATEGORY_DEV), is_marketing=has(Skill.CATEGORY_MARKETING))
+    # The flags show in cached dashboard fragments of every event these people belong to.
+    for event_id in queryset.order_by().values_list("event_id", flat=True).distinct():
+        bump_data_version(data_key(event_id))
+    return updated
+
+
+def participants_with_skill(name: str) -> QuerySet:
+    """Participants who listed `name` (normalized like _split_skills does)."""
+    return Participant.objects.filter(skills__name=name.strip().upper())
+
+
+def skill_summary(event: Optional[Event] = None) -> QuerySet:
+    """Every skill of the catalog with its total and unassigned participant counts within one event.
+
+    Both counts only follow links of participants of event, so skills that nobody in
+    the event listed show 0.
+    """
+    in_event = Q(participants__event=resolve_event(event))
+    return Skill.objects.annotate(
+        participant_count=Count("participants", filter=in_event),
+        unassigned_count=Count("participants", filter=in_event & Q(participants__team__isnull=True)),
+    ).order_by("category", "name")
+
+
+def count_unassigned(category: str, event: Optional[Event] = None) -> int:
+    """How many participants of event without a team have at least one skill of `category`."""
+    return (
+        Participant.objects.filter(event=resolve_event(event), team__isnull=True, skills__category=category)
+        .distinct()
+        .count()
+    )
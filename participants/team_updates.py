@@ -0,0 +1,167 @@
+"""Rename teams and assign mentors in bulk, from the JSON API or from a mentor sheet."""
+import csv
+from typing import Dict, Iterable, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .database import write_lock
+from .events import resolve_event
+from .models import Event, Team
+from .versioning import bump_data_version, data_key
+
+TEAM_FIELDS = ("display_name", "mentor_name", "mentor_email")
+UPDATE_BATCH_SIZE = 500
+# Mentor sheet header (trimmed, lower-cased) -> update key.
+SHEET_COLUMNS = {
+    "equipe": "team",
+    "team": "team",
+    "nom de l'equipe": "display_name",
+    "team name": "display_name",
+    "encadrant": "mentor_name",
+    "mentor": "mentor_name",
+    "email encadrant": "mentor_email",
+    "email": "mentor_email",
+    "mentor email": "mentor_email",
+}
+
+
+class TeamUpdateError(Exception):
+    """Rejected updates; errors holds one {"index", "team", "error"} entry per problem."""
+
+    def __init__(self, errors: List[Dict]):
+        super().__init__("; ".join(f"{e['team'] or e['index']}: {e['error']}" for e in errors))
+        self.errors = errors
+
+
+def clean_team_updates(items) -> List[Dict]:
+    """Validate a list of {"team", "display_name"?, "mentor_name"?, "mentor_email"?} updates.
+
+    Values are trimmed; every problem is collected before TeamUpdateError is raised.
+    """
+    if not isinstance(items, list) or not items:
+        raise TeamUpdateError([{"index": None, "team": None, "error": "Liste 'teams' vide ou absente."}])
+    cleaned, errors = [], []
+    for index, item in enumerate(items):
+        code = item.get("team") if isinstance(item, dict) else None
+        if not isinstance(code, str) or not code.strip():
+            errors.append({"index": index, "team": None, "error": "Equipe manquante."})
+            continue
+        update = {"team": code.strip()}
+        for field in TEAM_FIELDS:
+            if field not in item:
+                continue
+            value = item[field]
+            if value is None:
+                value = ""
+            if not isinstance(value, str):
+                errors.append({"index": index, "team": update["team"], "error": f"{field} doit etre un texte."})
+                continue
+            value = value.strip()
+            if len(value) > Team._meta.get_field(field).max_length:
+                errors.append({"index": index, "team": update["team"], "error": f"{field} trop long."})
+                continue
+            update[field] = value
+        if len(update) == 1:
+            errors.append({"index": index, "team": update["team"], "error": "Rien a modifier."})
+        elif update.get("mentor_email"):
+            try:
+                validate_email(update["mentor_email"])
+            except ValidationError:
+                errors.append({"index": index, "team": update["team"], "error": "Email d'encadrant invalide."})
+        cleaned.append(update)
+    if errors:
+        raise TeamUpdateError(errors)
+    return cleaned
+
+
+def apply_team_updates(items, event: Optional[Event] = None) -> List[Team]:
+    """Apply renames and mentor assignments to the teams of event in one transaction.
+
+    Only the keys present are changed. As in the dashboard forms, an empty display_name
+    or mentor_name keeps the current one, and a team given a mentor email but no mentor
+    name gets "Encadrant". Updates naming an unknown team reject the whole batch.
+    Changed teams are written with a single bulk_update and returned.
+    """
+    event = resolve_event(event)
+    updates = clean_team_updates(items)
+    with write_lock(), transaction.atomic():
+        teams = {team.code: team for team in event.teams.filter(code__in={u["team"] for u in updates})}
+        unknown = [
+            {"index": index, "team": u["team"], "error": "Equipe inconnue."}
+            for index, u in enumerate(updates)
+            if u["team"] not in teams
+        ]
+        if unknown:
+            raise TeamUpdateError(unknown)
+
+        original = {team.pk: _values(team) for team in teams.values()}
+        for update in updates:
+            team = teams[update["team"]]
+            if "display_name" in update:
+                team.display_name = update["display_name"] or team.display_name or team.code
+            if "mentor_email" in update:
+                team.mentor_email = update["mentor_email"]
+            if "mentor_name" in update or "mentor_email" in update:
+                team.mentor_name = update.get("mentor_name") or team.mentor_name or "Encadrant"
+
+        changed = sorted((team for team in teams.values() if _values(team) != original[team.pk]), key=lambda t: t.pk)
+        if changed:
+            Team.objects.bulk_update(changed, TEAM_FIELDS, batch_size=UPDATE_BATCH_SIZE)
+            bump_data_version(data_key(event.pk))
+    return changed
+
+
+def _values(team: Team):
+    return tuple(getattr(team, field) for field in TEAM_FIELDS)
+
+
+def read_team_sheet(uploaded_file) -> List[Dict]:
+    """Updates from a mentor sheet (.csv or .xlsx, first sheet) for apply_team_updates.
+
+    Columns are matched on SHEET_COLUMNS; empty cells leave the field as it is. CSV files
+    may use "," or ";" (French Excel) as separator.
+    """
+    if getattr(uploaded_file, "name", "").lower().endswith(".csv"):
+        text = uploaded_file.read().decode("utf-8-sig")
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = csv.reader(text.splitlines(), dialect)
+        return _sheet_updates(rows)
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        return _sheet_updates(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def _sheet_updates(rows: Iterable) -> List[Dict]:
+    rows = iter(rows)
+    header = next(rows, None) or ()
+    positions = {}
+    for idx, name in enumerate(header):
+        key = SHEET_COLUMNS.get(str(name or "").strip().lower())
+        if key is not None and key not in positions:
+            positions[key] = idx
+    if "team" not in positions:
+        raise TeamUpdateError([{"index": None, "team": None, "error": "Colonne 'Equipe' introuvable."}])
+
+    updates = []
+    for row in rows:
+        values = {key: _cell(row, idx) for key, idx in positions.items()}
+        update = {key: value for key, value in values.items() if value}
+        # Rows without a team or with nothing filled in next to it are skipped.
+        if "team" in update and len(update) > 1:
+            updates.append(update)
+    return updates
+
+
+def _cell(row, idx: int) -> str:
+    value = row[idx] if idx < len(row) else None
+    return "" if value is None else str(value).strip()
@@ -1,3 +1,1335 @@
-from django.test import TestCase
+import io
+import json
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import threading
+import time
 
-# Create your tests here.
+from datetime import timedelta
+
+from pathlib import Path
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+
+from .balancing import optimize_teams, team_objective
+from .batch import expand_sources, merge_parsed, parse_sources
+from .database import WriteLockTimeout, write_lock
+from .events import create_event, default_event
+from .importer import delete_participants, import_participants, sync_participants
+from .mailing import TokenBucket, claim_outbox, dispatch_emails, drain_outbox, enqueue_emails
+from .management.commands._bench import smtp_sink, synthetic_rows, write_workbook
+from .management.commands.bench_startup import measure_startup
+from .management.commands.bench_suite import LATE_REGISTRANTS, _budget_report, _pipeline
+from .metrics import PHASE_SECONDS, SMTP_MESSAGES, Histogram
+from .models import DataVersion, OutboxMessage, Participant, Skill, Team, UploadJob
+from .placement import place_unassigned
+from .records import ParticipantRecord
+from .search import _fts_query, fts_available, search_participants
+from .skills import (
+    apply_skill_categories,
+    count_unassigned,
+    link_skills,
+    participants_with_skill,
+    refresh_skill_flags,
+    skill_summary,
+)
+from .uploads import job_progress, process_upload_job
+from .utils import (
+    _enrich_participant,
+    assign_teams,
+    build_report_workbook,
+    enrich_participants,
+    parse_participants,
+    read_participants,
+)
+from .versioning import data_key, get_data_version
+from .views import build_teams_from_db
+
+
+def make_records(count):
+    records = []
+    for idx in range(count):
+        records.append(
+            _enrich_participant(
+                {
+                    "NOM ET PRENOM": f"Participant {idx}",
+                    "Email Address": f"p{idx}@example.com",
+                    "LANGUE": ("Francais", "Anglais", "Les deux")[idx % 3],
+                    "NIVEAU D'ETUDES": ("B1", "B3", "M2")[idx % 3],
+                    "VOS COMPETENCES": ("DEVELOPPEMENT BACKEND", "COPYWRITING", "")[idx % 3],
+                    "uid": f"p{idx}",
+                }
+            )
+        )
+    return records
+
+
+def data_version(event=None):
+    return get_data_version(data_key((event or default_event()).pk))
+
+
+class ImportParticipantsTests(TestCase):
+    def test_import_replaces_existing_rows_with_batched_queries(self):
+        event = default_event()
+        Participant.objects.create(event=event, full_name="Ancien")
+        Team.objects.create(event=event, code="TEAM 1", display_name="Les Anciens")
+        records = make_records(30)
+        teams = assign_teams(records, {"TEAM 1": "Les Anciens"})
+        data_version()
+
+        with self.assertNumQueries(12):
+            created = import_participants(records, teams)
+
+        self.assertEqual(created, 30)
+        self.assertFalse(Participant.objects.filter(full_name="Ancien").exists())
+        self.assertEqual(Team.objects.get(code="TEAM 1").display_name, "Les Anciens")
+        self.assertEqual(Participant.objects.filter(team__isnull=False).count(), 30)
+        self.assertEqual(Participant.objects.filter(is_leader=True).count(), len(teams))
+
+    def test_reimporting_fewer_people_drops_the_leftover_teams(self):
+        records = make_records(50)
+        import_participants(records, assign_teams(records, seed=1))
+        Team.objects.filter(code="TEAM 1").update(display_name="Les Lions")
+        records = make_records(12)
+        import_participants(records, assign_teams(records, {"TEAM 1": "Les Lions"}, seed=1))
+
+        sizes = dict(Team.objects.annotate(size=Count("participants")).values_list("code", "size"))
+        self.assertEqual(sizes, {"TEAM 1": 5, "TEAM 2": 5, "TEAM 3": 2})
+        self.assertEqual(Team.objects.get(code="TEAM 1").display_name, "Les Lions")
+        self.assertEqual(len(self.client.get(reverse("teams_api")).json()["results"]), 3)
+
+    def test_import_keeps_unassigned_participants(self):
+        records = make_records(3)
+        records[2]["team"] = None
+        teams = [{"name": "TEAM 1", "display_name": "TEAM 1", "members": records[:2]}]
+        for record in records[:2]:
+            record["team"] = "TEAM 1"
+
+        import_participants(records, teams)
+
+        self.assertEqual(Participant.objects.count(), 3)
+        self.assertEqual(Participant.objects.filter(team__isnull=True).count(), 1)
+
+
+def make_workbook(rows, headers=("Timestamp", "NOM ET PRENOM", "Email Address", "LANGUE", "VOS COMPETENCES")):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(list(headers))
+    for row in rows:
+        sheet.append(list(row))
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    buffer.name = "inscriptions.xlsx"
+    return buffer
+
+
+class ReadParticipantsTests(TestCase):
+    def test_streams_only_useful_columns(self):
+        upload = make_workbook(
+            [
+                ("2025-12-01", "Awa Ngono", "awa@example.com", "Les deux", "Developpement backend; Storytelling"),
+                (None, None, None, None, None),
+                ("2025-12-02", "Jean Tchato", None, "Anglais", None),
+            ]
+        )
+
+        columns, records = read_participants(upload)
+        first = next(records)
+
+        self.assertEqual(columns, ["NOM ET PRENOM", "Email Address", "LANGUE", "VOS COMPETENCES"])
+        self.assertNotIn("Timestamp", first)
+        self.assertEqual(first["skills_list"], ["DEVELOPPEMENT BACKEND", "STORYTELLING"])
+        self.assertTrue(first["language_fr"] and first["language_en"])
+        self.assertTrue(first["is_dev"] and first["is_marketing"])
+        second = next(records)
+        self.assertEqual((second["uid"], second["Email Address"]), ("p1", ""))
+        self.assertEqual(list(records), [])
+
+    def test_parse_participants_keeps_list_shape(self):
+        participants, columns = parse_participants(make_workbook([("x", "Awa", "awa@example.com", "fr", "")]))
+
+        self.assertEqual(len(participants), 1)
+        self.assertEqual(participants[0]["academic_level"], "NC")
+        self.assertIn("LANGUE", columns)
+
+    def test_records_are_compact_and_round_trip_through_the_dict_shape(self):
+        participants, _ = parse_participants(
+            make_workbook(
+                [
+                    ("x", "Awa", "awa@example.com", "fr", "Storytelling, Design UI"),
+                    ("x", "Jean", "jean@example.com", "Anglais", "Storytelling, Design UI"),
+                ]
+            )
+        )
+        first, second = participants
+
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertIs(first.skills_list, second.skills_list)
+        self.assertEqual(first.as_dict()["Email Address"], "awa@example.com")
+        self.assertEqual(ParticipantRecord.from_dict(first.as_dict()), first)
+        self.assertEqual(pickle.loads(pickle.dumps(first)), first)
+
+
+class EnrichParticipantsTests(TestCase):
+    LANGUAGE_PARTS = ["Francais", "ANGLAIS", "les deux", "French", "english", "Fr/En", "Espagnol", " ", "", None, 3]
+    LEVEL_PARTS = ["B1", "b2", " M2 ", "m1", "Doctorat", "", None, 4.0, float("nan")]
+    SKILL_PARTS = [
+        "Developpement backend",
+        "DEVELOPPEMENT FRONTEND",
+        "securite reseaux",
+        "Community management",
+        "storytelling",
+        "Design UI",
+        "",
+        " ",
+    ]
+
+    def random_record(self, rng, idx):
+        separators = [",", ";", "/", "|", "\n", " , "]
+        skills = rng.choice(separators).join(rng.sample(self.SKILL_PARTS, rng.randint(0, 4)))
+        record = {
+            "uid": f"p{idx}",
+            "LANGUE": rng.choice(self.LANGUAGE_PARTS),
+            "NIVEAU D'ETUDES": rng.choice(self.LEVEL_PARTS),
+            "VOS COMPETENCES": rng.choice([skills, None]),
+        }
+        if rng.random() < 0.1:
+            record["Langue"] = record.pop("LANGUE")
+        if rng.random() < 0.1:
+            record["email_sent"] = True
+        return record
+
+    def test_batch_matches_per_row_enrichment(self):
+        rng = random.Random(20251213)
+        for _ in range(25):
+            records = [self.random_record(rng, idx) for idx in range(rng.randint(1, 200))]
+            expected = [_enrich_participant(dict(record)) for record in records]
+            self.assertEqual(enrich_participants(records), expected)
+
+    def test_empty_batch(self):
+        self.assertEqual(enrich_participants([]), [])
+
+
+def legacy_assign_teams(participants):
+    """The list-scanning assign_teams the indexed engine must stay equivalent to."""
+    remaining = participants.copy()
+    random.shuffle(remaining)
+    teams = []
+
+    def pop_first(predicate):
+        for idx, candidate in enumerate(remaining):
+            if predicate(candidate):
+                return remaining.pop(idx)
+        return None
+
+    for _ in range(10):
+        if not remaining:
+            break
+        members = []
+        for flag in ("is_dev", "is_marketing", "language_en", "language_fr"):
+            if len(members) < 5 and not any(m.get(flag) for m in members):
+                picked = pop_first(lambda p: p.get(flag))
+                if picked:
+                    members.append(picked)
+        while len(members) < 5 and remaining:
+            members.append(remaining.pop(0))
+        teams.append([m["uid"] for m in members])
+    return teams
+
+
+class AssignTeamsTests(TestCase):
+    def test_matches_legacy_picks_for_ten_teams_of_five(self):
+        records = make_records(73)
+        random.shuffle(records)
+        for seed in range(5):
+            random.seed(seed)
+            expected = legacy_assign_teams(records)
+            random.seed(seed)
+            teams = assign_teams(records, team_count=10)
+            self.assertEqual([[m["uid"] for m in team["members"]] for team in teams], expected)
+
+    def test_derives_team_count_and_places_everyone(self):
+        records = make_records(123)
+
+        teams = assign_teams(records, {"TEAM 2": "Les Lions"}, team_size=4)
+
+        self.assertEqual(len(teams), 31)
+        self.assertTrue(all(record["team"] for record in records))
+        self.assertEqual(teams[1]["display_name"], "Les Lions")
+        self.assertTrue(all(1 <= len(team["members"]) <= 4 for team in teams))
+        for team in teams:
+            leader = team["leader"]
+            self.assertEqual(leader["academic_score"], max(m["academic_score"] for m in team["members"]))
+            self.assertEqual([m for m in team["members"] if m["is_leader"]], [leader])
+
+    def test_explicit_team_count_leaves_overflow_unassigned(self):
+        records = make_records(20)
+
+        teams = assign_teams(records, team_count=3, team_size=5)
+
+        self.assertEqual(sum(len(team["members"]) for team in teams), 15)
+        self.assertEqual(sum(1 for record in records if record["team"] is None), 5)
+
+
+class OptimizeTeamsTests(TestCase):
+    def test_local_search_never_worsens_and_is_reproducible(self):
+        runs = []
+        for _ in range(2):
+            records = make_records(60)
+            teams = assign_teams(records, seed=7)
+            greedy = team_objective(teams)
+            optimize_teams(teams, time_budget=5, seed=7, max_iterations=2000)
+            self.assertLessEqual(team_objective(teams), greedy)
+            runs.append([[m["uid"] for m in team["members"]] for team in teams])
+
+        self.assertEqual(runs[0], runs[1])
+        self.assertEqual(sorted(uid for team in runs[0] for uid in team), sorted(r["uid"] for r in records))
+        for team in teams:
+            self.assertEqual([m for m in team["members"] if m["is_leader"]], [team["leader"]])
+            self.assertTrue(all(m["team"] == team["name"] for m in team["members"]))
+
+
+class BuildTeamsFromDbTests(TestCase):
+    def load(self, count):
+        records = make_records(count)
+        import_participants(records, assign_teams(records, seed=1))
+
+    def dashboard_queries(self):
+        """Queries of a cold (snapshot not cached yet) then a warm dashboard load."""
+        counts = []
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse("dashboard"))
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+        return counts
+
+    def test_dashboard_get_query_count_does_not_grow_with_participants(self):
+        self.load(12)
+        small = self.dashboard_queries()
+        delete_participants(Participant.objects.all())
+        Team.objects.all().delete()
+        self.load(240)
+        large = self.dashboard_queries()
+
+        self.assertEqual(small, large)
+        self.assertLessEqual(large[0], 5)
+        self.assertLessEqual(large[1], 3)
+
+    def test_projection_groups_members_and_only_writes_changed_leaders(self):
+        self.load(23)
+
+        with self.assertNumQueries(3):
+            teams = build_teams_from_db()
+
+        self.assertEqual([team["name"] for team in teams], [f"TEAM {idx}" for idx in range(1, 6)])
+        self.assertEqual(sum(len(team["members"]) for team in teams), 23)
+
+        leader = teams[0]["leader"]
+        demoted = Participant.objects.filter(team__code="TEAM 1").exclude(pk=leader.pk).first()
+        Participant.objects.filter(pk=leader.pk).update(is_leader=False)
+        Participant.objects.filter(pk=demoted.pk).update(is_leader=True, academic_score=0)
+        with self.assertNumQueries(4):
+            build_teams_from_db()
+        self.assertEqual(set(Participant.objects.filter(is_leader=True, team__code="TEAM 1")), {leader})
+
+
+class DashboardApiTests(TestCase):
+    def setUp(self):
+        records = make_records(27)
+        import_participants(records, assign_teams(records, seed=3))
+
+    def test_participants_keyset_pagination_walks_every_row_once(self):
+        seen, cursor = [], 0
+        while cursor is not None:
+            with self.assertNumQueries(3):
+                data = self.client.get(reverse("participants_api"), {"after": cursor, "limit": 10}).json()
+            seen.extend(row["id"] for row in data["results"])
+            cursor = data["next"]
+
+        self.assertEqual(seen, list(Participant.objects.order_by("id").values_list("id", flat=True)))
+
+    def test_participants_filters(self):
+        first = Participant.objects.order_by("id").first()
+        Participant.objects.filter(pk=first.pk).update(email_sent=True)
+        url = reverse("participants_api")
+
+        sent = self.client.get(url, {"email_sent": "1"}).json()["results"]
+        self.assertEqual([row["id"] for row in sent], [first.pk])
+        devs = self.client.get(url, {"is_dev": "true", "language": "fr", "limit": 200}).json()["results"]
+        self.assertEqual(len(devs), Participant.objects.filter(is_dev=True, language_fr=True).count())
+        team = self.client.get(url, {"team": "TEAM 2"}).json()["results"]
+        self.assertTrue(team and all(row["team"] == "TEAM 2" for row in team))
+        self.assertEqual(self.client.get(url, {"after": "x"}).status_code, 400)
+
+    def test_teams_page_includes_member_counts(self):
+        with self.assertNumQueries(4):
+            data = self.client.get(reverse("teams_api"), {"limit": 2}).json()
+
+        self.assertEqual([team["name"] for team in data["results"]], ["TEAM 1", "TEAM 2"])
+        self.assertEqual([team["member_count"] for team in data["results"]], [5, 5])
+        self.assertEqual(sum(m["is_leader"] for m in data["results"][0]["members"]), 1)
+        self.assertIsNotNone(data["next"])
+
+    def test_pages_come_from_cache_until_a_mutation(self):
+        teams_url, participants_url = reverse("teams_api"), reverse("participants_api")
+        teams = self.client.get(teams_url).json()
+        participants = self.client.get(participants_url, {"team": "TEAM 1"}).json()
+
+        # Only the event and its data version are read.
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(teams_url).json(), teams)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(participants_url, {"team": "TEAM 1"}).json(), participants)
+
+        self.client.post(reverse("dashboard"), {"action": "rename_team", "team_name": "TEAM 1", "custom_name": "Les Lions"})
+        self.assertEqual(self.client.get(teams_url).json()["results"][0]["display_name"], "Les Lions")
+        self.assertEqual(self.client.get(participants_url, {"team": "TEAM 1"}).json()["results"][0]["team_display"], "Les Lions")
+
+        self.client.post(reverse("dashboard"), {"action": "reset"})
+        self.assertEqual(self.client.get(reverse("dashboard")).context["rows"], [])
+        self.assertEqual(self.client.get(teams_url).json()["results"], [])
+
+
+class TeamBulkUpdateTests(TestCase):
+    def setUp(self):
+        records = make_records(15)
+        import_participants(records, assign_teams(records, seed=3))
+        Team.objects.filter(code="TEAM 3").update(mentor_name="Awa", mentor_email="awa@example.com")
+
+    def post(self, teams):
+        return self.client.post(reverse("teams_bulk_api"), json.dumps({"teams": teams}), content_type="application/json")
+
+    def test_bulk_update_writes_and_returns_only_changed_teams(self):
+        version = data_version()
+        response = self.post(
+            [
+                {"team": "TEAM 1", "display_name": "Les Lions"},
+                {"team": "TEAM 2", "mentor_name": "Paul", "mentor_email": "paul@example.com"},
+                {"team": "TEAM 3", "mentor_name": "Awa", "mentor_email": "awa@example.com"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["updated"], 2)
+        self.assertEqual([team["name"] for team in data["results"]], ["TEAM 1", "TEAM 2"])
+        self.assertEqual(Team.objects.get(code="TEAM 1").display_name, "Les Lions")
+        self.assertEqual(Team.objects.get(code="TEAM 2").mentor_email, "paul@example.com")
+        self.assertGreater(data_version(), version)
+        self.assertEqual(self.client.get(reverse("teams_api")).json()["results"][0]["display_name"], "Les Lions")
+
+    def test_dashboard_saves_through_the_bulk_api_with_its_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        url = f"{reverse('teams_bulk_api')}?event=default"
+        body = json.dumps({"teams": [{"team": "TEAM 1", "display_name": "Les Lions"}]})
+        self.assertEqual(client.post(url, body, content_type="application/json").status_code, 403)
+
+        page = client.get(reverse("dashboard"))
+        self.assertContains(page, reverse("teams_bulk_api"))
+        token = client.cookies["csrftoken"].value
+        response = client.post(url, body, content_type="application/json", HTTP_X_CSRFTOKEN=token)
+
+        self.assertEqual(response.json()["updated"], 1)
+        self.assertEqual(Team.objects.get(code="TEAM 1").display_name, "Les Lions")
+
+    def test_partial_mentor_updates_keep_the_other_field(self):
+        self.post([{"team": "TEAM 3", "mentor_email": "awa.n@example.com"}])
+        self.post([{"team": "TEAM 1", "mentor_email": "new@example.com"}])
+        team = Team.objects.get(code="TEAM 3")
+        self.assertEqual((team.mentor_name, team.mentor_email), ("Awa", "awa.n@example.com"))
+        self.assertEqual(Team.objects.get(code="TEAM 1").mentor_name, "Encadrant")
+
+        self.post([{"team": "TEAM 3", "mentor_name": "Awa Ngono"}])
+        team = Team.objects.get(code="TEAM 3")
+        self.assertEqual((team.mentor_name, team.mentor_email), ("Awa Ngono", "awa.n@example.com"))
+
+        sheet = io.BytesIO(b"Equipe,Encadrant,Email encadrant\nTEAM 3,Awa N.,\n")
+        sheet.name = "encadrants.csv"
+        self.client.post(reverse("dashboard"), {"action": "import_mentors", "mentor_sheet": sheet})
+        team = Team.objects.get(code="TEAM 3")
+        self.assertEqual((team.mentor_name, team.mentor_email), ("Awa N.", "awa.n@example.com"))
+
+    def test_invalid_batch_is_rejected_without_writing(self):
+        response = self.post(
+            [
+                {"team": "TEAM 1", "display_name": "Les Lions"},
+                {"team": "TEAM 2", "mentor_email": "pas-un-email"},
+            ]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e["team"] for e in response.json()["details"]], ["TEAM 2"])
+
+        response = self.post([{"team": "TEAM 1", "display_name": "Les Lions"}, {"team": "TEAM 9", "mentor_name": "X"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["details"][0]["error"], "Equipe inconnue.")
+        self.assertEqual(Team.objects.get(code="TEAM 1").display_name, "TEAM 1")
+
+        bad_json = self.client.post(reverse("teams_bulk_api"), "{", content_type="application/json")
+        self.assertEqual(bad_json.status_code, 400)
+
+    def test_mentor_sheet_import_from_dashboard(self):
+        sheet = io.BytesIO("Equipe;Encadrant;Email encadrant\nTEAM 1;Marie;marie@example.com\nTEAM 2;;\n".encode("utf-8"))
+        sheet.name = "encadrants.csv"
+
+        response = self.client.post(reverse("dashboard"), {"action": "import_mentors", "mentor_sheet": sheet})
+
+        self.assertEqual(response.status_code, 200)
+        team = Team.objects.get(code="TEAM 1")
+        self.assertEqual((team.mentor_name, team.mentor_email), ("Marie", "marie@example.com"))
+        self.assertEqual(Team.objects.get(code="TEAM 2").mentor_name, "")
+
+
+@override_settings(HACKATHON_EMAIL_RATE_PER_MINUTE=None)
+class DispatchEmailsTests(TestCase):
+    def setUp(self):
+        event = default_event()
+        Participant.objects.bulk_create(
+            [
+                Participant(event=event, full_name=f"P{idx}", email=f"p{idx}@example.com", language_raw="Francais")
+                for idx in range(11)
+            ]
+            + [Participant(event=event, full_name="Sans email")]
+        )
+        self.people = list(Participant.objects.order_by("id"))
+
+    def test_results_keep_order_and_status_updates_are_batched(self):
+        data_version()
+        with self.assertNumQueries(2):
+            results = dispatch_emails(self.people, "hackathon@example.com", concurrency=3, batch_size=4)
+
+        self.assertEqual([r["name"] for r in results], [p.full_name for p in self.people])
+        self.assertEqual([r["status"] for r in results], ["sent"] * 11 + ["skipped"])
+        self.assertEqual(len(mail.outbox), 11)
+        self.assertEqual(mail.outbox[0].subject, "Hackathon EEUEZ - Confirmation")
+        self.assertEqual(Participant.objects.filter(email_sent=True).count(), 11)
+
+    def test_reuses_one_smtp_connection_per_batch(self):
+        with smtp_sink() as sink:
+            results = dispatch_emails(self.people, "hackathon@example.com", concurrency=2, batch_size=5)
+
+        self.assertEqual(sum(r["status"] == "sent" for r in results), 11)
+        self.assertEqual(sink.received, 11)
+        self.assertEqual(sink.connections, 3)
+
+    def test_send_emails_api_reports_counts(self):
+        response = self.client.post(reverse("send_emails"), {"sender_email": "contact@eeuez.com"})
+
+        data = response.json()
+        self.assertEqual((data["success"], data["errors"], data["total"]), (11, 0, 12))
+        self.assertEqual(mail.outbox[0].from_email, "contact@eeuez.com")
+
+    @override_settings(HACKATHON_EMAIL_RATE_PER_MINUTE=600, HACKATHON_EMAIL_REQUEST_SECONDS=1)
+    def test_send_emails_api_leaves_what_the_rate_limit_cannot_send_to_the_worker(self):
+        data = self.client.post(reverse("send_emails")).json()
+
+        self.assertEqual((data["success"], data["queued"], data["total"]), (10, 1, 12))
+        self.assertEqual(len(mail.outbox), 10)
+        self.assertEqual([r["status"] for r in drain_outbox()], ["sent"])
+        self.assertEqual(Participant.objects.filter(email_sent=True).count(), 11)
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError("relais indisponible")
+
+
+class UnbuildableBackend(BaseEmailBackend):
+    def __init__(self, **kwargs):
+        raise ImportError("module smtp introuvable")
+
+
+class WorkerKilled(BaseException):
+    pass
+
+
+class DyingBackend(BaseEmailBackend):
+    """Delivers two messages, then the process dies."""
+
+    delivered = 0
+
+    def send_messages(self, email_messages):
+        if DyingBackend.delivered >= 2:
+            raise WorkerKilled()
+        DyingBackend.delivered += len(email_messages)
+        return len(email_messages)
+
+
+@override_settings(HACKATHON_EMAIL_RATE_PER_MINUTE=None)
+class OutboxTests(TestCase):
+    def setUp(self):
+        event = default_event()
+        Participant.objects.bulk_create(
+            [Participant(event=event, full_name=f"P{idx}", email=f"p{idx}@example.com") for idx in range(4)]
+        )
+        self.people = list(Participant.objects.order_by("id"))
+
+    def test_enqueue_is_idempotent(self):
+        enqueue_emails(self.people, "hackathon@example.com")
+        enqueue_emails(self.people, "contact@eeuez.com")
+
+        self.assertEqual(OutboxMessage.objects.count(), 4)
+        self.assertEqual(set(OutboxMessage.objects.values_list("sender_email", flat=True)), {"hackathon@example.com"})
+
+    def test_competing_claims_never_share_a_row(self):
+        enqueue_emails(self.people, "hackathon@example.com")
+
+        first = claim_outbox(limit=3)
+        second = claim_outbox(limit=3)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({row.pk for row in first} & {row.pk for row in second})
+        self.assertEqual(claim_outbox(), [])
+
+    def test_drain_sends_once_and_marks_rows(self):
+        enqueue_emails(self.people, "hackathon@example.com")
+
+        results = drain_outbox()
+        again = drain_outbox()
+
+        self.assertEqual([r["status"] for r in results], ["sent"] * 4)
+        self.assertEqual(again, [])
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.STATUS_SENT, attempts=1).count(), 4)
+        self.assertEqual(Participant.objects.filter(email_sent=True).count(), 4)
+
+    @override_settings(EMAIL_BACKEND="participants.tests.FailingBackend")
+    def test_failures_back_off_exponentially_then_give_up(self):
+        enqueue_emails(self.people[:1], "hackathon@example.com")
+        delays = []
+        for _ in range(5):
+            before = timezone.now()
+            drain_outbox()
+            row = OutboxMessage.objects.get()
+            delays.append(round((row.next_attempt_at - before).total_seconds() / 60))
+            OutboxMessage.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(delays[:4], [1, 2, 4, 8])
+        self.assertEqual(row.status, OutboxMessage.STATUS_FAILED)
+        self.assertIn("relais indisponible", row.last_error)
+        self.assertFalse(Participant.objects.filter(email_sent=True).exists())
+
+    @override_settings(
+        EMAIL_BACKEND="participants.tests.DyingBackend", HACKATHON_EMAIL_BATCH_SIZE=2, HACKATHON_EMAIL_CONCURRENCY=1
+    )
+    def test_rows_are_recorded_after_each_smtp_batch(self):
+        DyingBackend.delivered = 0
+        enqueue_emails(self.people, "hackathon@example.com")
+
+        with self.assertRaises(WorkerKilled):
+            drain_outbox()
+
+        statuses = list(OutboxMessage.objects.order_by("pk").values_list("status", flat=True))
+        self.assertEqual(statuses, [OutboxMessage.STATUS_SENT] * 2 + [OutboxMessage.STATUS_SENDING] * 2)
+        self.assertEqual(Participant.objects.filter(email_sent=True).count(), 2)
+
+    def test_claims_fit_well_inside_the_claim_timeout(self):
+        enqueue_emails(self.people, "hackathon@example.com")
+
+        # 0.6 message per minute: only 3 can go out in half of the 10 minute claim timeout.
+        drain_outbox(rate_limiter=TokenBucket(0.6, capacity=10))
+
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.STATUS_SENT).count(), 3)
+
+    @override_settings(HACKATHON_EMAIL_RATE_PER_MINUTE=3)
+    def test_send_rate_is_shared_between_workers(self):
+        enqueue_emails(self.people, "hackathon@example.com")
+        # Another worker sent one message a moment ago and still holds a claim on another.
+        OutboxMessage.objects.filter(participant=self.people[0]).update(
+            status=OutboxMessage.STATUS_SENT, sent_at=timezone.now()
+        )
+        OutboxMessage.objects.filter(participant=self.people[1]).update(
+            status=OutboxMessage.STATUS_SENDING, claimed_at=timezone.now()
+        )
+
+        self.assertEqual(len(drain_outbox(rate_limiter=TokenBucket(600))), 1)
+        self.assertEqual(drain_outbox(rate_limiter=TokenBucket(600)), [])
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.STATUS_PENDING).count(), 1)
+
+    @override_settings(EMAIL_BACKEND="participants.tests.UnbuildableBackend")
+    def test_connection_errors_go_through_the_backoff_path(self):
+        enqueue_emails(self.people[:2], "hackathon@example.com")
+
+        results = drain_outbox()
+
+        self.assertEqual([r["status"] for r in results], ["error", "error"])
+        rows = OutboxMessage.objects.all()
+        self.assertEqual({(row.status, row.attempts) for row in rows}, {(OutboxMessage.STATUS_PENDING, 1)})
+        self.assertTrue(all("smtp introuvable" in row.last_error for row in rows))
+
+    def test_stale_claims_are_recovered(self):
+        enqueue_emails(self.people[:1], "hackathon@example.com")
+        claim_outbox()
+        OutboxMessage.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(len(claim_outbox()), 1)
+
+
+class TokenBucketTests(TestCase):
+    def test_bucket_paces_sends_after_the_burst(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(60, capacity=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(4):
+            bucket.acquire()
+
+        self.assertEqual(sleeps, [1.0, 1.0])
+
+
+class ReportExportTests(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        override = override_settings(HACKATHON_EXPORT_CACHE_DIR=self.cache_dir, HACKATHON_EXPORT_CACHE_KEEP=2)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_report_keeps_general_and_team_sheets_with_formulas(self):
+        records = make_records(12)
+        teams = assign_teams(records, {"TEAM 1": "Les Lions"}, seed=2)
+        teams[0]["mentor"] = {"name": "Mme Ekani", "email": "ekani@example.com"}
+
+        workbook = load_workbook(io.BytesIO(build_report_workbook(records, teams)))
+
+        self.assertEqual(workbook.sheetnames, ["General", "TEAM 1", "TEAM 2", "TEAM 3"])
+        general = workbook["General"]
+        self.assertEqual(general.max_row, 13)
+        self.assertTrue(general["A1"].font.bold)
+        self.assertEqual(general["F1"].value, "Team")
+        sheet = workbook["TEAM 1"]
+        self.assertEqual(sheet["B1"].value, "Les Lions")
+        self.assertEqual(sheet["B2"].value, "Mme Ekani (ekani@example.com)")
+        self.assertEqual(sheet["O4"].value, "Total (/20)")
+        self.assertTrue(sheet["O4"].font.bold)
+        self.assertEqual(sheet["O5"].value, '=IF(COUNT(G5:N5)=0,"",ROUND(AVERAGE(G5:N5),2))')
+        self.assertEqual(sheet.max_row, 4 + len(teams[0]["members"]))
+
+    def test_export_view_streams_the_file(self):
+        records = make_records(8)
+        import_participants(records, assign_teams(records, seed=2))
+
+        response = self.client.get(reverse("export_excel"))
+
+        self.assertTrue(response.streaming)
+        self.assertIn("hackathon_teams.xlsx", response["Content-Disposition"])
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(workbook.sheetnames, ["General", "TEAM 1", "TEAM 2"])
+
+    def test_export_is_cached_per_data_version_and_honours_conditional_get(self):
+        records = make_records(8)
+        import_participants(records, assign_teams(records, seed=2))
+        url = reverse("export_excel")
+
+        first = self.client.get(url)
+        body = b"".join(first.streaming_content)
+        etag = first["ETag"]
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        with self.assertNumQueries(3):
+            second = self.client.get(url)
+        self.assertEqual(b"".join(second.streaming_content), body)
+        self.assertEqual(second["ETag"], etag)
+
+        with self.assertNumQueries(2):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+
+        self.client.post(reverse("dashboard"), {"action": "rename_team", "team_name": "TEAM 1", "custom_name": "Les Aigles"})
+        renamed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(renamed.status_code, 200)
+        self.assertNotEqual(renamed["ETag"], etag)
+        workbook = load_workbook(io.BytesIO(b"".join(renamed.streaming_content)))
+        self.assertEqual(workbook["TEAM 1"]["B1"].value, "Les Aigles")
+
+        self.client.post(reverse("dashboard"), {"action": "add_mentor", "mentor_team": "TEAM 2", "mentor_name": "M. Fouda"})
+        b"".join(self.client.get(url).streaming_content)
+        self.assertEqual(len(list(Path(self.cache_dir).glob("report-e*-v*.xlsx"))), 2)
+
+
+    def test_export_is_rebuilt_when_the_version_row_is_recreated(self):
+        records = make_records(4)
+        import_participants(records, assign_teams(records, seed=2))
+        url = reverse("export_excel")
+        first = self.client.get(url)
+        b"".join(first.streaming_content)
+
+        # A deleted and re-migrated database starts its counter again from the same value.
+        key = data_key(default_event().pk)
+        value = DataVersion.objects.get(key=key).value
+        DataVersion.objects.filter(key=key).delete()
+        Participant.objects.filter(full_name="Participant 0").update(full_name="Bob")
+        DataVersion.objects.create(key=key, value=value)
+
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        workbook = load_workbook(io.BytesIO(b"".join(second.streaming_content)))
+        self.assertIn("Bob", [row[0] for row in workbook["General"].iter_rows(values_only=True)])
+
+
+class SyncParticipantsTests(TestCase):
+    def setUp(self):
+        self.records = make_records(10)
+        self.records[9]["Email Address"] = ""
+        import_participants(self.records, assign_teams(self.records, seed=4))
+        Participant.objects.filter(email="p0@example.com").update(email_sent=True)
+        data_version()
+
+    def sheet(self):
+        return [record.copy() for record in make_records(10)]
+
+    def test_unchanged_sheet_writes_nothing(self):
+        sheet = self.sheet()
+        sheet[9]["Email Address"] = ""
+        version = data_version()[0]
+
+        with self.assertNumQueries(4):
+            counts = sync_participants(sheet)
+
+        self.assertEqual(counts["unchanged"], 10)
+        self.assertEqual(data_version()[0], version)
+
+    def test_delta_preserves_state_and_reports_counts(self):
+        team_before = Participant.objects.get(email="p0@example.com").team_id
+        sheet = self.sheet()
+        sheet[9]["Email Address"] = ""
+        sheet[0]["NOM ET PRENOM"] = "Participant Zero"
+        sheet[0]["Email Address"] = " P0@Example.com "
+        del sheet[5]
+        sheet.append(sheet[1].copy())
+        sheet.extend(make_records(12)[10:])
+
+        counts = sync_participants(sheet, delete_missing=True)
+
+        self.assertEqual(
+            counts, {"created": 2, "updated": 1, "unchanged": 8, "deleted": 1, "duplicates": 1}
+        )
+        renamed = Participant.objects.get(full_name="Participant Zero")
+        self.assertTrue(renamed.email_sent)
+        self.assertEqual(renamed.team_id, team_before)
+        self.assertFalse(Participant.objects.filter(email="p5@example.com").exists())
+        self.assertEqual(Participant.objects.filter(team__isnull=True).count(), 2)
+
+    def test_rows_stored_twice_are_matched_once_and_the_copies_dropped(self):
+        sheet = make_records(3)
+        copy = sheet[0].copy()
+        copy.full_name = "Participant 0 bis"
+        import_participants(sheet + [copy], [])
+        first = Participant.objects.filter(email="p0@example.com").order_by("pk").first()
+
+        sheet = make_records(3)
+        sheet[0].full_name = "Participant Zero"
+        counts = sync_participants(sheet, delete_missing=True)
+
+        self.assertEqual((counts["updated"], counts["deleted"]), (1, 1))
+        self.assertEqual(
+            list(Participant.objects.filter(email="p0@example.com").values_list("pk", "full_name")),
+            [(first.pk, "Participant Zero")],
+        )
+
+    def test_missing_rows_are_kept_unless_asked(self):
+        counts = sync_participants(self.sheet()[:3])
+
+        self.assertEqual(counts["deleted"], 0)
+        self.assertEqual(Participant.objects.count(), 10)
+
+    @override_settings(HACKATHON_UPLOAD_RUNNER="inline")
+    def test_dashboard_update_mode(self):
+        upload = make_workbook([("x", "Participant 1", "p1@example.com", "Anglais", "COPYWRITING"), ("x", "Nouveau", "new@example.com", "fr", "")])
+
+        self.client.post(reverse("dashboard"), {"file": upload, "mode": "update"})
+
+        self.assertEqual(Participant.objects.count(), 11)
+        self.assertTrue(Participant.objects.get(email="p0@example.com").email_sent)
+        self.assertIsNotNone(Participant.objects.get(email="new@example.com").team)
+
+
+class SkillIndexTests(TestCase):
+    def setUp(self):
+        records = make_records(9)
+        records[3]["skills_list"] = ["DEVELOPPEMENT BACKEND", "DESIGN UI"]
+        import_participants(records, assign_teams(records, team_count=1, seed=5))
+
+    def test_import_links_skills_and_creates_unknown_ones(self):
+        self.assertEqual(participants_with_skill("developpement backend ").count(), 3)
+        self.assertEqual(Skill.objects.get(name="DESIGN UI").category, Skill.CATEGORY_OTHER)
+        self.assertEqual(count_unassigned(Skill.CATEGORY_MARKETING), 3 - Participant.objects.filter(
+            team__isnull=False, is_marketing=True).count())
+        summary = {skill.name: skill for skill in skill_summary()}
+        self.assertEqual(summary["COPYWRITING"].participant_count, 3)
+
+    def test_flags_follow_categories_stored_in_the_database(self):
+        Skill.objects.filter(name="DESIGN UI").update(category=Skill.CATEGORY_MARKETING)
+
+        refresh_skill_flags()
+        records = apply_skill_categories(
+            [ParticipantRecord(skills_list=["DESIGN UI"]), ParticipantRecord(skills_list=["NOUVEAU"])]
+        )
+
+        self.assertTrue(Participant.objects.get(uid="p3").is_marketing)
+        self.assertEqual([(r.is_dev, r.is_marketing) for r in records], [(False, True), (False, False)])
+
+    def test_sync_rewrites_links_of_changed_rows(self):
+        sheet = make_records(9)
+        sheet[0]["VOS COMPETENCES"] = "STORYTELLING"
+        sheet[0]["skills_list"] = ["STORYTELLING"]
+
+        sync_participants(sheet)
+
+        changed = Participant.objects.get(email="p0@example.com")
+        self.assertEqual(list(changed.skills.values_list("name", flat=True)), ["STORYTELLING"])
+
+    def test_participants_api_filters_by_skill(self):
+        data = self.client.get(reverse("participants_api"), {"skill": "COPYWRITING"}).json()
+
+        self.assertEqual(len(data["results"]), 3)
+        skills = self.client.get(reverse("skills_api")).json()["results"]
+        self.assertIn("DESIGN UI", [skill["name"] for skill in skills])
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        records = make_records(6)
+        records[0]["NOM ET PRENOM"] = "Amelie Copywriter"
+        records[4]["NOM ET PRENOM"] = "Élodie Martin"
+        import_participants(records, assign_teams(records, team_count=1, seed=1))
+
+    def names(self, query, **kwargs):
+        return [p.full_name for p in search_participants(query, **kwargs)[0]]
+
+    def test_fts_index_ranks_name_hits_first_and_matches_prefixes(self):
+        self.assertTrue(fts_available())
+
+        self.assertEqual(self.names("copy")[0], "Amelie Copywriter")
+        self.assertEqual(sorted(self.names("copy")[1:]), ["Participant 1", "Élodie Martin"])
+        self.assertEqual(self.names("elodie mar"), ["Élodie Martin"])
+        self.assertEqual(self.names('p2" *'), ["Participant 2"])
+        self.assertEqual(self.names("  "), [])
+
+    def test_index_follows_bulk_updates_and_deletes(self):
+        sheet = make_records(6)
+        sheet[2]["NOM ET PRENOM"] = "Zoe Renamed"
+        sync_participants(sheet[1:], delete_missing=True)
+
+        self.assertEqual(self.names("zoe"), ["Zoe Renamed"])
+        self.assertEqual(self.names("amelie"), [])
+
+    def test_fts_query_scans_the_index_once_then_joins_by_primary_key(self):
+        records = make_records(3000)
+        import_participants(records, assign_teams(records, seed=1))
+        sql, params = _fts_query(["participant", "12"], default_event().pk, 0, 51)
+
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            plan = [row[-1] for row in cursor.fetchall()]
+
+        # ":=" in the virtual table step means one FTS lookup per candidate rowid.
+        self.assertTrue(any("VIRTUAL TABLE" in step and ":=" not in step for step in plan), plan)
+        self.assertIn("USING INTEGER PRIMARY KEY", " ".join(plan))
+        self.assertFalse(any("SUBQUERY" in step for step in plan), plan)
+        started = time.perf_counter()
+        self.assertIn("Participant 12", self.names("participant 12", limit=200))
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+    def test_prefix_fallback_matches_name_email_and_skills(self):
+        self.assertEqual(self.names("amel", use_fts=False), ["Amelie Copywriter"])
+        self.assertEqual(self.names("P3@", use_fts=False), ["Participant 3"])
+        self.assertEqual(self.names("copy", use_fts=False), ["Participant 1", "Élodie Martin"])
+
+    def test_search_api_paginates_ranked_results(self):
+        first = self.client.get(reverse("search_api"), {"q": "participant", "limit": 2}).json()
+        second = self.client.get(reverse("search_api"), {"q": "participant", "after": first["next"], "limit": 2}).json()
+
+        self.assertEqual(first["next"], 2)
+        self.assertEqual(len(second["results"]), 2)
+        self.assertFalse({p["id"] for p in first["results"]} & {p["id"] for p in second["results"]})
+
+
+class BenchSuiteTests(TestCase):
+    def test_pipeline_stays_within_query_budgets(self):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        path = Path(workdir) / "registrations.xlsx"
+        write_workbook(synthetic_rows(300, seed=4), path)
+
+        with override_settings(HACKATHON_EXPORT_CACHE_DIR=workdir, HACKATHON_EMAIL_RATE_PER_MINUTE=None):
+            stages = _pipeline(path, 300, seed=4, trace=False)
+
+        self.assertEqual(Participant.objects.filter(email_sent=True).count(), 300 + LATE_REGISTRANTS)
+        self.assertFalse(Participant.objects.filter(team__isnull=True).exists())
+        over = {name: entry for name, entry in _budget_report({"300": stages})["300"].items() if not entry["ok"]}
+        self.assertEqual(over, {})
+
+    def test_cold_worker_serves_without_loading_pandas_or_openpyxl(self):
+        result = measure_startup()
+
+        self.assertEqual((result["status"], result["heavy"]), (200, []))
+        self.assertTrue(result["top_imports"])
+
+
+class MetricsTests(TestCase):
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = Histogram("demo_seconds", "Demo.", ["phase"], buckets=(0.1, 1))
+        for value in (0.05, 0.5, 3):
+            histogram.observe(value, phase='a"b')
+
+        lines = histogram.render()
+
+        self.assertIn('demo_seconds_bucket{phase="a\\"b",le="0.1"} 1', lines)
+        self.assertIn('demo_seconds_bucket{phase="a\\"b",le="1"} 2', lines)
+        self.assertIn('demo_seconds_bucket{phase="a\\"b",le="+Inf"} 3', lines)
+        self.assertIn('demo_seconds_count{phase="a\\"b"} 3', lines)
+
+    @override_settings(HACKATHON_SERVER_TIMING=True, HACKATHON_UPLOAD_RUNNER="inline")
+    def test_upload_reports_phases_in_server_timing_and_metrics(self):
+        imports_before = PHASE_SECONDS.count(phase="import")
+        upload = make_workbook([("2025-12-01", f"Nom {idx}", f"n{idx}@example.com", "Francais", "STORYTELLING") for idx in range(6)])
+
+        response = self.client.post(reverse("dashboard"), {"file": upload, "mode": "replace"})
+
+        timing = response["Server-Timing"]
+        for name in ("db;dur=", "parse;dur=", "enrich;dur=", "assign_teams;dur=", "import;dur=", "total;dur="):
+            self.assertIn(name, timing)
+        self.assertEqual(PHASE_SECONDS.count(phase="import"), imports_before + 1)
+        body = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn('hackathon_http_request_seconds_count{view="dashboard",method="POST",status="302"}', body)
+        self.assertIn('hackathon_http_sql_queries_bucket{view="dashboard",le="+Inf"}', body)
+        self.assertIn("# TYPE hackathon_phase_seconds histogram", body)
+
+    def test_smtp_sends_are_counted(self):
+        Participant.objects.create(event=default_event(), full_name="Awa", email="awa@example.com", language_raw="Francais")
+        sent_before = SMTP_MESSAGES.value(outcome="sent")
+
+        dispatch_emails(list(Participant.objects.all()), "hackathon@example.com")
+
+        self.assertEqual(SMTP_MESSAGES.value(outcome="sent"), sent_before + 1)
+
+    @override_settings(HACKATHON_METRICS_TOKEN="s3cret")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+
+
+class UploadJobTests(TestCase):
+    def setUp(self):
+        self.upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.upload_dir, ignore_errors=True)
+
+    def upload(self, runner, rows=None):
+        if rows is None:
+            rows = [("x", f"Nom {idx}", f"n{idx}@example.com", "Les deux", "COPYWRITING") for idx in range(7)]
+        with override_settings(HACKATHON_UPLOAD_RUNNER=runner, HACKATHON_UPLOAD_DIR=self.upload_dir):
+            return self.client.post(reverse("dashboard"), {"file": make_workbook(rows), "mode": "replace"})
+
+    def test_upload_redirects_to_a_finished_job(self):
+        response = self.upload("inline")
+
+        job = UploadJob.objects.get()
+        self.assertRedirects(response, f"{reverse('dashboard')}?event=default&job={job.pk}")
+        self.assertEqual(Participant.objects.count(), 7)
+        progress = self.client.get(reverse("upload_progress_api", args=[job.pk])).json()
+        self.assertEqual(
+            (progress["status"], progress["finished"], progress["rows_parsed"], progress["rows_written"]),
+            ("done", True, 7, 7),
+        )
+        self.assertEqual(os.listdir(self.upload_dir), [])
+
+    def test_command_runner_leaves_the_job_queued_for_the_worker(self):
+        self.upload("command")
+        job = UploadJob.objects.get()
+
+        page = self.client.get(reverse("dashboard"), {"job": job.pk})
+        self.assertContains(page, reverse("upload_progress_api", args=[job.pk]))
+        self.assertEqual(len(os.listdir(self.upload_dir)), 1)
+        self.assertFalse(Participant.objects.exists())
+
+        self.assertEqual(process_upload_job().pk, job.pk)
+        self.assertIsNone(process_upload_job())
+        self.assertEqual(Participant.objects.count(), 7)
+
+    def test_unreadable_file_fails_the_job(self):
+        self.upload("command")
+        job = UploadJob.objects.get()
+        with open(job.files[0]["path"], "wb") as handle:
+            handle.write(b"not a workbook")
+
+        with self.assertLogs("participants.uploads", "ERROR"):
+            process_upload_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.STATUS_FAILED)
+        self.assertContains(self.client.get(reverse("dashboard"), {"job": job.pk}), "Impossible de traiter le fichier")
+
+
+class UploadThreadRunnerTests(TransactionTestCase):
+    def test_thread_runner_imports_in_the_background(self):
+        upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_dir, ignore_errors=True)
+        rows = [("x", f"Nom {idx}", f"n{idx}@example.com", "Francais", "") for idx in range(12)]
+
+        with override_settings(HACKATHON_UPLOAD_RUNNER="thread", HACKATHON_UPLOAD_DIR=upload_dir):
+            self.client.post(reverse("dashboard"), {"file": make_workbook(rows), "mode": "replace"})
+            job = UploadJob.objects.get()
+            deadline = time.monotonic() + 10
+            while not job_progress(job)["finished"] and time.monotonic() < deadline:
+                time.sleep(0.05)
+                job.refresh_from_db()
+
+        self.assertEqual(job.status, UploadJob.STATUS_DONE)
+        self.assertEqual(Participant.objects.count(), 12)
+
+
+class BatchImportTests(TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+
+    def workbook(self, name, sheets):
+        workbook = Workbook()
+        workbook.remove(workbook.active)
+        for title, headers, rows in sheets:
+            sheet = workbook.create_sheet(title)
+            sheet.append(list(headers))
+            for row in rows:
+                sheet.append(list(row))
+        path = str(Path(self.workdir) / name)
+        workbook.save(path)
+        return path
+
+    def rows(self, start, stop, school):
+        return [("x", f"{school} {idx}", f"n{idx}@example.com", "Francais", "COPYWRITING") for idx in range(start, stop)]
+
+    def test_sheets_are_parsed_in_parallel_and_merged_on_email(self):
+        headers = ("Timestamp", "NOM ET PRENOM", "Email Address", "LANGUE", "VOS COMPETENCES")
+        first = self.workbook("ecole-a.xlsx", [("Form 1", headers, self.rows(0, 4, "A")), ("Notes", ("Commentaire",), [("rien",)])])
+        second = self.workbook("ecole-b.xlsx", [("Form 1", headers, self.rows(2, 6, "B"))])
+        sources = expand_sources([(first, "ecole-a.xlsx"), (second, "ecole-b.xlsx")], all_sheets=True)
+
+        self.assertEqual([label for _, _, label in sources], ["ecole-a.xlsx / Form 1", "ecole-a.xlsx / Notes", "ecole-b.xlsx / Form 1"])
+        results = parse_sources(sources, workers=2)
+        merged, columns, stats = merge_parsed(results)
+
+        self.assertEqual([row["NOM ET PRENOM"] for row in merged], ["A 0", "A 1", "A 2", "A 3", "B 4", "B 5"])
+        self.assertEqual([row["uid"] for row in merged], [f"p{idx}" for idx in range(6)])
+        self.assertEqual(stats["duplicates"], 2)
+        self.assertEqual([source["kept"] for source in stats["sources"]], [4, 0, 2])
+        self.assertNotIn("NIVEAU D'ETUDES", columns)
+        self.assertEqual(merge_parsed(parse_sources(sources, workers=1))[0], merged)
+
+    @override_settings(HACKATHON_UPLOAD_RUNNER="inline", HACKATHON_IMPORT_WORKERS=1)
+    def test_dashboard_accepts_several_files(self):
+        uploads = [make_workbook(self.rows(0, 5, "A")), make_workbook(self.rows(3, 8, "B"))]
+
+        with override_settings(HACKATHON_UPLOAD_DIR=self.workdir):
+            response = self.client.post(reverse("dashboard"), {"file": uploads, "mode": "replace"}, follow=True)
+
+        self.assertEqual(Participant.objects.count(), 8)
+        self.assertContains(response, "8 participant(s), 2 doublon(s) ignore(s)")
+
+
+@override_settings(HACKATHON_EMAIL_RATE_PER_MINUTE=None)
+class EventPartitionTests(TestCase):
+    def setUp(self):
+        self.main = default_event()
+        self.other = create_event("Hackathon Douala")
+        records = make_records(12)
+        import_participants(records, assign_teams(records, seed=1), event=self.main)
+        records = make_records(7)
+        import_participants(records, assign_teams(records, seed=1), event=self.other)
+
+    def test_import_and_reset_leave_other_events_alone(self):
+        version = data_version(self.other)[0]
+        records = make_records(3)
+        import_participants(records, assign_teams(records, seed=2), event=self.main)
+
+        self.assertEqual((self.main.participants.count(), self.other.participants.count()), (3, 7))
+        self.assertEqual(data_version(self.other)[0], version)
+        self.assertEqual(set(self.other.teams.values_list("code", flat=True)), {"TEAM 1", "TEAM 2"})
+
+        self.client.post(reverse("dashboard"), {"action": "reset", "event": self.other.slug})
+        self.assertEqual((self.main.participants.count(), self.other.participants.count()), (3, 0))
+        self.assertTrue(self.main.teams.exists())
+
+    def test_views_only_see_the_selected_event(self):
+        url = reverse("participants_api")
+        self.assertEqual(len(self.client.get(url, {"limit": 200}).json()["results"]), 12)
+        self.assertEqual(len(self.client.get(url, {"limit": 200, "event": self.other.slug}).json()["results"]), 7)
+        teams = self.client.get(reverse("teams_api"), {"event": self.other.slug}).json()["results"]
+        self.assertEqual([team["member_count"] for team in teams], [5, 2])
+        found = self.client.get(reverse("search_api"), {"q": "participant", "event": self.other.slug, "limit": 200})
+        self.assertEqual(len(found.json()["results"]), 7)
+        self.assertEqual(self.client.get(url, {"event": "inconnu"}).status_code, 404)
+
+        self.client.post(reverse("send_emails"), {"event": self.other.slug})
+        self.assertEqual(len(mail.outbox), 7)
+        self.assertFalse(self.main.participants.filter(email_sent=True).exists())
+        self.assertEqual(set(OutboxMessage.objects.values_list("event", flat=True)), {self.other.pk})
+
+        job = UploadJob.objects.create(event=self.other, files=[], mode="replace")
+        progress_url = reverse("upload_progress_api", args=[job.pk])
+        self.assertEqual(self.client.get(progress_url).status_code, 404)
+        self.assertEqual(self.client.get(progress_url, {"event": self.other.slug}).json()["id"], job.pk)
+
+    def test_skill_summary_counts_only_the_selected_event(self):
+        link_skills([Participant.objects.create(event=self.other, full_name="Seule", skills_list=["DESIGN UI"])])
+
+        def summary(event):
+            # The catalog lists every skill; only the counts are per event.
+            return {skill.name: skill.participant_count for skill in skill_summary(event) if skill.participant_count}
+
+        self.assertEqual(summary(self.main), {"DEVELOPPEMENT BACKEND": 4, "COPYWRITING": 4})
+        self.assertEqual(summary(self.other), {"DEVELOPPEMENT BACKEND": 3, "COPYWRITING": 2, "DESIGN UI": 1})
+
+    def test_exports_are_cached_per_event(self):
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(HACKATHON_EXPORT_CACHE_DIR=cache_dir):
+            main = self.client.get(reverse("export_excel"))
+            other = self.client.get(reverse("export_excel"), {"event": self.other.slug})
+            main_book = load_workbook(io.BytesIO(b"".join(main.streaming_content)))
+            other_book = load_workbook(io.BytesIO(b"".join(other.streaming_content)))
+
+        self.assertNotEqual(main["ETag"], other["ETag"])
+        self.assertEqual(main_book["General"].max_row, 13)
+        self.assertEqual(other_book["General"].max_row, 8)
+
+
+class DatabaseSetupTests(TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+
+    def open_file_connection(self):
+        wrapper = type(connections["default"])
+        probe = wrapper({**connection.settings_dict, "NAME": str(Path(self.workdir) / "probe.sqlite3")}, "probe")
+        probe.ensure_connection()
+        self.addCleanup(probe.close)
+        return probe
+
+    def pragma(self, probe, name):
+        with probe.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    @override_settings(HACKATHON_SQLITE_BUSY_TIMEOUT=0.2)
+    def test_connections_use_wal_so_reads_do_not_wait_for_a_writer(self):
+        writer, reader = self.open_file_connection(), self.open_file_connection()
+        self.assertEqual(self.pragma(reader, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(reader, "busy_timeout"), 200)
+        with writer.cursor() as cursor:
+            cursor.execute("CREATE TABLE item (name TEXT)")
+            cursor.execute("INSERT INTO item VALUES ('a')")
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("INSERT INTO item VALUES ('b')")
+
+        started = time.perf_counter()
+        with reader.cursor() as cursor:
+            cursor.execute("SELECT name FROM item")
+            self.assertEqual(cursor.fetchall(), [("a",)])
+        self.assertLess(time.perf_counter() - started, 0.2)
+
+    def test_write_lock_queues_writers_and_is_reentrant(self):
+        with override_settings(HACKATHON_WRITE_LOCK_FILE=Path(self.workdir) / "write.lock"):
+            held, release = threading.Event(), threading.Event()
+
+            def writer():
+                with write_lock():
+                    held.set()
+                    release.wait(5)
+
+            thread = threading.Thread(target=writer)
+            thread.start()
+            held.wait(5)
+            with self.assertRaises(WriteLockTimeout):
+                with write_lock(timeout=0.1):
+                    pass
+            release.set()
+            thread.join()
+
+            with write_lock(timeout=1), write_lock(timeout=0):
+                records = make_records(3)
+                import_participants(records, assign_teams(records, seed=1))
+        self.assertEqual(Participant.objects.count(), 3)
+
+
+class PlacementTests(TestCase):
+    def setUp(self):
+        self.event = default_event()
+
+    def late(self, name, score=0, **flags):
+        return Participant.objects.create(event=self.event, full_name=name, academic_score=score, **flags)
+
+    def test_newcomers_fill_free_seats_without_moving_anyone(self):
+        records = make_records(12)
+        import_participants(records, assign_teams(records, seed=1))
+        before = dict(Participant.objects.values_list("pk", "team__code"))
+        self.late("Tard 1", score=9)
+        for idx in range(2, 5):
+            self.late(f"Tard {idx}")
+
+        counts = place_unassigned()
+
+        self.assertEqual(counts, {"placed": 4, "teams": 2, "created_teams": 1})
+        self.assertEqual({pk: code for pk, code in Participant.objects.values_list("pk", "team__code") if pk in before}, before)
+        sizes = dict(Team.objects.annotate(size=Count("participants")).values_list("code", "size"))
+        self.assertEqual(sizes, {"TEAM 1": 5, "TEAM 2": 5, "TEAM 3": 5, "TEAM 4": 1})
+        self.assertEqual(Participant.objects.get(full_name="Tard 1").team.code, "TEAM 3")
+        leaders = Participant.objects.filter(team__code="TEAM 3", is_leader=True)
+        self.assertEqual([p.full_name for p in leaders], ["Tard 1"])
+        self.assertEqual(Participant.objects.filter(team__code="TEAM 4", is_leader=True).count(), 1)
+
+    def test_newcomers_go_where_they_cover_a_missing_profile(self):
+        for code, is_marketing in (("TEAM 1", True), ("TEAM 2", False)):
+            team = Team.objects.create(event=self.event, code=code)
+            Participant.objects.create(event=self.event, team=team, is_leader=True, is_marketing=is_marketing, academic_score=3)
+
+        self.late("Marketeur", is_marketing=True)
+        place_unassigned()
+
+        self.assertEqual(Participant.objects.get(full_name="Marketeur").team.code, "TEAM 2")
+
+    def test_newcomers_complete_the_fullest_teams_before_empty_ones(self):
+        for code, size in (("TEAM 1", 3), ("TEAM 2", 0), ("TEAM 3", 4)):
+            team = Team.objects.create(event=self.event, code=code)
+            for idx in range(size):
+                Participant.objects.create(event=self.event, team=team, is_leader=not idx, academic_score=3)
+        for idx in range(3):
+            self.late(f"Tard {idx}")
+
+        counts = place_unassigned()
+
+        sizes = dict(Team.objects.annotate(size=Count("participants")).values_list("code", "size"))
+        self.assertEqual(sizes, {"TEAM 1": 5, "TEAM 2": 0, "TEAM 3": 5})
+        self.assertEqual(counts, {"placed": 3, "teams": 2, "created_teams": 0})
+
+    def test_cost_does_not_grow_with_the_event(self):
+        def placement_queries(count):
+            delete_participants(Participant.objects.all())
+            Team.objects.all().delete()
+            records = make_records(count)
+            import_participants(records, assign_teams(records, team_count=count // 5, seed=2))
+            self.late("Tard A", is_dev=True)
+            self.late("Tard B", language_en=True)
+            with CaptureQueriesContext(connection) as queries:
+                place_unassigned()
+            return len(queries)
+
+        self.assertEqual(placement_queries(20), placement_queries(240))
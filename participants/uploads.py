@@ -0,0 +1,247 @@
+import logging
+import math
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .balancing import optimize_teams
+from .batch import expand_sources, merge_parsed, parse_sources
+from .database import write_lock
+from .forms import MODE_UPDATE
+from .importer import import_participants, sync_participants
+from .metrics import phase
+from .models import Event, UploadJob
+from .placement import place_unassigned
+from .records import ParticipantRecord
+from .skills import apply_skill_categories
+from .utils import assign_teams, read_participants
+
+logger = logging.getLogger(__name__)
+
+RUNNER_THREAD = "thread"
+RUNNER_INLINE = "inline"
+RUNNER_COMMAND = "command"
+
+# Parsed-row progress is written to the job row every this many rows.
+PROGRESS_EVERY = 1000
+# A job left "running" longer than this belongs to a dead worker and can be re-claimed.
+UPLOAD_JOB_TIMEOUT = timedelta(minutes=30)
+
+# Rows written during the import transaction are not visible to other connections until
+# commit, so the running process mirrors them here for the progress endpoint.
+_live_progress: Dict[int, Dict] = {}
+_live_lock = threading.Lock()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def upload_dir() -> Path:
+    return Path(getattr(settings, "HACKATHON_UPLOAD_DIR", Path(settings.BASE_DIR) / "var" / "uploads"))
+
+
+def save_upload(
+    uploaded_files: List, mode: str, event: Event, delete_missing: bool = False, all_sheets: bool = False
+) -> UploadJob:
+    """Copy the uploads to disk chunk by chunk and queue one job for all of them, into event."""
+    directory = upload_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    files = []
+    for uploaded_file in uploaded_files:
+        path = directory / f"{uuid.uuid4().hex}{Path(uploaded_file.name).suffix.lower()}"
+        with open(path, "wb") as handle:
+            for chunk in uploaded_file.chunks():
+                handle.write(chunk)
+        files.append({"path": str(path), "name": uploaded_file.name})
+    return UploadJob.objects.create(
+        event=event, files=files, mode=mode, delete_missing=delete_missing, all_sheets=all_sheets
+    )
+
+
+def submit_upload_job(job: UploadJob) -> None:
+    """Hand the job to the runner chosen by HACKATHON_UPLOAD_RUNNER.
+
+    "thread" runs it on a single background thread of this process, "inline" runs it
+    before returning (tests, debugging) and "command" leaves it for
+    `manage.py process_uploads`.
+    """
+    runner = getattr(settings, "HACKATHON_UPLOAD_RUNNER", RUNNER_THREAD)
+    if runner == RUNNER_INLINE:
+        process_upload_job(job.pk)
+    elif runner == RUNNER_THREAD:
+        # Run after commit so the worker's own connection can see the job row.
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job.pk))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # One worker: imports rewrite the whole table, so they must not run concurrently.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload-job")
+        return _executor
+
+
+def _run_in_thread(job_id: int) -> None:
+    close_old_connections()
+    try:
+        process_upload_job(job_id)
+    except Exception:
+        logger.exception("Upload job %s crashed", job_id)
+    finally:
+        connection.close()
+
+
+def claim_upload_job(job_id: Optional[int] = None, now=None) -> Optional[UploadJob]:
+    """Atomically move one queued (or stale running) job to running and return it."""
+    now = now or timezone.now()
+    due = Q(status=UploadJob.STATUS_QUEUED) | Q(status=UploadJob.STATUS_RUNNING, started_at__lt=now - UPLOAD_JOB_TIMEOUT)
+    candidates = UploadJob.objects.filter(due)
+    if job_id is not None:
+        candidates = candidates.filter(pk=job_id)
+    candidate = candidates.order_by("pk").values_list("pk", flat=True).first()
+    if candidate is None:
+        return None
+    token = uuid.uuid4().hex
+    claimed = UploadJob.objects.filter(due, pk=candidate).update(
+        status=UploadJob.STATUS_RUNNING, claim_token=token, started_at=now, phase="parse"
+    )
+    return UploadJob.objects.select_related("event").get(pk=candidate) if claimed else None
+
+
+def process_upload_job(job_id: Optional[int] = None) -> Optional[UploadJob]:
+    """Claim a job (the given one, or the oldest due) and run the import pipeline on it."""
+    job = claim_upload_job(job_id)
+    if job is None:
+        return None
+    try:
+        job.result = _run_pipeline(job)
+        job.status = UploadJob.STATUS_DONE
+        job.message = _success_message(job)
+    except Exception as exc:
+        logger.exception("Upload job %s failed", job.pk)
+        job.status = UploadJob.STATUS_FAILED
+        job.message = f"Impossible de traiter le fichier: {exc}"
+    finally:
+        with _live_lock:
+            live = _live_progress.pop(job.pk, {})
+        job.rows_written = live.get("rows_written", job.rows_written)
+        job.finished_at = timezone.now()
+        job.phase = ""
+        job.save(update_fields=["status", "message", "result", "rows_written", "finished_at", "phase"])
+        for item in job.files:
+            try:
+                os.remove(item["path"])
+            except OSError:
+                pass
+    return job
+
+
+def _set_phase(job: UploadJob, name: str, **fields) -> None:
+    job.phase = name
+    for key, value in fields.items():
+        setattr(job, key, value)
+    UploadJob.objects.filter(pk=job.pk).update(phase=name, **fields)
+
+
+def _run_pipeline(job: UploadJob) -> Dict:
+    sources = expand_sources([(item["path"], item["name"]) for item in job.files], job.all_sheets)
+    with phase("parse"):
+        if len(sources) == 1:
+            parsed, columns = _parse_single(job, sources[0])
+            batch_stats = None
+        else:
+            parsed, columns, batch_stats = _parse_batch(job, sources)
+    _set_phase(job, "assign", rows_parsed=len(parsed), rows_total=len(parsed), columns=columns)
+
+    apply_skill_categories(parsed)
+    teams = None
+    if job.mode != MODE_UPDATE:
+        team_names = {t.code: t.display_name for t in job.event.teams.exclude(display_name="")}
+        seed = getattr(settings, "HACKATHON_TEAM_SEED", None)
+        teams = assign_teams(parsed, team_names, seed=seed)
+        budget = getattr(settings, "HACKATHON_OPTIMIZE_SECONDS", 0)
+        if budget:
+            optimize_teams(teams, time_budget=budget, seed=seed)
+    _set_phase(job, "import")
+
+    def report(written):
+        with _live_lock:
+            _live_progress[job.pk] = {"rows_written": written}
+
+    # A background job has no one waiting on it, so it queues behind other writers for as long as it takes.
+    with write_lock(timeout=math.inf):
+        if job.mode == MODE_UPDATE:
+            result = sync_participants(parsed, delete_missing=job.delete_missing, event=job.event, progress=report)
+            # Late registrants join the current teams instead of waiting for a full re-upload.
+            result["placed"] = place_unassigned(job.event)["placed"]
+        else:
+            result = {"created": import_participants(parsed, teams, event=job.event, progress=report)}
+    if batch_stats is not None:
+        result["merged"] = batch_stats
+    return result
+
+
+def _parse_single(job: UploadJob, source) -> Tuple[List[ParticipantRecord], List[str]]:
+    """Stream one sheet in this process, reporting parsed rows as they come."""
+    path, sheet, _ = source
+    parsed = []
+    with open(path, "rb") as handle:
+        columns, records = read_participants(handle, sheet)
+        for record in records:
+            parsed.append(record)
+            if len(parsed) % PROGRESS_EVERY == 0:
+                UploadJob.objects.filter(pk=job.pk).update(rows_parsed=len(parsed))
+    return parsed, columns
+
+
+def _parse_batch(job: UploadJob, sources) -> Tuple[List[ParticipantRecord], List[str], Dict]:
+    """Parse several sheets in worker processes, then merge them with dedup on email."""
+    parsed_rows = 0
+
+    def on_parsed(result):
+        nonlocal parsed_rows
+        parsed_rows += len(result["rows"])
+        UploadJob.objects.filter(pk=job.pk).update(rows_parsed=parsed_rows)
+
+    workers = getattr(settings, "HACKATHON_IMPORT_WORKERS", None)
+    return merge_parsed(parse_sources(sources, workers=workers, on_parsed=on_parsed))
+
+
+def _success_message(job: UploadJob) -> str:
+    if job.mode == MODE_UPDATE:
+        counts = job.result
+        return (
+            f"Mise a jour: {counts['created']} ajoute(s), {counts['updated']} modifie(s), "
+            f"{counts['deleted']} supprime(s), {counts['unchanged']} inchange(s), "
+            f"{counts.get('placed', 0)} place(s) dans une equipe."
+        )
+    merged = job.result.get("merged")
+    duplicates = f", {merged['duplicates']} doublon(s) ignore(s)" if merged and merged["duplicates"] else ""
+    return f"Fichier charge: {job.result['created']} participant(s){duplicates}. Previsualisation ci-dessous."
+
+
+def job_progress(job: UploadJob) -> Dict:
+    """Progress payload for the polling endpoint, with live counts when this process runs the job."""
+    with _live_lock:
+        live = dict(_live_progress.get(job.pk, {}))
+    return {
+        "id": job.pk,
+        "status": job.status,
+        "phase": job.phase,
+        "rows_parsed": job.rows_parsed,
+        "rows_written": live.get("rows_written", job.rows_written),
+        "rows_total": job.rows_total,
+        "message": job.message,
+        "result": job.result,
+        "finished": job.status in (UploadJob.STATUS_DONE, UploadJob.STATUS_FAILED),
+    }
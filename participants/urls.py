@@ -6,4 +6,11 @@ urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('send-emails/', views.send_emails_api, name='send_emails'),
     path('export/', views.export_excel, name='export_excel'),
+    path('api/participants/', views.participants_api, name='participants_api'),
+    path('api/teams/', views.teams_api, name='teams_api'),
+    path('api/teams/bulk/', views.teams_bulk_api, name='teams_bulk_api'),
+    path('api/search/', views.search_api, name='search_api'),
+    path('metrics', views.metrics, name='metrics'),
+    path('api/uploads/<int:job_id>/', views.upload_progress_api, name='upload_progress_api'),
+    path('api/skills/', views.skills_api, name='skills_api'),
 ]
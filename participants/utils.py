@@ -1,11 +1,25 @@
+"""Excel parsing, enrichment, team assignment and the Excel report.
+
+openpyxl and pandas are imported inside the functions that use them: most processes
+(web workers serving the dashboard, management commands) never parse or write a
+workbook, and pandas alone costs a large share of their start-up. Only legacy .xls
+files still go through pandas.
+"""
 import io
+import math
 import random
-from typing import Dict, List, Optional, Tuple
+import tempfile
+from collections import deque
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .metrics import phase
+from .records import SOURCE_FIELDS, ParticipantRecord
 
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font
-from openpyxl.utils import get_column_letter
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
 
 
 DEV_KEYWORDS = {
@@ -28,17 +42,17 @@ LANG_TOKENS_EN = ("en", "ang", "eng", "anglais", "english")
 
 ACADEMIC_SCORES = {"B1": 1, "B2": 2, "B3": 3, "M1": 4, "M2": 5}
 
-USEFUL_COLUMNS = [
-    "NOM ET PRENOM",
-    "Email Address",
-    "LANGUE",
-    "NIVEAU D'ETUDES",
-    "VOS COMPETENCES",
-]
+ENRICH_CHUNK_SIZE = 5000
+
+TEAM_SIZE = 5
+# Soft constraints checked, in this order, when a team is formed.
+CONSTRAINT_FLAGS = ("is_dev", "is_marketing", "language_en", "language_fr")
+
+USEFUL_COLUMNS = list(SOURCE_FIELDS)
 
 
 def _clean_text(value) -> str:
-    if pd.isna(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
         return ""
     return str(value).strip()
 
@@ -53,54 +67,173 @@ def _split_skills(raw_value: str) -> List[str]:
     return [item.strip().upper() for item in cleaned.split(",") if item.strip()]
 
 
-def parse_participants(uploaded_file) -> Tuple[List[Dict], List[str]]:
+def parse_participants(uploaded_file) -> Tuple[List[ParticipantRecord], List[str]]:
     """Read the Excel file and return structured participants plus the column order."""
-    frame = pd.read_excel(uploaded_file)
+    with phase("parse"):
+        columns, records = read_participants(uploaded_file)
+        return list(records), columns
+
+
+def read_participants(uploaded_file, sheet=0) -> Tuple[List[str], Iterator[ParticipantRecord]]:
+    """Return the useful columns found in the header plus a lazy iterator of enriched records.
+
+    .xlsx files are streamed with openpyxl in read-only mode, one row at a time, so
+    memory stays flat regardless of the sheet size. Legacy .xls files go through pandas.
+    sheet is a sheet index or name (the first sheet by default).
+    """
+    columns, records = read_sheet(uploaded_file, sheet)
+    return columns or USEFUL_COLUMNS, records
+
+
+def read_sheet(uploaded_file, sheet=0) -> Tuple[List[str], Iterator[ParticipantRecord]]:
+    """Like read_participants, but the column list is empty when the header has none of ours."""
+    if getattr(uploaded_file, "name", "").lower().endswith(".xls"):
+        return _read_participants_with_pandas(uploaded_file, sheet)
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    worksheet = workbook[sheet] if isinstance(sheet, str) else workbook.worksheets[sheet]
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None) or ()
+    positions = {}
+    for idx, name in enumerate(header):
+        if name in USEFUL_COLUMNS and name not in positions:
+            positions[name] = idx
+    columns = [col for col in USEFUL_COLUMNS if col in positions]
+    wanted = [(SOURCE_FIELDS[col], positions[col]) for col in columns]
+
+    def raw_records() -> Iterator[ParticipantRecord]:
+        try:
+            for idx, row in enumerate(row for row in rows if any(value is not None for value in row)):
+                record = ParticipantRecord(uid=f"p{idx}")
+                for field, pos in wanted:
+                    setattr(record, field, _clean_text(row[pos] if pos < len(row) else None))
+                yield record
+        finally:
+            workbook.close()
+
+    return columns, _enrich_in_chunks(raw_records())
+
+
+def sheet_names(uploaded_file) -> List[str]:
+    """Names of the sheets of a workbook, in order."""
+    if getattr(uploaded_file, "name", "").lower().endswith(".xls"):
+        import pandas as pd
+
+        return list(pd.ExcelFile(uploaded_file).sheet_names)
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(uploaded_file, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _read_participants_with_pandas(uploaded_file, sheet=0) -> Tuple[List[str], Iterator[ParticipantRecord]]:
+    import pandas as pd
+
+    frame = pd.read_excel(uploaded_file, sheet_name=sheet)
     frame = frame.fillna("")
     columns = [col for col in USEFUL_COLUMNS if col in frame.columns]
-    if not columns:
-        columns = USEFUL_COLUMNS
+    fields = [SOURCE_FIELDS[col] for col in columns]
+
+    def raw_records() -> Iterator[ParticipantRecord]:
+        for idx, row in enumerate(frame[columns].itertuples(index=False)):
+            record = ParticipantRecord(uid=f"p{idx}")
+            for field, value in zip(fields, row):
+                setattr(record, field, _clean_text(value))
+            yield record
 
-    participants = []
-    for idx, (_, row) in enumerate(frame.iterrows()):
-        record = {col: _clean_text(row[col]) for col in columns if col in frame.columns}
-        record["uid"] = f"p{idx}"
-        participants.append(_enrich_participant(record))
+    return columns, _enrich_in_chunks(raw_records())
 
-    return participants, columns
 
+def _enrich_in_chunks(
+    raw_records: Iterator[ParticipantRecord], chunk_size: int = ENRICH_CHUNK_SIZE
+) -> Iterator[ParticipantRecord]:
+    while True:
+        chunk = list(islice(raw_records, chunk_size))
+        if not chunk:
+            return
+        with phase("enrich"):
+            enrich_records(chunk)
+        yield from chunk
 
-def _enrich_participant(record: Dict) -> Dict:
-    language_raw = _clean_text(record.get("LANGUE", record.get("Langue", "")))
+
+def _enrich_participant(record: Dict) -> ParticipantRecord:
+    enriched = ParticipantRecord.from_dict(record)
+    language_raw = _clean_text(enriched.language)
     language_lower = language_raw.lower()
-    skills = _split_skills(record.get("VOS COMPETENCES", record.get("Competences", "")))
-    level_raw = _clean_text(record.get("NIVEAU D'ETUDES", record.get("Niveau d'etudes", ""))).upper()
-
-    language_fr = any(token in language_lower for token in LANG_TOKENS_FR) or "les deux" in language_lower
-    language_en = any(token in language_lower for token in LANG_TOKENS_EN) or "les deux" in language_lower
-
-    is_dev = any(skill in DEV_KEYWORDS for skill in skills)
-    is_marketing = any(skill in MARKETING_KEYWORDS for skill in skills)
-
-    enriched = {
-        **record,
-        "uid": record.get("uid"),
-        "skills_list": skills,
-        "language_raw": language_raw or "Non precise",
-        "language_fr": language_fr,
-        "language_en": language_en,
-        "is_dev": is_dev,
-        "is_marketing": is_marketing,
-        "academic_level": level_raw or "NC",
-        "academic_score": ACADEMIC_SCORES.get(level_raw, 0),
-        "email_sent": record.get("email_sent", False),
-        "team": record.get("team", None),
-        "team_display": record.get("team_display", None),
-        "is_leader": record.get("is_leader", False),
-    }
+    skills = _split_skills(enriched.competences)
+    level_raw = _clean_text(enriched.level).upper()
+
+    enriched.skills_list = tuple(skills)
+    enriched.language_raw = language_raw or "Non precise"
+    enriched.language_fr = any(token in language_lower for token in LANG_TOKENS_FR) or "les deux" in language_lower
+    enriched.language_en = any(token in language_lower for token in LANG_TOKENS_EN) or "les deux" in language_lower
+    enriched.is_dev = any(skill in DEV_KEYWORDS for skill in skills)
+    enriched.is_marketing = any(skill in MARKETING_KEYWORDS for skill in skills)
+    enriched.academic_level = level_raw or "NC"
+    enriched.academic_score = ACADEMIC_SCORES.get(level_raw, 0)
     return enriched
 
 
+def enrich_participants(records: List[Dict]) -> List[ParticipantRecord]:
+    """Column-wise equivalent of _enrich_participant for a batch of sheet rows (dicts)."""
+    return enrich_records([ParticipantRecord.from_dict(record) for record in records])
+
+
+def enrich_records(records: List[ParticipantRecord]) -> List[ParticipantRecord]:
+    """Fill the derived fields of raw records in place and return them.
+
+    Registration sheets repeat a handful of LANGUE / NIVEAU D'ETUDES / VOS COMPETENCES
+    values, so each distinct value is classified once and the result is reused for
+    every row that has it. Records with the same competences share one skills tuple.
+    """
+    languages: Dict[str, Tuple[str, bool, bool]] = {}
+    levels: Dict[str, Tuple[str, int]] = {}
+    skills: Dict[str, Tuple[Tuple[str, ...], bool, bool]] = {}
+    for record in records:
+        language = _clean_text(record.language)
+        found = languages.get(language)
+        if found is None:
+            found = languages[language] = _classify_language(language)
+        record.language_raw, record.language_fr, record.language_en = found
+
+        level = _clean_text(record.level).upper()
+        found = levels.get(level)
+        if found is None:
+            found = levels[level] = (level or "NC", ACADEMIC_SCORES.get(level, 0))
+        record.academic_level, record.academic_score = found
+
+        competences = _clean_text(record.competences)
+        found = skills.get(competences)
+        if found is None:
+            found = skills[competences] = _classify_skills(competences)
+        record.skills_list, record.is_dev, record.is_marketing = found
+    return records
+
+
+def _classify_language(cleaned: str) -> Tuple[str, bool, bool]:
+    lower = cleaned.lower()
+    both = "les deux" in lower
+    return (
+        cleaned or "Non precise",
+        both or any(token in lower for token in LANG_TOKENS_FR),
+        both or any(token in lower for token in LANG_TOKENS_EN),
+    )
+
+
+def _classify_skills(raw_value: str) -> Tuple[Tuple[str, ...], bool, bool]:
+    skills = _split_skills(raw_value)
+    return (
+        tuple(skills),
+        any(skill in DEV_KEYWORDS for skill in skills),
+        any(skill in MARKETING_KEYWORDS for skill in skills),
+    )
+
+
 def build_email_content(language: str, full_name: str) -> Tuple[str, str]:
     name = full_name or "participant"
     english = (
@@ -124,94 +257,159 @@ def build_email_content(language: str, full_name: str) -> Tuple[str, str]:
     return ("EEUEZ Hackathon - Confirmation", english)
 
 
-def assign_teams(participants: List[Dict], team_names: Optional[Dict[str, str]] = None) -> List[Dict]:
-    """Assign participants into up to 10 teams of 5 with soft constraints."""
+@phase("assign_teams")
+def assign_teams(
+    participants: List[ParticipantRecord],
+    team_names: Optional[Dict[str, str]] = None,
+    team_count: Optional[int] = None,
+    team_size: int = TEAM_SIZE,
+    seed: Optional[int] = None,
+) -> List[Dict]:
+    """Assign participants into teams of team_size with soft constraints.
+
+    Each team first gets a dev, a marketer, an EN and a FR speaker when available, then
+    is filled in shuffled order. Without team_count, enough teams are created to place
+    everyone. Per-attribute buckets make every pick O(1) amortized. Passing a seed makes
+    the shuffle reproducible.
+    """
     for person in participants:
-        person["team"] = None
-        person["team_display"] = None
-        person["is_leader"] = False
-
-    remaining = participants.copy()
-    random.shuffle(remaining)
+        person.team = None
+        person.team_display = None
+        person.is_leader = False
+
+    order = participants.copy()
+    (random.Random(seed) if seed is not None else random).shuffle(order)
+    if team_count is None:
+        team_count = -(-len(order) // team_size)
+
+    taken = [False] * len(order)
+    buckets = {flag: deque(i for i, p in enumerate(order) if getattr(p, flag)) for flag in CONSTRAINT_FLAGS}
+    cursor = 0
+    left = len(order)
     teams: List[Dict] = []
 
-    def pop_first(predicate):
-        for idx, candidate in enumerate(remaining):
-            if predicate(candidate):
-                return remaining.pop(idx)
+    def take(idx):
+        nonlocal left
+        taken[idx] = True
+        left -= 1
+        return order[idx]
+
+    def pop_first(flag):
+        bucket = buckets[flag]
+        while bucket:
+            idx = bucket.popleft()
+            if not taken[idx]:
+                return take(idx)
         return None
 
-    for idx in range(10):
-        if not remaining:
+    def pop_next():
+        nonlocal cursor
+        while taken[cursor]:
+            cursor += 1
+        return take(cursor)
+
+    for idx in range(team_count):
+        if not left:
             break
 
         team_name = f"TEAM {idx + 1}"
         display_name = (team_names or {}).get(team_name) or team_name
-        team_members: List[Dict] = []
-
-        def ensure(predicate):
-            if len(team_members) >= 5:
-                return
-            if any(predicate(member) for member in team_members):
-                return
-            picked = pop_first(predicate)
+        team_members: List[ParticipantRecord] = []
+
+        for flag in CONSTRAINT_FLAGS:
+            if len(team_members) >= team_size:
+                break
+            if any(getattr(member, flag) for member in team_members):
+                continue
+            picked = pop_first(flag)
             if picked:
                 team_members.append(picked)
 
-        ensure(lambda p: p.get("is_dev"))
-        ensure(lambda p: p.get("is_marketing"))
-        ensure(lambda p: p.get("language_en"))
-        ensure(lambda p: p.get("language_fr"))
-
-        while len(team_members) < 5 and remaining:
-            team_members.append(remaining.pop(0))
+        while len(team_members) < team_size and left:
+            team_members.append(pop_next())
 
         leader = _pick_leader(team_members)
         for member in team_members:
-            member["team"] = team_name
-            member["team_display"] = display_name
-            member["is_leader"] = leader is not None and member is leader
+            member.team = team_name
+            member.team_display = display_name
+            member.is_leader = leader is not None and member is leader
 
         teams.append({"name": team_name, "display_name": display_name, "members": team_members, "leader": leader})
 
     return teams
 
 
-def _pick_leader(team_members: List[Dict]):
+def _pick_leader(team_members: List[ParticipantRecord]):
     if not team_members:
         return None
-    sorted_members = sorted(team_members, key=lambda m: m.get("academic_score", 0), reverse=True)
+    sorted_members = sorted(team_members, key=lambda m: m.academic_score, reverse=True)
     return sorted_members[0]
 
 
 def build_report_workbook(
-    participants: List[Dict],
+    participants: Iterable[ParticipantRecord],
     teams: List[Dict],
     source_columns: Optional[List[str]] = None,
 ) -> bytes:
-    """Create the Excel report with the general sheet plus 10 team sheets."""
-    wb = Workbook()
-    general_ws = wb.active
-    general_ws.title = "General"
+    """Create the Excel report with the general sheet plus one sheet per team."""
+    buffer = io.BytesIO()
+    write_report_workbook(buffer, participants, teams, source_columns)
+    return buffer.getvalue()
+
+
+def build_report_file(
+    participants: Iterable[ParticipantRecord],
+    teams: List[Dict],
+    source_columns: Optional[List[str]] = None,
+):
+    """Write the report to an anonymous temporary file, rewound and ready to stream."""
+    handle = tempfile.TemporaryFile(suffix=".xlsx")
+    try:
+        write_report_workbook(handle, participants, teams, source_columns)
+    except Exception:
+        handle.close()
+        raise
+    handle.seek(0)
+    return handle
+
+
+@phase("report")
+def write_report_workbook(
+    target,
+    participants: Iterable[ParticipantRecord],
+    teams: List[Dict],
+    source_columns: Optional[List[str]] = None,
+) -> None:
+    """Write the report to a path or binary file object in openpyxl write-only mode.
+
+    Rows are streamed to disk as they are appended, so no cell-object graph is kept in
+    memory whatever the number of participants.
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    wb = Workbook(write_only=True)
+    general_ws = wb.create_sheet("General")
     header_font = Font(bold=True)
 
     base_headers = USEFUL_COLUMNS
     columns = source_columns or base_headers
     general_headers = columns + ["Team", "Role", "Email envoye"]
-    general_ws.append(general_headers)
-    for cell in general_ws[1]:
-        cell.font = header_font
+    general_ws.append(_header_cells(general_ws, general_headers, header_font))
 
+    fields = [SOURCE_FIELDS[col] for col in columns]
     for person in participants:
-        row = [person.get(col, "") for col in columns]
+        row = [getattr(person, field) for field in fields]
         row.extend(
             [
-                person.get("team_display") or person.get("team") or "Non assigne",
-                "Chef d'equipe" if person.get("is_leader") else "Membre",
-                "Oui" if person.get("email_sent") else "Non",
+                person.team_display or person.team or "Non assigne",
+                "Chef d'equipe" if person.is_leader else "Membre",
+                "Oui" if person.email_sent else "Non",
             ]
         )
         general_ws.append(row)
+    # Closing a finished write-only sheet flushes it and frees its XML writer.
+    general_ws.close()
 
     for team in teams:
         _build_team_sheet(
@@ -223,31 +421,39 @@ def build_report_workbook(
             header_font=header_font,
         )
 
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer.getvalue()
+    wb.save(target)
+
+
+def _header_cells(ws, headers: List[str], header_font: "Font") -> List["WriteOnlyCell"]:
+    from openpyxl.cell import WriteOnlyCell
+
+    cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        cells.append(cell)
+    return cells
 
 
 def _build_team_sheet(
-    workbook: Workbook,
+    workbook: "Workbook",
     sheet_name: str,
     display_name: str,
     mentor: Optional[Dict],
-    members: List[Dict],
-    header_font: Font,
+    members: List[ParticipantRecord],
+    header_font: "Font",
 ):
+    from openpyxl.utils import get_column_letter
+
     ws = workbook.create_sheet(sheet_name)
-    ws["A1"] = "Nom de l'equipe / Team name:"
-    ws["B1"] = display_name
-    ws["A2"] = "Encadrant"
+    ws.append(["Nom de l'equipe / Team name:", display_name])
     if mentor:
         mentor_line = mentor.get("name") or ""
         if mentor.get("email"):
             mentor_line = f"{mentor_line} ({mentor.get('email')})"
-        ws["B2"] = mentor_line
+        ws.append(["Encadrant", mentor_line])
     else:
-        ws["B2"] = "Non assigne"
+        ws.append(["Encadrant", "Non assigne"])
     ws.append([])  # Blank line
 
     headers = ["Nom complet", "Email", "Langue", "Niveau", "Competences", "Role"]
@@ -255,29 +461,25 @@ def _build_team_sheet(
         headers.append(f"Atelier {idx}")
     headers.append("Total (/20)")
 
-    ws.append(headers)
-    for cell in ws[4]:
-        cell.font = header_font
+    ws.append(_header_cells(ws, headers, header_font))
 
+    first_atelier_col = get_column_letter(7)
+    last_atelier_col = get_column_letter(14)
     for row_idx, member in enumerate(members, start=5):
         row_values = [
-            member.get("NOM ET PRENOM") or member.get("Nom") or "",
-            member.get("Email Address") or member.get("EMAIL") or "",
-            member.get("language_raw", member.get("LANGUE", "")),
-            member.get("academic_level", member.get("NIVEAU D'ETUDES", "")),
-            ", ".join(member.get("skills_list", [])) or member.get("VOS COMPETENCES", ""),
-            "Chef d'equipe" if member.get("is_leader") else "Membre",
+            member.full_name or "",
+            member.email or "",
+            member.language_raw,
+            member.academic_level,
+            ", ".join(member.skills_list) or member.competences,
+            "Chef d'equipe" if member.is_leader else "Membre",
         ]
         # Empty placeholders for atelier scores
         row_values.extend([""] * 8)
-        row_values.append("")  # placeholder for total formula
-        ws.append(row_values)
-
-        total_col = get_column_letter(6 + 8 + 1)  # after role + eight ateliers
-        first_atelier_col = get_column_letter(7)
-        last_atelier_col = get_column_letter(14)
-        total_cell = f"{total_col}{row_idx}"
-        ws[total_cell] = (
+        # Total after role + eight ateliers
+        row_values.append(
             f'=IF(COUNT({first_atelier_col}{row_idx}:{last_atelier_col}{row_idx})=0,"",'
             f'ROUND(AVERAGE({first_atelier_col}{row_idx}:{last_atelier_col}{row_idx}),2))'
         )
+        ws.append(row_values)
+    ws.close()
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Tuple
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DataVersion
+
+DATA_KEY = "participants"
+
+
+def data_key(event_id: int) -> str:
+    """Version key of one event's participants, teams and emails."""
+    return f"{DATA_KEY}:{event_id}"
+
+
+def bump_data_version(key: str) -> None:
+    """Mark the data as changed so versioned caches stop matching."""
+    updated = DataVersion.objects.filter(key=key).update(value=F("value") + 1, updated_at=timezone.now())
+    if not updated:
+        DataVersion.objects.get_or_create(key=key, defaults={"value": 1})
+
+
+def version_tag(version: int, changed_at: datetime) -> str:
+    """Cache key part for a data version.
+
+    The timestamp keeps keys apart if the version row is ever recreated from zero, e.g.
+    after the database is deleted and migrated again.
+    """
+    return f"{version}.{changed_at.timestamp():.6f}"
+
+
+def get_data_version(key: str) -> Tuple[int, datetime]:
+    """Return (version, last change time) for the data."""
+    version, _ = DataVersion.objects.get_or_create(key=key)
+    return version.value, version.updated_at
@@ -1,67 +1,92 @@
+import json
+
 from django.conf import settings
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.http import HttpResponse, JsonResponse
-from django.shortcuts import render
-from django.views.decorators.http import require_GET, require_http_methods, require_POST
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import condition, require_GET, require_http_methods, require_POST
 
+from .database import WriteLockTimeout
+from .events import EVENT_PARAM, create_event, current_event, resolve_event
+from .exports import open_cached_report
 from .forms import UploadForm
-from .models import Participant, Team
-from .utils import assign_teams, build_email_content, build_report_workbook, parse_participants
+from .fragments import cached_fragment, fragment_version
+from .importer import clear_event
+from .mailing import EMAIL_REQUEST_SECONDS, drain_outbox, enqueue_emails
+from .metrics import REGISTRY, phase
+from .models import Event, OutboxMessage, Participant, Team, UploadJob
+from .placement import place_unassigned
+from .records import ParticipantRecord
+from .search import search_participants
+from .skills import participants_with_skill, skill_summary
+from .team_updates import TeamUpdateError, apply_team_updates, read_team_sheet
+from .uploads import job_progress, save_upload, submit_upload_job
+from .utils import write_report_workbook
+from .versioning import bump_data_version, data_key, get_data_version, version_tag
+
+PREVIEW_ROWS = 50
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 
 @require_http_methods(["GET", "POST"])
 def dashboard(request):
+    event = current_event(request)
     upload_form = UploadForm()
-    participants = list(Participant.objects.select_related("team").all())
     columns = []
+    upload_job = None
+    if request.GET.get("job", "").isdigit():
+        upload_job = UploadJob.objects.filter(pk=request.GET["job"], event=event).first()
+    if upload_job is not None:
+        columns = upload_job.columns
+        if upload_job.status == UploadJob.STATUS_DONE:
+            messages.success(request, upload_job.message)
+        elif upload_job.status == UploadJob.STATUS_FAILED:
+            messages.error(request, upload_job.message)
 
     if request.method == "POST":
         if "file" in request.FILES:
             upload_form = UploadForm(request.POST, request.FILES)
             if upload_form.is_valid():
-                Participant.objects.all().delete()
-                team_map = {t.code: t for t in Team.objects.all()}
-                parsed, columns = parse_participants(upload_form.cleaned_data["file"])
-                team_names = {code: team.display_name for code, team in team_map.items() if team.display_name}
-                teams_assigned = assign_teams(parsed, team_names)
-                for team_info in teams_assigned:
-                    team = team_map.get(team_info["name"]) or Team(code=team_info["name"])
-                    team.display_name = team_info.get("display_name") or team.code
-                    team.save()
-                    team_map[team.code] = team
-                    for member in team_info.get("members", []):
-                        Participant.objects.create(
-                            full_name=member.get("NOM ET PRENOM") or member.get("Nom") or "",
-                            email=member.get("Email Address") or member.get("EMAIL") or "",
-                            language_raw=member.get("language_raw", member.get("LANGUE", "")),
-                            academic_level=member.get("academic_level", member.get("NIVEAU D'ETUDES", "")),
-                            competences_raw=member.get("VOS COMPETENCES", ""),
-                            skills_list=member.get("skills_list", []),
-                            language_fr=member.get("language_fr", False),
-                            language_en=member.get("language_en", False),
-                            is_dev=member.get("is_dev", False),
-                            is_marketing=member.get("is_marketing", False),
-                            academic_score=member.get("academic_score", 0),
-                            email_sent=member.get("email_sent", False),
-                            is_leader=member.get("is_leader", False),
-                            team=team,
-                            uid=member.get("uid", ""),
-                        )
-                messages.success(request, "Fichier charge. Previsualisation ci-dessous.")
+                # The workbook is spooled to disk and imported in the background; the page
+                # then polls the job instead of holding this worker for the whole import.
+                job = save_upload(
+                    upload_form.cleaned_data["file"],
+                    upload_form.cleaned_data["mode"],
+                    event,
+                    upload_form.cleaned_data["delete_missing"],
+                    upload_form.cleaned_data["all_sheets"],
+                )
+                submit_upload_job(job)
+                return redirect(f"{_dashboard_url(event)}&job={job.pk}")
             else:
                 messages.error(request, "Impossible de lire le fichier fourni.")
         else:
             action = request.POST.get("action")
-            if action == "rename_team":
+            if action == "create_event":
+                name = (request.POST.get("event_name") or "").strip()
+                if not name:
+                    messages.error(request, "Donnez un nom a l'evenement.")
+                else:
+                    created = create_event(name)
+                    messages.success(request, f"Evenement '{created.name}' cree.")
+                    return redirect(_dashboard_url(created))
+            elif action == "rename_team":
                 team_name = request.POST.get("team_name")
                 custom_name = (request.POST.get("custom_name") or "").strip()
                 if not team_name:
                     messages.error(request, "Choisissez une equipe a renommer.")
                 else:
-                    team, _ = Team.objects.get_or_create(code=team_name)
+                    team, _ = Team.objects.get_or_create(event=event, code=team_name)
                     team.display_name = custom_name or team.display_name or team.code
                     team.save()
+                    bump_data_version(data_key(event.pk))
                     messages.success(request, f"{team_name} devient '{team.display_name}'.")
             elif action == "add_mentor":
                 team_name = request.POST.get("mentor_team")
@@ -70,43 +95,279 @@ def dashboard(request):
                 if not team_name:
                     messages.error(request, "Choisissez une equipe pour l'encadrant.")
                 else:
-                    team, _ = Team.objects.get_or_create(code=team_name)
+                    team, _ = Team.objects.get_or_create(event=event, code=team_name)
                     team.mentor_name = mentor_name or "Encadrant"
                     team.mentor_email = mentor_email
                     team.save()
+                    bump_data_version(data_key(event.pk))
                     messages.success(request, f"Encadrant attribue a {team_name}.")
+            elif action == "import_mentors":
+                sheet = request.FILES.get("mentor_sheet")
+                if sheet is None:
+                    messages.error(request, "Choisissez un fichier d'encadrants (.csv ou .xlsx).")
+                else:
+                    try:
+                        updates = read_team_sheet(sheet)
+                        changed = apply_team_updates(updates, event) if updates else []
+                    except TeamUpdateError as exc:
+                        messages.error(request, f"Fichier d'encadrants refuse: {exc}")
+                    except WriteLockTimeout:
+                        messages.error(request, "Un import est en cours. Reessayez dans un instant.")
+                    except Exception as exc:
+                        messages.error(request, f"Impossible de lire le fichier d'encadrants: {exc}")
+                    else:
+                        messages.success(request, f"{len(changed)} equipe(s) mise(s) a jour.")
+            elif action == "place_unassigned":
+                try:
+                    counts = place_unassigned(event)
+                except WriteLockTimeout:
+                    messages.error(request, "Un import est en cours. Reessayez dans un instant.")
+                else:
+                    messages.success(
+                        request,
+                        f"{counts['placed']} participant(s) place(s) dans {counts['teams']} equipe(s), "
+                        f"{counts['created_teams']} nouvelle(s) equipe(s).",
+                    )
             elif action == "reset":
-                Participant.objects.all().delete()
-                Team.objects.all().delete()
-                messages.info(request, "Base nettoyee. Chargez un nouveau fichier.")
-
-    participants = list(Participant.objects.select_related("team").all())
-    teams = build_teams_from_db()
-    preview_rows = []
-    for p in participants[:50]:
-        preview_rows.append(
-            {
-                "NOM ET PRENOM": p.full_name,
-                "Email Address": p.email,
-                "LANGUE": p.language_raw,
-                "NIVEAU D'ETUDES": p.academic_level,
-                "VOS COMPETENCES": p.competences_raw,
-            }
-        )
+                try:
+                    clear_event(event)
+                except WriteLockTimeout:
+                    messages.error(request, "Un import est en cours. Reessayez dans un instant.")
+                else:
+                    messages.info(request, "Base nettoyee. Chargez un nouveau fichier.")
+
+    # Participants and teams are fetched page by page from the JSON API, so this render
+    # costs the same whatever the number of registrations. The preview and team count are
+    # read after any mutation above, from the cache until the data changes again.
+    snapshot = cached_fragment(event.pk, fragment_version(event.pk), "dashboard", lambda: _dashboard_snapshot(event))
     context = {
         "upload_form": upload_form,
         "columns": columns or ["NOM ET PRENOM", "Email Address", "LANGUE", "NIVEAU D'ETUDES", "VOS COMPETENCES"],
-        "rows": preview_rows,
-        "participants": participants,
-        "teams": teams,
+        "rows": snapshot["rows"],
+        "team_count": snapshot["team_count"],
+        "event": event,
+        "events": Event.objects.order_by("name"),
+        "page_size": API_PAGE_SIZE,
+        "upload_job": job_progress(upload_job) if upload_job is not None else None,
         "sender_choices": getattr(settings, "HACKATHON_ALLOWED_SENDERS", [settings.DEFAULT_FROM_EMAIL]),
     }
     return render(request, "participants/dashboard.html", context)
 
 
+def _dashboard_snapshot(event):
+    rows = [
+        {
+            "NOM ET PRENOM": p.full_name,
+            "Email Address": p.email,
+            "LANGUE": p.language_raw,
+            "NIVEAU D'ETUDES": p.academic_level,
+            "VOS COMPETENCES": p.competences_raw,
+        }
+        for p in event.participants.order_by("id")[:PREVIEW_ROWS]
+    ]
+    return {"rows": rows, "team_count": event.teams.count()}
+
+
+def _cached_json(request, event, name, build):
+    """JSON response for build()'s payload, cached per event data version and query string."""
+    content = cached_fragment(
+        event.pk,
+        fragment_version(event.pk),
+        name,
+        lambda: json.dumps(build(), cls=DjangoJSONEncoder),
+        request.GET.items(),
+    )
+    return HttpResponse(content, content_type="application/json")
+
+
+def _dashboard_url(event):
+    return f"{reverse('dashboard')}?{EVENT_PARAM}={event.slug}"
+
+
+@require_GET
+def upload_progress_api(request, job_id):
+    job = UploadJob.objects.filter(pk=job_id, event=current_event(request)).first()
+    if job is None:
+        return JsonResponse({"error": "Import introuvable."}, status=404)
+    return JsonResponse(job_progress(job))
+
+
+def _parse_bool(value):
+    if value is None or value == "":
+        return None
+    return value.lower() in ("1", "true", "oui", "yes")
+
+
+def _page_params(request):
+    """Read the keyset cursor (last id seen) and the page size from the query string."""
+    try:
+        after = int(request.GET.get("after") or 0)
+        limit = int(request.GET.get("limit") or API_PAGE_SIZE)
+    except ValueError:
+        return None, None
+    return after, max(1, min(limit, API_MAX_PAGE_SIZE))
+
+
+def _keyset_page(queryset, after, limit):
+    rows = list(queryset.filter(pk__gt=after).order_by("pk")[: limit + 1])
+    next_cursor = rows[limit - 1].pk if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+@require_GET
+def participants_api(request):
+    after, limit = _page_params(request)
+    if after is None:
+        return JsonResponse({"error": "Parametres de pagination invalides."}, status=400)
+
+    event = current_event(request)
+    return _cached_json(request, event, "participants", lambda: _participants_page(request, event, after, limit))
+
+
+def _participants_page(request, event, after, limit):
+    queryset = Participant.objects.filter(event=event).select_related("team")
+    if request.GET.get("team"):
+        queryset = queryset.filter(team__code=request.GET["team"])
+    language = (request.GET.get("language") or "").lower()
+    if language == "fr":
+        queryset = queryset.filter(language_fr=True)
+    elif language == "en":
+        queryset = queryset.filter(language_en=True)
+    for field in ("email_sent", "is_dev", "is_marketing"):
+        flag = _parse_bool(request.GET.get(field))
+        if flag is not None:
+            queryset = queryset.filter(**{field: flag})
+    if request.GET.get("skill"):
+        queryset = queryset.filter(pk__in=participants_with_skill(request.GET["skill"]).values("pk"))
+    if _parse_bool(request.GET.get("unassigned")):
+        queryset = queryset.filter(team__isnull=True)
+
+    rows, next_cursor = _keyset_page(queryset, after, limit)
+    return {
+        "results": [_participant_payload(p) for p in rows],
+        "next": next_cursor,
+    }
+
+
+def _participant_payload(p):
+    return {
+        "id": p.pk,
+        "full_name": p.full_name,
+        "email": p.email,
+        "language_raw": p.language_raw,
+        "academic_level": p.academic_level,
+        "team": p.team.code if p.team else None,
+        "team_display": (p.team.display_name or p.team.code) if p.team else None,
+        "is_leader": p.is_leader,
+        "is_dev": p.is_dev,
+        "is_marketing": p.is_marketing,
+        "email_sent": p.email_sent,
+    }
+
+
+@require_GET
+def search_api(request):
+    """Ranked full-text search; `after` is the number of results already shown."""
+    after, limit = _page_params(request)
+    if after is None:
+        return JsonResponse({"error": "Parametres de pagination invalides."}, status=400)
+
+    rows, has_more = search_participants(
+        request.GET.get("q", ""), offset=after, limit=limit, event=current_event(request)
+    )
+    return JsonResponse(
+        {
+            "results": [_participant_payload(p) for p in rows],
+            "next": after + len(rows) if has_more else None,
+        }
+    )
+
+
+@require_GET
+def skills_api(request):
+    return JsonResponse(
+        {
+            "results": [
+                {
+                    "name": skill.name,
+                    "category": skill.category,
+                    "participant_count": skill.participant_count,
+                    "unassigned_count": skill.unassigned_count,
+                }
+                for skill in skill_summary(current_event(request))
+            ]
+        }
+    )
+
+
+@require_GET
+def teams_api(request):
+    after, limit = _page_params(request)
+    if after is None:
+        return JsonResponse({"error": "Parametres de pagination invalides."}, status=400)
+
+    event = current_event(request)
+    return _cached_json(request, event, "teams", lambda: _teams_page(event, after, limit))
+
+
+def _teams_page(event, after, limit):
+    teams = Team.objects.filter(event=event).annotate(member_count=Count("participants"))
+    rows, next_cursor = _keyset_page(teams, after, limit)
+    members_by_team = {team.pk: [] for team in rows}
+    for p in Participant.objects.filter(team__in=rows).order_by("id"):
+        members_by_team[p.team_id].append(
+            {
+                "id": p.pk,
+                "full_name": p.full_name,
+                "is_leader": p.is_leader,
+                "first_skill": p.skills_list[0] if p.skills_list else None,
+            }
+        )
+    return {
+        "results": [
+            {**_team_payload(team), "member_count": team.member_count, "members": members_by_team[team.pk]}
+            for team in rows
+        ],
+        "next": next_cursor,
+    }
+
+
+def _team_payload(team):
+    return {
+        "id": team.pk,
+        "name": team.code,
+        "display_name": team.display_name or team.code,
+        "mentor": {"name": team.mentor_name, "email": team.mentor_email}
+        if (team.mentor_name or team.mentor_email)
+        else None,
+    }
+
+
+@require_POST
+def teams_bulk_api(request):
+    """Rename teams and assign mentors in one request; only the teams that changed come back.
+
+    The JSON body is {"teams": [{"team": "TEAM 1", "display_name": ..., "mentor_name": ...,
+    "mentor_email": ...}, ...]}; every key but "team" is optional.
+    """
+    event = current_event(request)
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "JSON invalide."}, status=400)
+    try:
+        changed = apply_team_updates(payload.get("teams") if isinstance(payload, dict) else None, event)
+    except TeamUpdateError as exc:
+        return JsonResponse({"error": "Mise a jour refusee.", "details": exc.errors}, status=400)
+    except WriteLockTimeout:
+        return JsonResponse({"error": "Un import est en cours. Reessayez dans un instant."}, status=503)
+    return JsonResponse({"updated": len(changed), "results": [_team_payload(team) for team in changed]})
+
+
 @require_POST
 def send_emails_api(request):
-    participants = list(Participant.objects.filter(email_sent=False))
+    event = current_event(request)
+    participants = list(event.participants.filter(email_sent=False))
     if not participants:
         return JsonResponse({"error": "Aucun participant a envoyer."}, status=400)
 
@@ -115,117 +376,137 @@ def send_emails_api(request):
     if sender_email not in sender_choices:
         sender_email = settings.DEFAULT_FROM_EMAIL
 
-    results = []
-    to_send = participants
-
-    for person in to_send:
-        email = person.email
-        full_name = person.full_name or "Participant"
-        if not email:
-            results.append({"status": "skipped", "email": None, "name": full_name, "message": "Pas d'email fourni."})
-            continue
-
-        subject, body = build_email_content(person.language_raw, full_name)
-        try:
-            send_mail(subject, body, sender_email, [email], fail_silently=False)
-            person.email_sent = True
-            person.save(update_fields=["email_sent"])
-            results.append({"status": "sent", "email": email, "name": full_name, "message": "Envoye"})
-        except Exception as exc:
-            results.append({"status": "error", "email": email, "name": full_name, "message": str(exc)})
-
+    # The outbox makes concurrent clicks safe: each row is claimed by exactly one drain.
+    # The request only sends what the rate limit lets through in a few seconds; the rest,
+    # and anything that fails here, is sent later by `manage.py drain_outbox`.
+    enqueue_emails(participants, sender_email)
+    results = [
+        {"status": "skipped", "email": None, "name": p.full_name or "Participant", "message": "Pas d'email fourni."}
+        for p in participants
+        if not p.email
+    ]
+    max_seconds = getattr(settings, "HACKATHON_EMAIL_REQUEST_SECONDS", EMAIL_REQUEST_SECONDS)
+    results.extend(drain_outbox(event=event, max_seconds=max_seconds))
     success = len([r for r in results if r["status"] == "sent"])
     errors = len([r for r in results if r["status"] == "error"])
+    queued = event.outbox_messages.filter(
+        status__in=(OutboxMessage.STATUS_PENDING, OutboxMessage.STATUS_SENDING)
+    ).count()
 
     return JsonResponse(
         {
             "results": results,
             "success": success,
             "errors": errors,
-            "total": len(to_send),
+            "queued": queued,
+            "total": len(participants),
         }
     )
 
 
+def _export_version(request):
+    if not hasattr(request, "_export_version"):
+        event = current_event(request)
+        request._export_version = (event, *get_data_version(data_key(event.pk)))
+    return request._export_version
+
+
+def _export_etag(request):
+    event, version, changed_at = _export_version(request)
+    return f"report-{event.pk}-{version_tag(version, changed_at)}"
+
+
+def _export_last_modified(request):
+    return _export_version(request)[2]
+
+
 @require_GET
+@condition(etag_func=_export_etag, last_modified_func=_export_last_modified)
 def export_excel(request):
-    participants = list(Participant.objects.select_related("team").all())
-    if not participants:
+    event, version, changed_at = _export_version(request)
+    if not event.participants.exists():
         return HttpResponse("Aucun participant.", status=400)
 
-    teams = build_teams_from_db()
-    participants_data = [
-        {
-            "NOM ET PRENOM": p.full_name,
-            "Email Address": p.email,
-            "LANGUE": p.language_raw,
-            "NIVEAU D'ETUDES": p.academic_level,
-            "VOS COMPETENCES": p.competences_raw,
-            "skills_list": p.skills_list,
-            "language_raw": p.language_raw,
-            "academic_level": p.academic_level,
-            "email_sent": p.email_sent,
-            "team": p.team.code if p.team else None,
-            "team_display": p.team.display_name if p.team else None,
-            "is_leader": p.is_leader,
-        }
-        for p in participants
-    ]
-    report_bytes = build_report_workbook(participants_data, teams, None)
-    response = HttpResponse(
-        report_bytes,
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    # Reports are cached on disk per event and data version: repeated downloads are served
+    # from the cache and conditional requests get a 304 from the decorator without touching it.
+    report_file = open_cached_report(event.pk, version_tag(version, changed_at), lambda handle: _write_report(handle, event))
+    return FileResponse(
+        report_file,
+        as_attachment=True,
+        filename="hackathon_teams.xlsx",
+        content_type=XLSX_CONTENT_TYPE,
     )
-    response["Content-Disposition"] = "attachment; filename=hackathon_teams.xlsx"
-    return response
+
+
+def _write_report(handle, event):
+    participants = list(event.participants.select_related("team").order_by("id"))
+    teams = build_teams_from_db(participants, event)
+    participants_data = (ParticipantRecord.from_participant(p, p.team) for p in participants)
+    write_report_workbook(handle, participants_data, teams, None)
+
+
+@require_GET
+def metrics(request):
+    """Prometheus scrape endpoint; guarded by a bearer token when HACKATHON_METRICS_TOKEN is set."""
+    token = getattr(settings, "HACKATHON_METRICS_TOKEN", None)
+    if token and not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponseForbidden("Jeton invalide.")
+    return HttpResponse(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
 
 
 def _apply_team_names(participants, team_names):
     for person in participants:
-        team_key = person.get("team")
+        team_key = person.team
         if not team_key:
             continue
-        person["team_display"] = team_names.get(team_key) or team_key
+        person.team_display = team_names.get(team_key) or team_key
     return participants
 
 
-def build_teams_from_db():
+@phase("build_teams")
+def build_teams_from_db(participants=None, event=None):
+    """Project the stored teams and members of event for display and export without extra writes.
+
+    Participants are fetched once (or reused from the caller) and grouped by team in a
+    single pass. is_leader is only written for members whose flag actually changed.
+    """
+    event = resolve_event(event)
+    if participants is None:
+        participants = list(event.participants.select_related("team").order_by("id"))
+    team_objs = sorted(event.teams.all(), key=lambda t: _team_sort_key(t.code))
+    members_by_team = {t.pk: [] for t in team_objs}
+    for p in participants:
+        if p.team_id in members_by_team:
+            members_by_team[p.team_id].append(p)
+
     teams = []
-    team_map = {t.code: t for t in Team.objects.all()}
-    participants = list(Participant.objects.select_related("team").all())
-    for idx in range(10):
-        name = f"TEAM {idx + 1}"
-        team_obj = team_map.get(name) or Team(code=name, display_name=name)
-        if not team_obj.pk:
-            team_obj.save()
-        members = [p for p in participants if p.team and p.team.code == name]
-        leader = None
-        if members:
-            leader = max(members, key=lambda m: m.academic_score)
-            for m in members:
+    changed = []
+    for team_obj in team_objs:
+        name = team_obj.code
+        display_name = team_obj.display_name or name
+        members = members_by_team[team_obj.pk]
+        # On ties keep the stored leader so a plain read does not rewrite rows.
+        leader = max(members, key=lambda m: (m.academic_score, m.is_leader)) if members else None
+        for m in members:
+            if m.is_leader != (m is leader):
                 m.is_leader = m is leader
-                m.save(update_fields=["is_leader"])
+                changed.append(m)
         teams.append(
             {
                 "name": name,
-                "display_name": team_obj.display_name or name,
-                "members": [
-                    {
-                        "NOM ET PRENOM": m.full_name,
-                        "Email Address": m.email,
-                        "language_raw": m.language_raw,
-                        "academic_level": m.academic_level,
-                        "VOS COMPETENCES": m.competences_raw,
-                        "skills_list": m.skills_list,
-                        "team_display": team_obj.display_name or name,
-                        "is_leader": m.is_leader,
-                    }
-                    for m in members
-                ],
+                "display_name": display_name,
+                "members": [ParticipantRecord.from_participant(m, team_obj) for m in members],
                 "leader": leader,
                 "mentor": {"name": team_obj.mentor_name, "email": team_obj.mentor_email}
                 if (team_obj.mentor_name or team_obj.mentor_email)
                 else None,
             }
         )
+    if changed:
+        Participant.objects.bulk_update(changed, ["is_leader"])
     return teams
+
+
+def _team_sort_key(code):
+    prefix, _, number = code.rpartition(" ")
+    return (prefix, int(number), "") if number.isdigit() else (code, 0, code)